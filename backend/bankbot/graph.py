@@ -7,9 +7,12 @@ from bankbot.nodes.intent_classifier_node import intent_classifier_node
 from bankbot.nodes.agent_node import agent_node
 from bankbot.nodes.blocked_response_node import blocked_response_node
 from bankbot.nodes.route_condition import route_tools, should_continue
+from bankbot.nodes.tools_node import make_tools_node, release_run_node
+from bankbot.nodes.display_node import display_node, route_display
 
 from mcp.mcp_tool import (
     get_balance,
+    get_account_snapshot,
     get_transactions,
     get_spend_by_category,
     get_beneficiaries,
@@ -18,6 +21,7 @@ from mcp.mcp_tool import (
     propose_transfer,
     propose_internal_transfer,
     approve_transfer,
+    approve_transfers,
     reject_transfer,
     get_pending_transfers,
     get_transfer_history,
@@ -25,6 +29,7 @@ from mcp.mcp_tool import (
 
 MCP_TOOLS = [
     get_balance,
+    get_account_snapshot,
     get_transactions,
     get_spend_by_category,
     get_beneficiaries,
@@ -33,6 +38,7 @@ MCP_TOOLS = [
     propose_transfer,
     propose_internal_transfer,
     approve_transfer,
+    approve_transfers,
     reject_transfer,
     get_pending_transfers,
     get_transfer_history,
@@ -44,7 +50,9 @@ def create_agent_graph():
 
     workflow.add_node("intent_classifier", intent_classifier_node)
     workflow.add_node("agent", agent_node)
-    workflow.add_node("tools", ToolNode(MCP_TOOLS))
+    workflow.add_node("tools", make_tools_node(ToolNode(MCP_TOOLS)))
+    workflow.add_node("display", display_node)
+    workflow.add_node("release_run", release_run_node)
     workflow.add_node("blocked_response", blocked_response_node)
     workflow.add_edge(START, "intent_classifier")
 
@@ -57,10 +65,16 @@ def create_agent_graph():
     workflow.add_conditional_edges(
         "agent",
         route_tools,
-        {"tools": "tools", END: END}
+        {"tools": "tools", END: "release_run"}
     )
     
-    workflow.add_edge("tools", "agent")
+    workflow.add_edge("tools", "display")
+    workflow.add_conditional_edges(
+        "display",
+        route_display,
+        {"agent": "agent", "end": "release_run"}
+    )
+    workflow.add_edge("release_run", END)
     workflow.add_edge("blocked_response", END)
     
     return workflow.compile(checkpointer=MemorySaver())
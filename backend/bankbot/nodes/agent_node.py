@@ -2,6 +2,7 @@ import re
 import logging
 import asyncio
 import random
+import time
 
 from langchain_core.messages import AIMessage, SystemMessage, ToolMessage, HumanMessage
 from langchain_openai import ChatOpenAI
@@ -13,7 +14,8 @@ from bankbot.tool_manager import ToolManager
 from bankbot.nodes.grounding_validator import GroundingValidator
 from config import settings
 from bankbot.utils.agent_utils import validate_user_id, sanitize_msg, scrub_response, is_retryable
-from bankbot.utils.llm_utils import get_llm
+from bankbot.utils.llm_utils import bind_tools, get_llm
+from bankbot.utils.llm_usage import llm_usage
 
 
 logger = logging.getLogger(__name__)
@@ -40,10 +42,9 @@ async def agent_node(state: AgentState):
     
     llm = get_llm(model_name, openai_api_key=openai_key, sambanova_api_key=sambanova_key)
     tools = tool_manager.get_all_tools(state)
-    llm_with_tools = llm.bind_tools(tools, parallel_tool_calls=False)
+    llm_with_tools = bind_tools(llm, tools, parallel_tool_calls=settings.parallel_tool_calls)
     
     validated_id = validate_user_id(user_id)
-    system_msg = f"{get_system_prompt()}\n\nCurrent User ID: {validated_id}"
     
     clean_msgs = []
     for msg in messages:
@@ -52,7 +53,13 @@ async def agent_node(state: AgentState):
         else:
             clean_msgs.append(msg)
     
-    history = [SystemMessage(content=system_msg)] + clean_msgs
+    # Provider prompt caches match on the longest identical prefix: tool schemas,
+    # then the static prompt. Per-user data follows it in its own message rather
+    # than inside it; system messages stay at the start for the Llama templates.
+    history = [
+        SystemMessage(content=get_system_prompt()),
+        SystemMessage(content=f"Current User ID: {validated_id}"),
+    ] + clean_msgs
     
     grounding = GroundingValidator()
     for msg in messages:
@@ -62,7 +69,11 @@ async def agent_node(state: AgentState):
     for attempt in range(MAX_RETRIES + 1):
         try:
             response = None
+            start = time.perf_counter()
+            first_token = None
             async for chunk in llm_with_tools.astream(history):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
                 try:
                     response = chunk if response is None else response + chunk
                 except TypeError:
@@ -73,6 +84,8 @@ async def agent_node(state: AgentState):
                 logger.error("LLM returned nothing")
                 return {"messages": [AIMessage(content="I'm having trouble generating a response. Please try again.")]}
             
+            # scrub_response builds a new message without the usage metadata
+            llm_usage.record(model_name, response, time.perf_counter() - start, first_token)
             response = scrub_response(response)
             
             # flag ungrounded financial claims
@@ -0,0 +1,112 @@
+"""Show backend read results in the UI without a second LLM turn.
+
+The prompt's display flows used to take two LLM round trips. The first
+called a read such as get_balance. The second only copied that JSON into
+the matching frontend tool, such as showBalance. Read tools now take
+``display=true``. When the model sets it, this node runs after ``tools``
+and builds the frontend call straight from the tool result. The node
+emits the call to CopilotKit and appends it to the conversation as the
+model's own message, then the graph ends the same way it does when the
+model calls a frontend tool. Anything else goes back to the agent
+unchanged.
+"""
+import json
+import logging
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from bankbot.state import AgentState
+from bankbot.tool_manager import FRONTEND_TOOL_ALLOWLIST
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# copilotkit.langgraph.copilotkit_emit_tool_call dispatches this event
+EMIT_TOOL_CALL_EVENT = "copilotkit_manually_emit_tool_call"
+
+
+def _dump(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+# backend read -> (frontend tool, args built from the parsed result)
+DISPLAY_FLOWS: Dict[str, Tuple[str, Callable[[object], dict]]] = {
+    "get_balance": ("showBalance", lambda r: {"accounts": _dump(r)}),
+    "get_beneficiaries": ("showBeneficiaries", lambda r: {"beneficiaries": _dump(r)}),
+    "get_spend_by_category": ("showSpending", lambda r: {"spendingData": _dump(r)}),
+    "get_transactions": ("showTransactions", lambda r: {"transactions": _dump(r["transactions"])}),
+    "get_pending_transfers": ("showPendingTransfers", lambda r: {"transfers": _dump(r)}),
+    "get_account_snapshot": (
+        "showTransferForm",
+        lambda r: {"accounts": _dump(r["accounts"]), "beneficiaries": _dump(r["beneficiaries"])},
+    ),
+}
+
+
+def _frontend_actions(state: AgentState) -> set:
+    actions = (state.get("copilotkit") or {}).get("actions") or []
+    return {a.get("name") for a in actions} & FRONTEND_TOOL_ALLOWLIST
+
+
+def _last_tool_round(messages: List) -> Tuple[Optional[AIMessage], List[ToolMessage]]:
+    """The last AI message with tool calls and the tool results after it."""
+    results = []
+    for msg in reversed(messages):
+        if isinstance(msg, ToolMessage):
+            results.append(msg)
+        elif isinstance(msg, AIMessage) and msg.tool_calls:
+            return msg, list(reversed(results))
+        else:
+            break
+    return None, []
+
+
+def plan_display_call(state: AgentState) -> Optional[dict]:
+    """The frontend tool call for the last tool round, or None to hand back to the agent.
+
+    Fuses only a single display=true read whose result parsed cleanly and
+    whose frontend tool the client registered.
+    """
+    ai_msg, results = _last_tool_round(state.get("messages") or [])
+    if ai_msg is None or len(ai_msg.tool_calls) != 1 or len(results) != 1:
+        return None
+    call = ai_msg.tool_calls[0]
+    flow = DISPLAY_FLOWS.get(call["name"])
+    if flow is None or not call["args"].get("display"):
+        return None
+    frontend_tool, build_args = flow
+    if frontend_tool not in _frontend_actions(state):
+        return None
+    try:
+        result = json.loads(results[0].content)
+        if isinstance(result, dict) and (result.get("success") is False or "error" in result):
+            return None
+        args = build_args(result)
+    except (TypeError, ValueError, KeyError) as e:
+        logger.warning(f"Not fusing {call['name']} -> {frontend_tool}: {e}")
+        return None
+    return {"name": frontend_tool, "args": args, "id": f"call_{uuid.uuid4().hex}", "type": "tool_call"}
+
+
+async def display_node(state: AgentState, config: RunnableConfig):
+    if not settings.fused_display_enabled:
+        return {}
+    call = plan_display_call(state)
+    if call is None:
+        return {}
+    await adispatch_custom_event(
+        EMIT_TOOL_CALL_EVENT, {"name": call["name"], "args": call["args"], "id": call["id"]}, config=config
+    )
+    return {"messages": [AIMessage(content="", tool_calls=[call])]}
+
+
+def route_display(state: AgentState) -> str:
+    """END after a fused frontend call, otherwise back to the agent."""
+    last = (state.get("messages") or [None])[-1]
+    if isinstance(last, AIMessage) and last.tool_calls:
+        return "end"
+    return "agent"
@@ -0,0 +1,65 @@
+import asyncio
+
+from langchain_core.runnables import RunnableConfig
+
+from bankbot.state import AgentState
+from config import settings
+from mcp.mcp_tool import READ_ONLY_TOOL_NAMES
+from mcp.run_scope import run_key, run_scopes, use_run_scope
+
+
+def make_tools_node(tool_node):
+    """Wrap the ToolNode so every tool call in a run shares the run's connection."""
+
+    async def tools_node(state: AgentState, config: RunnableConfig):
+        await run_scopes.close_idle()
+        with use_run_scope(run_key(config)):
+            return await run_tool_calls(tool_node, state, config)
+
+    return tools_node
+
+
+async def run_tool_calls(tool_node, state: AgentState, config: RunnableConfig):
+    """Run the last message's tool calls: reads concurrently, writes in order.
+
+    ToolNode on its own gathers every call at once, including two transfers
+    the model asked for together. Here every non-read call runs first, one
+    at a time, in the order the model gave; the reads then run together on a
+    semaphore of ``settings.tool_call_concurrency`` slots, so a read asked
+    for next to a write (get_pending_transfers after propose_transfer) sees
+    it. Results come back in call order.
+    """
+    ai_msg = state["messages"][-1]
+    calls = list(ai_msg.tool_calls)
+    if len(calls) <= 1:
+        return await tool_node.ainvoke(state, config)
+
+    limit = asyncio.Semaphore(max(settings.tool_call_concurrency, 1))
+
+    async def _invoke(call):
+        only = ai_msg.model_copy(update={"tool_calls": [call]})
+        async with limit:
+            update = await tool_node.ainvoke({**state, "messages": [*state["messages"][:-1], only]}, config)
+        return update["messages"]
+
+    async def _in_order(serial_calls):
+        messages = []
+        for call in serial_calls:
+            messages.extend(await _invoke(call))
+        return messages
+
+    reads = [c for c in calls if c["name"] in READ_ONLY_TOOL_NAMES]
+    writes = [c for c in calls if c["name"] not in READ_ONLY_TOOL_NAMES]
+    batches = [await _in_order(writes)]
+    batches += await asyncio.gather(*(_invoke(c) for c in reads))
+
+    by_call = {m.tool_call_id: m for batch in batches for m in batch}
+    return {"messages": [by_call[c["id"]] for c in calls if c["id"] in by_call]}
+
+
+async def release_run_node(state: AgentState, config: RunnableConfig):
+    """Last node before END: return the run's connection to the pool."""
+    key = run_key(config)
+    if key is not None:
+        await run_scopes.release(key)
+    return {}
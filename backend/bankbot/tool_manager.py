@@ -1,11 +1,14 @@
 from mcp.mcp_tool import MCP_TOOL_NAMES
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
 
 
 
+# distinct action sets kept; in practice every client registers the same few
+FRONTEND_TOOL_CACHE_SIZE = 64
+
 FRONTEND_TOOL_ALLOWLIST = {
     "showBalance",
     "showBeneficiaries",
@@ -35,7 +38,7 @@ class ShowSpendingInput(BaseModel):
 
 class ShowTransactionsInput(BaseModel):
     transactions: str = Field(
-        description="JSON string of transactions array from get_transactions tool. REQUIRED."
+        description="JSON string of the \"transactions\" array from get_transactions tool. REQUIRED."
     )
 
 class ShowTransferFormInput(BaseModel):
@@ -76,45 +79,56 @@ class ToolManager:
     
     def __init__(self, backend_tools: List[Any]):
         self.backend_tools = backend_tools
+        # (name, description) pairs of the allowed actions -> their StructuredTools
+        self._frontend_cache: Dict[Tuple, List[StructuredTool]] = {}
     
     def get_all_tools(self, state: Dict[str, Any]) -> List[Any]:
-        """Get all tools (frontend + backend) for the agent."""
+        """Get all tools (backend, then frontend) for the agent.
+
+        Backend tools come first: they are the same for every client, so
+        their schemas stay a byte-stable prefix for provider prompt caching
+        whichever actions the frontend registered.
+        """
         frontend = self._create_frontend_tools(state)
-        return frontend + self.backend_tools
+        return self.backend_tools + frontend
     
     def _create_frontend_tools(self, state: Dict[str, Any]) -> List[StructuredTool]:
-        """Extract frontend tools from CopilotKit state and convert to LangChain tools with proper schemas."""
+        """Frontend tools for the CopilotKit actions in ``state``, built once per distinct action set.
+
+        Tools are sorted by name, so the same actions always give the same
+        list (and the same cached tool binding, see llm_utils.bind_tools).
+        """
         actions = state.get("copilotkit", {}).get("actions", [])
-        tools, seen = [], set()
-        
+        allowed = {}
         for action in actions:
             name = action.get("name")
-            if not name or name in seen or name not in FRONTEND_TOOL_ALLOWLIST:
+            if not name or name in allowed or name not in FRONTEND_TOOL_ALLOWLIST:
                 continue
-            
-            seen.add(name)
-            
-            schema = FRONTEND_TOOL_SCHEMAS.get(name)
-            description = FRONTEND_TOOL_DESCRIPTIONS.get(name, action.get("description", f"Display {name} UI component"))
-            
-            if schema:
-                tool = StructuredTool.from_function(
-                    func=self._make_handler(name, schema),
-                    name=name,
-                    description=description,
-                    args_schema=schema,
-                )
-            else:
-                tool = StructuredTool.from_function(
-                    func=self._make_handler(name),
-                    name=name,
-                    description=description,
-                )
-            
-            tools.append(tool)
-        
+            allowed[name] = FRONTEND_TOOL_DESCRIPTIONS.get(name, action.get("description", f"Display {name} UI component"))
+
+        key = tuple(sorted(allowed.items()))
+        tools = self._frontend_cache.get(key)
+        if tools is None:
+            if len(self._frontend_cache) >= FRONTEND_TOOL_CACHE_SIZE:
+                self._frontend_cache.clear()
+            tools = self._frontend_cache[key] = [self._build_frontend_tool(name, description) for name, description in key]
         return tools
     
+    def _build_frontend_tool(self, name: str, description: str) -> StructuredTool:
+        schema = FRONTEND_TOOL_SCHEMAS.get(name)
+        if schema:
+            return StructuredTool.from_function(
+                func=self._make_handler(name, schema),
+                name=name,
+                description=description,
+                args_schema=schema,
+            )
+        return StructuredTool.from_function(
+            func=self._make_handler(name),
+            name=name,
+            description=description,
+        )
+    
     @staticmethod
     def _make_handler(name: str, schema: Any = None):
         async def handler(**kwargs) -> str:
@@ -0,0 +1,114 @@
+"""Per-model token usage and provider prompt-cache hits for agent LLM calls.
+
+``agent_node`` records every completed call here: input, cached input and
+output tokens from the message's usage metadata, plus latency to the first
+chunk and to the full response. Calls that hit the provider's prompt cache
+are averaged apart from those that missed, so GET /stats/llm shows both the
+share of input tokens served from cache and what it saves in latency.
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+from langchain_core.messages import AIMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _token_usage(message: AIMessage) -> dict:
+    # OpenAI reports usage under "token_usage", SambaNova's streaming chunks under "usage"
+    metadata = message.response_metadata or {}
+    return metadata.get("token_usage") or metadata.get("usage") or {}
+
+
+def input_tokens(message: AIMessage) -> Optional[int]:
+    if message.usage_metadata:
+        return message.usage_metadata.get("input_tokens")
+    return _token_usage(message).get("prompt_tokens")
+
+
+def cached_input_tokens(message: AIMessage) -> int:
+    """Prompt tokens the provider served from its prompt cache (0 when not reported)."""
+    details = (message.usage_metadata or {}).get("input_token_details") or {}
+    if details.get("cache_read") is not None:
+        return details["cache_read"]
+    details = _token_usage(message).get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or 0
+
+
+def output_tokens(message: AIMessage) -> Optional[int]:
+    if message.usage_metadata:
+        return message.usage_metadata.get("output_tokens")
+    return _token_usage(message).get("completion_tokens")
+
+
+class _ModelStats:
+    def __init__(self):
+        self.calls = 0
+        # calls whose response carried no usage (provider didn't report it)
+        self.unreported = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+        # [calls, seconds, first token seconds], split by prompt cache hit/miss
+        self.hit = [0, 0.0, 0.0]
+        self.miss = [0, 0.0, 0.0]
+
+
+def _avg_ms(calls: int, seconds: float) -> float:
+    return round(seconds / calls * 1000, 3) if calls else 0.0
+
+
+class LLMUsageStats:
+    """Thread-safe per-model aggregates; one process-wide instance, :data:`llm_usage`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelStats] = {}
+
+    def record(self, model: str, message: AIMessage, seconds: float, first_token_seconds: float):
+        model = (message.response_metadata or {}).get("model_name") or model
+        prompt, cached, completion = input_tokens(message), cached_input_tokens(message), output_tokens(message)
+        logger.debug(f"LLM call {model}: {prompt} input ({cached} cached), {completion} output, {seconds * 1000:.0f} ms")
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                stats = self._models[model] = _ModelStats()
+            stats.calls += 1
+            if prompt is None:
+                stats.unreported += 1
+                return
+            stats.input_tokens += prompt
+            stats.cached_input_tokens += cached
+            stats.output_tokens += completion or 0
+            bucket = stats.hit if cached else stats.miss
+            bucket[0] += 1
+            bucket[1] += seconds
+            bucket[2] += first_token_seconds
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                model: {
+                    "calls": stats.calls,
+                    "calls_without_usage": stats.unreported,
+                    "input_tokens": stats.input_tokens,
+                    "cached_input_tokens": stats.cached_input_tokens,
+                    "output_tokens": stats.output_tokens,
+                    "cache_hit_ratio": round(stats.cached_input_tokens / stats.input_tokens, 4)
+                    if stats.input_tokens else 0.0,
+                    "cache_hit_calls": stats.hit[0],
+                    "ms_avg_cache_hit": _avg_ms(stats.hit[0], stats.hit[1]),
+                    "ms_avg_cache_miss": _avg_ms(stats.miss[0], stats.miss[1]),
+                    "first_token_ms_avg_cache_hit": _avg_ms(stats.hit[0], stats.hit[2]),
+                    "first_token_ms_avg_cache_miss": _avg_ms(stats.miss[0], stats.miss[2]),
+                }
+                for model, stats in sorted(self._models.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._models.clear()
+
+
+llm_usage = LLMUsageStats()
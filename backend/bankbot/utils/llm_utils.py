@@ -1,7 +1,28 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import ChatOpenAI
 from langchain_sambanova import ChatSambaNova
 from config import settings
 
+# HTTP/2 needs the h2 package; without it the shared clients speak HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# tool bindings kept per cached model (different frontend action sets, flags)
+BINDINGS_PER_MODEL = 4
+
 SAMBANOVA_MODELS = {
     "deepseek-r1": "DeepSeek-R1-0528",
     "deepseek-v3": "DeepSeek-V3-0324",
@@ -12,36 +33,217 @@ SAMBANOVA_MODELS = {
     "qwen3-32b": "Qwen3-32B",
 }
 
+
+class LLMClientRegistry:
+    """Chat model instances reused across graph steps, least recently used evicted first.
+
+    Every model shares one pair of httpx clients (HTTP/2 when available), so
+    the keep-alive connections to the provider stay warm between steps and
+    across users, whatever the key or sampling parameters.
+
+    The async client's connections belong to the event loop that used them.
+    When the registry is used from another loop (a script calling
+    ``asyncio.run`` per model), the async client and every model built on it
+    are dropped and rebuilt for the new loop.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._models: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        # the event loop the async client (and the cached models) belong to
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (id(model), tool ids, bind kwargs) -> (model, tools, bound runnable)
+        self._bound: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        # id(tool) -> (tool, OpenAI tool schema)
+        self._schemas: Dict[int, Tuple[object, dict]] = {}
+        self.bind_hits = 0
+        self.bind_misses = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_connections,
+            keepalive_expiry=settings.llm_http_keepalive_seconds,
+        )
+
+    def _check_loop(self):
+        """Forget the async client and its models if they belong to another event loop.
+
+        Called with the lock held. A client made outside any loop is adopted
+        by the first loop that uses it.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            # its pooled connections can't be used (or closed) from this loop
+            self._http_async_client = None
+            self._models.clear()
+            self._bound.clear()
+        self._loop = loop
+
+    def http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        with self._lock:
+            self._check_loop()
+            http2 = settings.llm_http2 and HTTP2_AVAILABLE
+            if self._http_client is None:
+                self._http_client = httpx.Client(http2=http2, limits=self._limits())
+            if self._http_async_client is None:
+                self._http_async_client = httpx.AsyncClient(http2=http2, limits=self._limits())
+            return self._http_client, self._http_async_client
+
+    def get(self, key: Tuple, factory: Callable[[], object]):
+        with self._lock:
+            self._check_loop()
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+        model = factory()
+        with self._lock:
+            # another caller may have built the same model meanwhile; keep the first
+            model = self._models.setdefault(key, model)
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+                self.evictions += 1
+            return model
+
+    def _schema(self, tool) -> dict:
+        entry = self._schemas.get(id(tool))
+        if entry is None or entry[0] is not tool:
+            entry = self._schemas[id(tool)] = (tool, convert_to_openai_tool(tool))
+        return entry[1]
+
+    def bind_tools(self, model, tools: List, **kwargs):
+        """``model.bind_tools(tools, **kwargs)``, reused while the model and tool objects are.
+
+        Each tool's schema is converted once per process and handed to
+        bind_tools ready-made, so a new model (another user's key) doesn't
+        convert again either.
+        """
+        key = (id(model), tuple(id(t) for t in tools), tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._bound.get(key)
+            # ids can be reused once an object is gone; the entry keeps its own alive
+            if entry is not None and entry[0] is model:
+                self._bound.move_to_end(key)
+                self.bind_hits += 1
+                return entry[2]
+            self.bind_misses += 1
+            schemas = [self._schema(t) for t in tools]
+        bound = model.bind_tools(schemas, **kwargs)
+        with self._lock:
+            self._bound[key] = (model, list(tools), bound)
+            while len(self._bound) > self.maxsize * BINDINGS_PER_MODEL:
+                self._bound.popitem(last=False)
+        return bound
+
+    async def aclose(self):
+        """Drop every model and close the shared HTTP clients (app shutdown)."""
+        with self._lock:
+            self._check_loop()
+            self._models.clear()
+            self._bound.clear()
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+            self._loop = None
+        if http_async_client is not None:
+            await http_async_client.aclose()
+        if http_client is not None:
+            http_client.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._models),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bind_hits": self.bind_hits,
+                "bind_misses": self.bind_misses,
+                "http2": bool(settings.llm_http2 and HTTP2_AVAILABLE),
+            }
+
+
+llm_clients = LLMClientRegistry(maxsize=settings.llm_client_cache_size)
+
+
+def bind_tools(llm, tools: List, **kwargs):
+    """Memoized ``llm.bind_tools``; see :meth:`LLMClientRegistry.bind_tools`."""
+    return llm_clients.bind_tools(llm, tools, **kwargs)
+
+
+def _fingerprint(api_key: Optional[str]) -> Optional[str]:
+    # the registry key never holds the key itself
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else None
+
+
+def _client_key(provider: str, model: str, api_key: Optional[str], params: dict) -> Tuple:
+    return provider, model, _fingerprint(api_key), tuple(sorted((k, repr(v)) for k, v in params.items()))
+
+
 def get_llm(model_name: str, openai_api_key: str = None, sambanova_api_key: str = None, **kwargs):
     # Determine which keys to use
-    
+
     if model_name not in SAMBANOVA_MODELS:
         # OpenAI
         api_key = openai_api_key if (settings.allow_user_keys and openai_api_key) else None
-        return ChatOpenAI(
-            model=settings.default_model, 
-            temperature=0, 
-            streaming=True,
-            api_key=api_key,
-            **kwargs
-        )
-    
+        params = {"temperature": 0, **kwargs}
+
+        def _build_openai():
+            http_client, http_async_client = llm_clients.http_clients()
+            return ChatOpenAI(
+                model=settings.default_model,
+                streaming=True,
+                api_key=api_key,
+                # custom http clients switch off the automatic default; keep usage on streamed chunks
+                stream_usage=True,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **params
+            )
+
+        return llm_clients.get(_client_key("openai", settings.default_model, api_key, params), _build_openai)
+
     is_reasoning = "r1" in model_name.lower()
     api_key = sambanova_api_key if (settings.allow_user_keys and sambanova_api_key) else None
-    
+
     # Default Sambanova settings if not overridden
     sambanova_kwargs = {
         "max_tokens": settings.sambanova_max_tokens,
         "temperature": settings.sambanova_reasoning_temperature if is_reasoning else 0,
         "top_p": settings.sambanova_reasoning_top_p if is_reasoning else settings.sambanova_standard_top_p,
+        # usage (incl. cached prompt tokens) on the last streamed chunk, for llm_usage
+        "stream_options": {"include_usage": True},
     }
-    
+
     # Update with any provided kwargs
     sambanova_kwargs.update(kwargs)
-    
-    return ChatSambaNova(
-        model=SAMBANOVA_MODELS[model_name],
-        streaming=True,
-        sambanova_api_key=api_key,
-        **sambanova_kwargs
+
+    def _build_sambanova():
+        http_client, http_async_client = llm_clients.http_clients()
+        return ChatSambaNova(
+            model=SAMBANOVA_MODELS[model_name],
+            streaming=True,
+            sambanova_api_key=api_key,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            **sambanova_kwargs
+        )
+
+    return llm_clients.get(
+        _client_key("sambanova", SAMBANOVA_MODELS[model_name], api_key, sambanova_kwargs), _build_sambanova
     )
@@ -0,0 +1,75 @@
+"""
+Tool-call throughput benchmark: sync (thread per call) vs async (AsyncEngine).
+
+Each simulated conversation issues the read calls a typical agent turn makes
+(balance, beneficiaries, transactions, pending transfers) against the
+database in DATABASE_URL, seeded with database/init.sql.
+
+Usage:
+    python benchmarks/bench_engine_modes.py
+    python benchmarks/bench_engine_modes.py --concurrency 50 200 --turns 5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+
+DEMO_USERS = [
+    "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11",
+    "b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22",
+    "c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33",
+]
+
+
+async def conversation(server: BankingMCPServer, turns: int) -> int:
+    """Simulate one conversation; returns the number of tool calls made."""
+    user_id = random.choice(DEMO_USERS)
+    calls = 0
+    for _ in range(turns):
+        await server.get_balance(user_id)
+        await server.get_beneficiaries(user_id)
+        await server.get_transactions(user_id, limit=10)
+        await server.get_pending_transfers(user_id)
+        calls += 4
+    return calls
+
+
+async def run(mode: str, concurrency: int, turns: int) -> dict:
+    # cache off: measure the database, not dictionary hits on the 3 demo users
+    server = BankingMCPServer(mode=mode, cache=UserReadCache(enabled=False))
+    # warm the pool so connection setup is not measured
+    await server.get_balance(DEMO_USERS[0])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(conversation(server, turns) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    calls = sum(results)
+    return {"mode": mode, "concurrency": concurrency, "calls": calls, "seconds": elapsed, "calls_per_sec": calls / elapsed}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--turns", type=int, default=3, help="Agent turns per conversation")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'concurrency':>12}{'calls':>10}{'seconds':>10}{'calls/s':>12}")
+    for concurrency in args.concurrency:
+        for mode in args.modes:
+            r = await run(mode, concurrency, args.turns)
+            print(f"{r['mode']:<8}{r['concurrency']:>12}{r['calls']:>10}{r['seconds']:>10.2f}{r['calls_per_sec']:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Export memory benchmark: fetch-all + encode vs BankingMCPServer.export_transactions.
+
+Builds --rows transactions for one user in a temporary SQLite file with the
+declared schema (no server needed), then measures peak traced memory for
+
+    list    get_transactions(limit=rows) then one NDJSON blob
+    stream  export_transactions(batch_size=...) drained into a file
+
+The streaming peak should stay roughly constant as --rows grows.
+
+Usage:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --rows 500000 --batch-size 2000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+
+from mcp.export import ndjson_chunk, write_export
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import accounts, metadata, transactions, users
+
+
+def build(url: str, rows: int) -> str:
+    engine = create_engine(url)
+    metadata.create_all(engine)
+    user_id, account_id = uuid.uuid4(), uuid.uuid4()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(users).values(id=user_id, name="Bench User", email="bench@example.com"))
+        conn.execute(insert(accounts).values(id=account_id, user_id=user_id, name="Bench", type="checking"))
+        for start in range(0, rows, 50_000):
+            conn.execute(insert(transactions), [
+                {
+                    "account_id": account_id,
+                    "type": "debit",
+                    "amount": Decimal(i % 5000) / 100 + 1,
+                    "category": "groceries",
+                    "description": f"Purchase {i}",
+                    "merchant_name": "Market",
+                    "reference_number": f"REF-{i}",
+                    "timestamp": now - timedelta(minutes=i),
+                }
+                for i in range(start, min(start + 50_000, rows))
+            ])
+    engine.dispose()
+    return str(user_id)
+
+
+async def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = await fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        user_id = build(str(engine.url), args.rows)
+        server = BankingMCPServer(mode="sync", sync_engine=engine)
+
+        async def fetch_all():
+            rows = await server.get_transactions(user_id, limit=args.rows)
+            return len(ndjson_chunk(rows))
+
+        async def stream():
+            chunks = server.export_transactions(user_id, "ndjson", batch_size=args.batch_size)
+            return await write_export(chunks, Path(tmp) / "export.ndjson")
+
+        results = [("list", *await measure(fetch_all)), ("stream", *await measure(stream))]
+        engine.dispose()
+
+    assert results[0][3] == results[1][3], "exports differ in size"
+    print(f"{'path':<8}{'s':>8}{'peak MB':>10}{'MB out':>9}")
+    for label, seconds, peak, size in results:
+        print(f"{label:<8}{seconds:>8.2f}{peak / 1e6:>10.1f}{size / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Bulk ingestion throughput: mcp.ingest (validate + COPY + bulk rollups).
+
+Writes a --rows CSV feed spread over --accounts throwaway accounts, loads it
+with mcp.ingest in one transaction and reports rows/s and rows/min. The
+bench user and everything it owns are removed at the end (Postgres only).
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --rows 5000000 --batch-size 100000 --format ndjson
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from sqlalchemy import text
+
+from mcp.db import engine
+from mcp.ingest import ingest, read_records
+
+CATEGORIES = ["groceries", "restaurants", "utilities", "transport", "shopping", ""]
+TYPES = ["debit"] * 7 + ["credit", "transfer_out", "transfer_in"]
+
+
+def write_feed(path: Path, fmt: str, rows: int, account_ids):
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=365)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(["account_id", "type", "amount", "category", "timestamp", "merchant_name"])
+        for _ in range(rows):
+            record = [
+                rng.choice(account_ids),
+                rng.choice(TYPES),
+                f"{rng.randint(1, 500000) / 100:.2f}",
+                rng.choice(CATEGORIES),
+                (start + timedelta(seconds=rng.randint(0, 365 * 86400))).isoformat(),
+                "Bench Merchant",
+            ]
+            if writer:
+                writer.writerow(record)
+            else:
+                keys = ("account_id", "type", "amount", "category", "timestamp", "merchant_name")
+                f.write(orjson.dumps(dict(zip(keys, record))).decode() + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench_ingest needs Postgres (COPY)")
+
+    user_id = str(uuid.uuid4())
+    account_ids = [str(uuid.uuid4()) for _ in range(args.accounts)]
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, name, email) VALUES (:id, 'Bench User', :email)"),
+            {"id": user_id, "email": f"bench-{user_id}@example.com"},
+        )
+        conn.execute(
+            text("INSERT INTO accounts (id, user_id, name, type) VALUES (:id, :user_id, :name, 'checking')"),
+            [{"id": a, "user_id": user_id, "name": f"Bench {i}"} for i, a in enumerate(account_ids)],
+        )
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / f"feed.{args.format}"
+            start = time.perf_counter()
+            write_feed(path, args.format, args.rows, account_ids)
+            print(f"wrote {args.rows:,} rows ({path.stat().st_size / 1e6:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                result = ingest(conn, read_records(path), batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+
+        assert result.rows == args.rows and not result.rejected_count
+        print(f"loaded {result.rows:,} rows in {result.batches} batches, {result.rollup_keys:,} rollup keys")
+        print(f"{elapsed:.2f}s  {result.rows / elapsed:,.0f} rows/s  {result.rows / elapsed * 60 / 1e6:.1f}M rows/min")
+    finally:
+        with engine.begin() as conn:
+            # accounts cascade to transactions and spend_daily_rollup
+            conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Deep-page benchmark for get_transactions_page: page latency by depth.
+
+Inserts --rows synthetic transactions (reference_number 'BENCH-...') spread
+over the demo user's accounts in DATABASE_URL, walks the cursor pages and
+times the pages at each --depths (median of --repeat runs):
+
+    join     the plain accounts JOIN transactions keyset query
+    lateral  one index range scan per account (what Postgres runs)
+
+then prints EXPLAIN ANALYZE of the deepest lateral page, which should show an
+Index Scan on idx_transactions_account_timestamp_id with the timestamp
+bound in its Index Cond. The benchmark rows are deleted at the end
+(Postgres only).
+
+Usage:
+    python benchmarks/bench_keyset_pages.py
+    python benchmarks/bench_keyset_pages.py --rows 2000000 --depths 1 100 10000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from mcp.cache import UserReadCache
+from mcp.db import engine
+from mcp.mcp_impl import BankingMCPServer, decode_cursor
+from mcp.schema import transactions
+
+USER_ID = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+PAGE = 50
+
+
+def seed(rows: int):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO transactions (account_id, type, amount, category, reference_number, timestamp)
+            SELECT a.id, 'debit', 1 + (g % 500), 'groceries', 'BENCH-' || g,
+                   NOW() - (g || ' minutes')::interval
+            FROM generate_series(1, :rows) g
+            JOIN LATERAL (
+                SELECT id FROM accounts WHERE user_id = :user_id ORDER BY id OFFSET (g % 2) LIMIT 1
+            ) a ON true
+        """), {"rows": rows, "user_id": USER_ID})
+        conn.execute(text("ANALYZE transactions"))
+
+
+def cleanup():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM transactions WHERE reference_number LIKE 'BENCH-%'"))
+
+
+def page_query(mode: str, cursor: str):
+    after_ts, after_id = decode_cursor(cursor)
+    conditions = [
+        transactions.c.timestamp <= after_ts,
+        (transactions.c.timestamp < after_ts) | ((transactions.c.timestamp == after_ts) & (transactions.c.id > after_id)),
+    ]
+    if mode == "lateral":
+        return BankingMCPServer._transactions_page_lateral(USER_ID, conditions, PAGE + 1)
+    return BankingMCPServer._transactions_query(USER_ID).where(*conditions).limit(PAGE + 1)
+
+
+async def cursors_at(depths):
+    server = BankingMCPServer(mode="sync", cache=UserReadCache(enabled=False))
+    found, cursor, depth = {}, None, 0
+    while depth < max(depths):
+        page = await server.get_transactions_page(USER_ID, limit=PAGE, cursor=cursor)
+        depth += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        if depth in depths:
+            found[depth] = cursor
+    return found
+
+
+def time_page(mode: str, cursor: str, repeat: int) -> float:
+    query = page_query(mode, cursor)
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(query).all()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    try:
+        cursors = asyncio.run(cursors_at(set(args.depths)))
+        print(f"{'page':>6}{'join ms':>10}{'lateral ms':>12}")
+        for depth, cursor in sorted(cursors.items()):
+            join_s = time_page("join", cursor, args.repeat)
+            lateral_s = time_page("lateral", cursor, args.repeat)
+            print(f"{depth:>6}{join_s * 1000:>10.2f}{lateral_s * 1000:>12.2f}")
+
+        deepest = cursors[max(cursors)]
+        query = page_query("lateral", deepest).compile(engine)
+        with engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN ANALYZE {query}", query.params).scalars().all()
+        print("\n".join(plan))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
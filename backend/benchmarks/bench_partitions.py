@@ -0,0 +1,155 @@
+"""
+Partition pruning benchmark: 3-month window queries on a heap vs monthly partitions.
+
+Fills two scratch tables with the same --rows synthetic transactions spread
+over --years of history and --accounts accounts:
+
+    heap         bench_tx_heap, one table (transactions before migration 004)
+    partitioned  bench_tx_part, PARTITION BY RANGE (timestamp), one partition
+                 per month created with mcp.partitions.ensure_partitions
+
+Both carry the indexes from init.sql. Two queries over the latest full three
+months are timed (median of --repeat runs):
+
+    page    one account's newest 50 rows in the window (get_transactions)
+    spend   SUM(amount) by category over the window for all accounts
+
+Partitions scanned comes from EXPLAIN. Both tables are dropped at the end
+unless --keep (Postgres only; generating 100M rows takes a while, use
+--rows 10000000 for a quick run).
+
+Usage:
+    python benchmarks/bench_partitions.py
+    python benchmarks/bench_partitions.py --rows 10000000 --repeat 5 --keep
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from mcp.db import engine
+from mcp.partitions import add_months, ensure_partitions, month_start
+
+TABLES = ("bench_tx_heap", "bench_tx_part")
+CHUNK = 5_000_000
+
+COLUMNS = """
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    account_id UUID NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    amount DECIMAL(15, 2) NOT NULL,
+    category VARCHAR(50),
+    timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (id, timestamp)
+"""
+
+QUERIES = {
+    "page": """
+        SELECT id, amount, category, timestamp FROM {table}
+        WHERE account_id = :account_id AND timestamp >= :start AND timestamp < :end
+        ORDER BY timestamp DESC, id LIMIT 50
+    """,
+    "spend": """
+        SELECT category, SUM(amount) FROM {table}
+        WHERE type IN ('debit', 'transfer_out') AND timestamp >= :start AND timestamp < :end
+        GROUP BY category
+    """,
+}
+
+
+def create(conn, rows: int, years: int, accounts: int, first_month: date, last_month: date):
+    conn.execute(text(f"CREATE TABLE bench_tx_heap ({COLUMNS})"))
+    conn.execute(text(f"CREATE TABLE bench_tx_part ({COLUMNS}) PARTITION BY RANGE (timestamp)"))
+    ensure_partitions(conn, since=first_month, through=last_month, table="bench_tx_part")
+
+    conn.execute(text("CREATE TEMPORARY TABLE bench_accounts AS SELECT uuid_generate_v4() AS id, n FROM generate_series(0, :n - 1) n"),
+                 {"n": accounts})
+    for start in range(0, rows, CHUNK):
+        count = min(CHUNK, rows - start)
+        conn.execute(text("""
+            INSERT INTO bench_tx_heap (account_id, type, amount, category, timestamp)
+            SELECT a.id,
+                   (ARRAY['debit','debit','debit','credit','transfer_out'])[1 + (g % 5)],
+                   ((g * 7919) % 500000) / 100.0 + 1,
+                   (ARRAY['groceries','restaurants','utilities','transport','shopping'])[1 + (g % 5)],
+                   CAST(:first AS timestamp) + random() * :days * INTERVAL '1 day'
+            FROM generate_series(:start, :stop) g
+            JOIN bench_accounts a ON a.n = g % :accounts
+        """), {"start": start, "stop": start + count - 1, "accounts": accounts,
+               "first": first_month, "days": (add_months(last_month, 1) - first_month).days})
+        print(f"  generated {start + count:,} rows", flush=True)
+    conn.execute(text("INSERT INTO bench_tx_part SELECT * FROM bench_tx_heap"))
+
+    for table in TABLES:
+        conn.execute(text(f"CREATE INDEX ON {table} (account_id, timestamp DESC, id)"))
+        conn.execute(text(f"CREATE INDEX ON {table} (timestamp)"))
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def partitions_scanned(conn, sql: str, params: dict) -> int:
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+
+    def count(node):
+        own = 1 if node.get("Relation Name", "").startswith("bench_tx") else 0
+        return own + sum(count(child) for child in node.get("Plans", []))
+
+    return count(plan[0]["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables for another run")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench_partitions needs Postgres")
+
+    last_month = month_start(date.today())
+    first_month = add_months(last_month, -12 * args.years + 1)
+    window = {"start": add_months(last_month, -3), "end": last_month}
+
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT to_regclass('bench_tx_part') IS NOT NULL")).scalar()
+        if not exists:
+            print(f"building {args.rows:,} rows x 2 tables ...")
+            start = time.perf_counter()
+            create(conn, args.rows, args.years, args.accounts, first_month, last_month)
+            print(f"built in {time.perf_counter() - start:.0f}s")
+
+    try:
+        with engine.connect() as conn:
+            account_id = conn.execute(text("SELECT account_id FROM bench_tx_heap LIMIT 1")).scalar()
+            params = {**window, "account_id": account_id}
+            print(f"window {window['start']} .. {window['end']}")
+            print(f"{'query':<8}{'table':<14}{'partitions':>11}{'median ms':>11}")
+            for name, template in QUERIES.items():
+                for table in TABLES:
+                    sql = template.format(table=table)
+                    timings = []
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        conn.execute(text(sql), params).all()
+                        timings.append(time.perf_counter() - start)
+                    scanned = partitions_scanned(conn, sql, params)
+                    print(f"{name:<8}{table:<14}{scanned:>11}{statistics.median(timings) * 1000:>11.1f}")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                for table in TABLES:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    main()
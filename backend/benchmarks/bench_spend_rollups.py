@@ -0,0 +1,113 @@
+"""
+Spend-by-category benchmark: raw SUM over transactions vs daily rollups.
+
+Seeds a throwaway user with --rows spending transactions spread over
+--days days (Postgres only, via generate_series), backfills its rollup, then
+times the legacy aggregate against the rollup query for a few date ranges
+and checks both return the same totals. The bench user is removed at the end.
+
+Usage:
+    python benchmarks/bench_spend_rollups.py
+    python benchmarks/bench_spend_rollups.py --rows 2000000 --repeat 10
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from mcp.db import engine
+from mcp.rollups import legacy_spend_query, rows_to_spend, spend_query
+
+SEED_SQL = """
+INSERT INTO transactions (account_id, type, amount, category, timestamp)
+SELECT :account_id,
+       CASE WHEN g % 10 = 0 THEN 'credit' WHEN g % 7 = 0 THEN 'transfer_out' ELSE 'debit' END,
+       ((g % 5000) + 1) / 100.0,
+       (ARRAY['groceries', 'restaurants', 'utilities', 'transport', 'shopping', NULL])[1 + g % 6],
+       NOW() - (g % (:days * 86400)) * INTERVAL '1 second'
+FROM generate_series(1, :rows) AS g
+"""
+
+BACKFILL_SQL = """
+INSERT INTO spend_daily_rollup (account_id, day, category, total)
+SELECT account_id, timestamp::date, COALESCE(category, ''), SUM(amount)
+FROM transactions
+WHERE account_id = :account_id AND type IN ('debit', 'transfer_out')
+GROUP BY 1, 2, 3
+"""
+
+
+def seed(conn, rows: int, days: int):
+    user_id, account_id = str(uuid.uuid4()), str(uuid.uuid4())
+    conn.execute(
+        text("INSERT INTO users (id, name, email) VALUES (:id, 'Bench User', :email)"),
+        {"id": user_id, "email": f"bench-{user_id}@example.com"},
+    )
+    conn.execute(
+        text("INSERT INTO accounts (id, user_id, name, type, balance) VALUES (:id, :user_id, 'Bench', 'checking', 0)"),
+        {"id": account_id, "user_id": user_id},
+    )
+    conn.execute(text(SEED_SQL), {"account_id": account_id, "rows": rows, "days": days})
+    conn.execute(text(BACKFILL_SQL), {"account_id": account_id})
+    conn.execute(text("ANALYZE transactions"))
+    conn.execute(text("ANALYZE spend_daily_rollup"))
+    return user_id
+
+
+def timed(conn, query, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = rows_to_spend(conn.execute(query))
+        best = min(best, time.perf_counter() - start)
+    return best, sorted(result, key=lambda r: r["category"] or "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions for the bench user")
+    parser.add_argument("--days", type=int, default=3 * 365, help="History the rows are spread over")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; best time is reported")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench_spend_rollups needs Postgres (generate_series)")
+
+    with engine.begin() as conn:
+        print(f"seeding {args.rows:,} transactions...")
+        user_id = seed(conn, args.rows, args.days)
+
+    now = datetime.utcnow()
+    ranges = {
+        "all time": (None, None),
+        "last 90 days": ((now - timedelta(days=90)).strftime("%Y-%m-%d"), None),
+        "partial days": ((now - timedelta(days=30, hours=5)).isoformat(), (now - timedelta(hours=3)).isoformat()),
+    }
+
+    try:
+        print(f"{'range':<16}{'legacy ms':>12}{'rollup ms':>12}{'speedup':>10}")
+        with engine.connect() as conn:
+            for label, (from_date, to_date) in ranges.items():
+                legacy_s, legacy = timed(conn, legacy_spend_query(user_id, from_date, to_date), args.repeat)
+                from_dt = datetime.fromisoformat(from_date) if from_date else None
+                to_dt = datetime.fromisoformat(to_date) if to_date else None
+                rollup_s, rolled = timed(conn, spend_query(user_id, from_dt, to_dt), args.repeat)
+
+                assert legacy == rolled, f"{label}: rollup result differs from legacy"
+                print(f"{label:<16}{legacy_s * 1000:>12.1f}{rollup_s * 1000:>12.1f}{legacy_s / rollup_s:>9.1f}x")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            # accounts cascade to transactions and spend_daily_rollup
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-step tool binding benchmark: rebuild + bind every step vs memoized binding.
+
+Each agent step needs the frontend actions turned into tools and every tool
+bound to the model. Times the CPU spent on that per step (no network; the
+model is never called):
+
+    rebuild  StructuredTool.from_function per action, then llm.bind_tools
+    cached   ToolManager.get_all_tools (cached per action set), then llm_utils.bind_tools
+
+Usage:
+    python benchmarks/bench_tool_binding.py
+    python benchmarks/bench_tool_binding.py --steps 2000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from langchain_openai import ChatOpenAI
+
+from bankbot.tool_manager import FRONTEND_TOOL_ALLOWLIST, ToolManager
+from bankbot.utils.llm_utils import LLMClientRegistry
+from mcp.mcp_tool import MCP_TOOLS
+
+STATE = {"copilotkit": {"actions": [{"name": name, "description": ""} for name in sorted(FRONTEND_TOOL_ALLOWLIST)]}}
+
+
+def best_of(repeat: int, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        out = fn()
+        best = min(best, time.process_time() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; best time is reported")
+    args = parser.parse_args()
+
+    llm = ChatOpenAI(model="gpt-4o", temperature=0)
+
+    def rebuild():
+        for _ in range(args.steps):
+            manager = ToolManager(MCP_TOOLS)  # fresh cache: the pre-memoization cost
+            bound = llm.bind_tools(manager.get_all_tools(STATE), parallel_tool_calls=False)
+        return bound
+
+    manager, registry = ToolManager(MCP_TOOLS), LLMClientRegistry()
+
+    def cached():
+        for _ in range(args.steps):
+            bound = registry.bind_tools(llm, manager.get_all_tools(STATE), parallel_tool_calls=False)
+        return bound
+
+    rebuild_s, slow = best_of(args.repeat, rebuild)
+    cached_s, fast = best_of(args.repeat, cached)
+    assert sorted(t["function"]["name"] for t in slow.kwargs["tools"]) == sorted(
+        t["function"]["name"] for t in fast.kwargs["tools"]
+    ), "bindings disagree"
+
+    print(f"{len(fast.kwargs['tools'])} tools, {args.steps} steps")
+    print(f"{'path':<9}{'us/step':>10}")
+    for label, seconds in (("rebuild", rebuild_s), ("cached", cached_s)):
+        print(f"{label:<9}{seconds / args.steps * 1e6:>10.1f}")
+    print(f"speedup {rebuild_s / cached_s:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
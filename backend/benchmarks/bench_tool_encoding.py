@@ -0,0 +1,101 @@
+"""
+Tool-result encoding benchmark: dict copies + json.dumps vs row mappings + orjson.
+
+Builds --rows transactions in an in-memory SQLite database with the declared
+schema (no server needed), fetches them once, then times turning the fetched
+rows into the JSON string a tool returns:
+
+    legacy  [dict(row._mapping) ...] then json.dumps(default=custom_serializer)
+    orjson  result.mappings().all() then mcp.encoding.dumps
+
+Usage:
+    python benchmarks/bench_tool_encoding.py
+    python benchmarks/bench_tool_encoding.py --rows 50000 --repeat 20
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert, select
+
+from mcp.encoding import dumps
+from mcp.schema import accounts, metadata, transactions, users
+
+
+def custom_serializer(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def build(rows: int):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    user_id, account_id = uuid.uuid4(), uuid.uuid4()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(users).values(id=user_id, name="Bench User", email="bench@example.com"))
+        conn.execute(insert(accounts).values(id=account_id, user_id=user_id, name="Bench", type="checking"))
+        conn.execute(insert(transactions), [
+            {
+                "account_id": account_id,
+                "type": "debit",
+                "amount": Decimal(i % 5000) / 100 + 1,
+                "category": "groceries",
+                "description": f"Purchase {i}",
+                "merchant_name": "Market",
+                "reference_number": f"REF-{i}",
+                "timestamp": now - timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ])
+    with engine.connect() as conn:
+        rows = conn.execute(select(transactions)).all()
+    engine.dispose()
+    return rows
+
+
+def best_of(repeat: int, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per path; best time is reported")
+    args = parser.parse_args()
+
+    rows = build(args.rows)
+
+    legacy_s, legacy = best_of(args.repeat, lambda: json.dumps(
+        {"transactions": [dict(row._mapping) for row in rows]}, default=custom_serializer
+    ))
+    fast_s, fast = best_of(args.repeat, lambda: dumps({"transactions": [row._mapping for row in rows]}))
+    assert json.loads(legacy) == json.loads(fast), "encoders disagree"
+
+    print(f"{'path':<8}{'ms':>10}{'rows/s':>14}")
+    for label, seconds in (("legacy", legacy_s), ("orjson", fast_s)):
+        print(f"{label:<8}{seconds * 1000:>10.2f}{args.rows / seconds:>14,.0f}")
+    print(f"speedup {legacy_s / fast_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
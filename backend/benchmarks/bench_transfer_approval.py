@@ -0,0 +1,121 @@
+"""
+Transfer approval latency under contention: TRANSFER_EXECUTION=statements vs procedure.
+
+Creates a throwaway user with --hot accounts, queues --transfers pending
+transfers between them and approves them all concurrently, so approvals
+queue up on the same account row locks. Reports p50/p99 approval latency
+per execution path (Postgres only; procedure needs migration 003).
+
+Usage:
+    python benchmarks/bench_transfer_approval.py
+    python benchmarks/bench_transfer_approval.py --transfers 2000 --hot 2 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from config import settings
+from mcp.cache import UserReadCache
+from mcp.db import engine
+from mcp.mcp_impl import BankingMCPServer
+
+
+def seed(hot: int, transfers: int):
+    user_id = str(uuid.uuid4())
+    account_ids = [str(uuid.uuid4()) for _ in range(hot)]
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, name, email) VALUES (:id, 'Bench User', :email)"),
+            {"id": user_id, "email": f"bench-{user_id}@example.com"},
+        )
+        conn.execute(
+            text("INSERT INTO accounts (id, user_id, name, type, balance) VALUES (:id, :user_id, :name, 'checking', 1000000)"),
+            [{"id": a, "user_id": user_id, "name": f"Bench {i}"} for i, a in enumerate(account_ids)],
+        )
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "from_id": account_ids[i % hot],
+                "to_id": account_ids[(i + 1) % hot],
+            }
+            for i in range(transfers)
+        ]
+        conn.execute(
+            text(
+                "INSERT INTO transfer_log (id, user_id, from_account_id, to_account_id, amount, status) "
+                "VALUES (:id, :user_id, :from_id, :to_id, 1.00, 'pending')"
+            ),
+            rows,
+        )
+    return user_id, [r["id"] for r in rows]
+
+
+def cleanup(user_id: str):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM transfer_log WHERE user_id = :id"), {"id": user_id})
+        conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+
+
+async def run(execution: str, args) -> dict:
+    settings.transfer_execution = execution
+    server = BankingMCPServer(mode="sync", cache=UserReadCache(enabled=False))
+    user_id, transfer_ids = seed(args.hot, args.transfers)
+    limit = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], []
+
+    async def approve(transfer_id):
+        async with limit:
+            start = time.perf_counter()
+            result = await server.approve_transfer(user_id, transfer_id)
+            latencies.append(time.perf_counter() - start)
+            if not result["success"]:
+                # e.g. a deadlock between opposite-direction transfers on the step-by-step path
+                failures.append(result["error"])
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(approve(t) for t in transfer_ids))
+        elapsed = time.perf_counter() - start
+    finally:
+        cleanup(user_id)
+
+    latencies.sort()
+    return {
+        "execution": execution,
+        "per_sec": len(latencies) / elapsed,
+        "failed": len(failures),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transfers", type=int, default=1000)
+    parser.add_argument("--hot", type=int, default=2, help="Accounts the transfers are spread over")
+    parser.add_argument("--concurrency", type=int, default=32, help="Approvals in flight at once")
+    parser.add_argument("--executions", nargs="+", default=["statements", "procedure"], choices=["statements", "procedure"])
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench_transfer_approval needs Postgres")
+
+    print(f"{'execution':<12}{'approvals/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for execution in args.executions:
+        r = await run(execution, args)
+        print(f"{r['execution']:<12}{r['per_sec']:>14.1f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['failed']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,7 +9,66 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "postgresql://localhost@127.0.0.1:5432/banking_demo"
-    
+    # "sync" runs each call on a worker thread, "async" uses an AsyncEngine (asyncpg)
+    database_mode: str = "sync"
+    # defaults to database_url with the async driver swapped in
+    async_database_url: Optional[str] = None
+    # optional read replica for read-only tools; writes always go to database_url
+    replica_database_url: Optional[str] = None
+    # after a write, that user's reads stay on the primary for this long (covers replica lag)
+    replica_read_after_write_seconds: float = 5.0
+
+    # Connection pool (applies to both the sync and async engine)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800  # seconds, -1 disables
+    # compare the live schema with mcp/schema.py at startup and refuse to start on drift
+    db_verify_schema: bool = False
+    # create upcoming transactions partitions and purge expired idempotency keys at
+    # startup; failures are logged and the app starts anyway
+    db_startup_maintenance: bool = True
+    # "statements" runs approve_transfer step by step from Python; "procedure" calls the
+    # execute_transfer() function (database/migrations/003) in one round trip, Postgres only
+    transfer_execution: str = "statements"
+    # > 0: approval only marks transfers approved and this many background workers
+    # execute them (mcp/transfer_queue.py); 0 executes inside the approving request
+    transfer_queue_workers: int = 0
+    transfer_queue_batch_size: int = 50  # approved transfers claimed per worker transaction
+    transfer_queue_poll_seconds: float = 1.0
+    # one connection per graph run, shared by its tool calls (mcp/run_scope.py). Each
+    # in-flight conversation then holds a connection through LLM think time, so only
+    # turn it on with db_pool_size + db_max_overflow above peak concurrent conversations
+    run_connection_reuse: bool = False
+    run_connection_idle_seconds: float = 120.0  # close scopes whose run never reached END
+    # display=true reads go straight to their frontend tool without another LLM turn
+    fused_display_enabled: bool = True
+    # let the model batch independent tool calls in one message; reads then run
+    # concurrently (at most tool_call_concurrency per step), writes one at a time
+    parallel_tool_calls: bool = False
+    tool_call_concurrency: int = 4
+    # monthly transactions partitions kept ready ahead of the current month (migrations/004)
+    transaction_partition_months_ahead: int = 3
+
+    # Per-method query timing (GET /stats/queries and OpenTelemetry spans)
+    query_stats_enabled: bool = True
+    query_stats_slowest: int = 5  # slowest statements kept per method
+    # EXPLAIN (ANALYZE, BUFFERS) a kept statement slower than this; None disables
+    query_stats_explain_min_ms: Optional[float] = 50.0
+
+    # Per-user read cache for balances and beneficiaries
+    cache_enabled: bool = True
+    cache_ttl_seconds: float = 30.0
+    cache_max_entries: int = 10_000
+    # account/beneficiary name -> id directory used by transfer proposals
+    name_cache_ttl_seconds: float = 300.0
+    # account_number -> account directory used by add_beneficiary
+    account_directory_max_entries: int = 100_000
+    account_directory_ttl_seconds: float = 3600.0
+    # stored proposal/approval results are replayed for this long, then purged at startup
+    idempotency_key_ttl_hours: float = 24.0
+
     # API Keys
     openai_api_key: Optional[str] = None
     sambanova_api_key: Optional[str] = None
@@ -25,6 +84,12 @@ class Settings(BaseSettings):
     
     # OpenAI
     default_model: str = "gpt-4o"
+
+    # get_llm reuses chat model instances (LRU) over shared keep-alive HTTP clients
+    llm_client_cache_size: int = 32
+    llm_http2: bool = True  # needs the h2 package
+    llm_http_max_connections: int = 100
+    llm_http_keepalive_seconds: float = 120.0
     
     # Transfer Limits
     max_transfer_amount: float = 1_000_000.0  # AED
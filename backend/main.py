@@ -41,12 +41,13 @@ else:
 
 LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
 
+import asyncio
 from collections import defaultdict
 from datetime import datetime, timedelta
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import text
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -56,6 +57,17 @@ from ag_ui_langgraph import add_langgraph_fastapi_endpoint
 from copilotkit import LangGraphAGUIAgent
 from bankbot.graph import graph
 from mcp.mcp_impl import engine
+from mcp.db import get_pool_stats
+from mcp.query_stats import query_stats
+from mcp.schema import check_schema
+from mcp.partitions import ensure_partitions
+from mcp.mcp_tool import mcp_server
+from mcp.transfer_queue import TransferWorkerPool
+from mcp.run_scope import run_scopes
+from mcp.export import EXPORT_FORMATS
+from bankbot.utils.agent_utils import validate_user_id
+from bankbot.utils.llm_utils import llm_clients
+from bankbot.utils.llm_usage import llm_usage
 
 
 app = FastAPI(title="Chatbot for Learning")
@@ -82,6 +94,43 @@ add_langgraph_fastapi_endpoint(
     path="/bankbot",
 )
 
+transfer_workers = TransferWorkerPool.from_settings(mcp_server)
+
+def _ensure_partitions():
+    with engine.begin() as conn:
+        return ensure_partitions(conn)
+
+
+async def run_startup_maintenance():
+    """Partitions ahead and the idempotency purge; never blocks or aborts startup."""
+    try:
+        created = await asyncio.to_thread(_ensure_partitions)
+        if created:
+            logger.info(f"Created transactions partitions: {', '.join(created)}")
+        purged = await mcp_server.purge_idempotency_keys()
+        if purged:
+            logger.info(f"Purged {purged} expired idempotency keys")
+    except Exception as e:
+        logger.warning(f"Startup maintenance skipped, database unavailable? {type(e).__name__}: {e}")
+
+
+@app.on_event("startup")
+async def verify_database_schema():
+    if settings.db_verify_schema:
+        check_schema(engine)
+    if settings.db_startup_maintenance:
+        await run_startup_maintenance()
+    if settings.transfer_queue_workers > 0:
+        transfer_workers.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    await transfer_workers.stop()
+    await run_scopes.close_all()
+    await llm_clients.aclose()
+
+
 # manual rate limiting for /bankbot since the endpoint is created internaly
 bankbot_requests = defaultdict(list)
 
@@ -130,6 +179,79 @@ async def health_check(request: Request):
         )
 
 
+@app.get("/stats/pool")
+@limiter.limit("60/minute")
+async def pool_stats(request: Request):
+    """Connection pool usage and checkout wait times, for sizing the pool."""
+    return get_pool_stats()
+
+
+@app.get("/stats/cache")
+@limiter.limit("60/minute")
+async def cache_stats(request: Request):
+    """Hit/miss counters for the read cache, the name and account directories and LLM clients."""
+    return {
+        **mcp_server.cache.stats(),
+        "names": mcp_server.name_cache.stats(),
+        "account_directory": mcp_server.account_directory.stats(),
+        "llm_clients": llm_clients.stats(),
+    }
+
+
+@app.get("/stats/queries")
+@limiter.limit("60/minute")
+async def query_stats_report(request: Request):
+    """Per-method latency, statements, rows and checkout wait, with the slowest plans."""
+    return query_stats.snapshot()
+
+
+@app.get("/stats/llm")
+@limiter.limit("60/minute")
+async def llm_usage_report(request: Request):
+    """Per-model token usage, prompt-cache hit ratio and latency with vs without a cache hit."""
+    return llm_usage.snapshot()
+
+
+
+def _export_response(chunks, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{"csv" if fmt == "csv" else "ndjson"}"'},
+    )
+
+
+def _check_export_args(user_id: str, format: str):
+    if validate_user_id(user_id) == "invalid":
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(EXPORT_FORMATS)}")
+
+
+@app.get("/export/transactions")
+@limiter.limit("5/minute")
+async def export_transactions(
+    request: Request,
+    user_id: str,
+    format: str = "ndjson",
+    from_date: str = None,
+    to_date: str = None,
+    category: str = None,
+):
+    """Full transaction history, streamed from a server-side cursor."""
+    _check_export_args(user_id, format)
+    chunks = mcp_server.export_transactions(user_id, format, from_date, to_date, category)
+    return _export_response(chunks, format, "transactions")
+
+
+@app.get("/export/transfers")
+@limiter.limit("5/minute")
+async def export_transfers(request: Request, user_id: str, format: str = "ndjson"):
+    """Full transfer history, streamed from a server-side cursor."""
+    _check_export_args(user_id, format)
+    return _export_response(mcp_server.export_transfer_history(user_id, format), format, "transfers")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""Per-user read-through cache for BankingMCPServer reads."""
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from cachetools import TTLCache
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# invalidation generations outlive their user's entries by at least this long,
+# far longer than any load, so a load racing an invalidation still sees the bump
+GENERATION_MIN_TTL_SECONDS = 300.0
+
+
+class UserReadCache:
+    """TTL + LRU bounded cache keyed by ``(user_id, kind)``.
+
+    Writes call :meth:`invalidate` for every user they touch. Each user has a
+    generation counter that invalidation bumps; a load that started before the
+    bump is not stored, so a read racing a write can never put stale data back
+    and users always read their own writes. Generations are themselves TTL
+    bounded: once a user's entries have expired there is nothing left to
+    protect, so the counter can go too.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 30.0, enabled: bool = True):
+        self.enabled = enabled and ttl > 0 and maxsize > 0
+        self._entries = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 0.001))
+        generation_ttl = max(ttl, GENERATION_MIN_TTL_SECONDS)
+        self._generations: Dict[str, int] = TTLCache(maxsize=max(maxsize, 1), ttl=generation_ttl)
+        self._kinds = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_settings(cls) -> "UserReadCache":
+        return cls(
+            maxsize=settings.cache_max_entries,
+            ttl=settings.cache_ttl_seconds,
+            enabled=settings.cache_enabled,
+        )
+
+    def _lookup(self, key: Tuple[str, str]) -> Tuple[bool, Any, int]:
+        with self._lock:
+            generation = self._generations.get(key[0], 0)
+            if key in self._entries:
+                self.hits += 1
+                return True, self._entries[key], generation
+            self.misses += 1
+            return False, None, generation
+
+    def _store(self, key: Tuple[str, str], value: Any, generation: int):
+        with self._lock:
+            if self._generations.get(key[0], 0) == generation:
+                self._entries[key] = value
+                self._kinds.add(key[1])
+
+    async def get_or_load(self, user_id: str, kind: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, or await ``loader()`` and cache its result."""
+        if not self.enabled:
+            return await loader()
+
+        key = (str(user_id), kind)
+        found, value, generation = self._lookup(key)
+        if found:
+            return value
+
+        value = await loader()
+        self._store(key, value, generation)
+        return value
+
+    def invalidate(self, *user_ids: Optional[str]):
+        """Drop every cached read for these users."""
+        with self._lock:
+            for user_id in user_ids:
+                if user_id is None:
+                    continue
+                user_id = str(user_id)
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+                for kind in self._kinds:
+                    self._entries.pop((user_id, kind), None)
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "ttl_seconds": self._entries.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+class DirectoryEntry(NamedTuple):
+    account_id: Any
+    user_id: Any
+
+
+class AccountDirectory:
+    """Process-wide ``account_number -> (account id, owner)`` map, TTL + LRU bounded.
+
+    Account numbers are immutable once issued, so entries never go stale
+    through the app's own writes. Closing an account is not one of them:
+    callers re-check ``accounts.is_active`` by primary key in their own
+    transaction and :meth:`invalidate` the number when it is closed.
+    Renumbering outside the app should also call :meth:`invalidate` (or
+    wait out the TTL). Misses are not cached, so a newly opened account
+    resolves immediately.
+    """
+
+    def __init__(self, maxsize: int = 100_000, ttl: float = 3600.0, enabled: bool = True):
+        self.enabled = enabled and ttl > 0 and maxsize > 0
+        self._entries = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 0.001))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "AccountDirectory":
+        return cls(
+            maxsize=settings.account_directory_max_entries,
+            ttl=settings.account_directory_ttl_seconds,
+            enabled=settings.cache_enabled,
+        )
+
+    def get(self, account_number: str) -> Optional[DirectoryEntry]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(account_number)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, account_number: str, account_id, user_id) -> DirectoryEntry:
+        entry = DirectoryEntry(account_id, user_id)
+        if self.enabled:
+            with self._lock:
+                self._entries[account_number] = entry
+        return entry
+
+    def invalidate(self, *account_numbers: str):
+        with self._lock:
+            for account_number in account_numbers:
+                self._entries.pop(account_number, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
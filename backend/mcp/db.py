@@ -0,0 +1,200 @@
+"""Database engines used by the banking MCP server."""
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from config import settings
+from mcp.query_stats import install as install_query_stats, record_checkout
+
+logger = logging.getLogger(__name__)
+
+# sync driver -> async driver for the same backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+# libpq-only query params asyncpg does not understand
+LIBPQ_ONLY_PARAMS = {"channel_binding", "sslmode"}
+
+# how many recent checkout waits to keep for percentiles
+WAIT_SAMPLE_SIZE = 1000
+
+
+def to_async_url(url: str) -> URL:
+    """Translate a sync database URL into the equivalent async-driver URL."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        # already async (or unknown), use as-is
+        return parsed
+
+    query = dict(parsed.query)
+    if driver == "postgresql+asyncpg":
+        sslmode = query.get("sslmode")
+        query = {k: v for k, v in query.items() if k not in LIBPQ_ONLY_PARAMS}
+        if sslmode:
+            query["ssl"] = sslmode
+
+    return parsed.set(drivername=driver, query=query)
+
+
+def engine_options(url) -> dict:
+    """Pool settings from config; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+class PoolMonitor:
+    """Checkout wait times and timeouts for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, engine: Engine) -> dict:
+        pool = engine.pool
+        with self._lock:
+            recent = sorted(self._recent)
+            stats = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "wait_ms_avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_p95": round(recent[int(len(recent) * 0.95) - 1] * 1000, 3) if recent else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+        # QueuePool-style pools only; StaticPool/NullPool have no sizing
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        stats["checked_out"] = stats.pop("checkedout", None)
+        stats["checked_in"] = stats.pop("checkedin", None)
+        return stats
+
+
+_monitors: "weakref.WeakKeyDictionary[Engine, PoolMonitor]" = weakref.WeakKeyDictionary()
+_monitors_lock = threading.Lock()
+
+
+def get_pool_monitor(engine: Engine) -> PoolMonitor:
+    with _monitors_lock:
+        monitor = _monitors.get(engine)
+        if monitor is None:
+            monitor = _monitors[engine] = PoolMonitor()
+        return monitor
+
+
+def connect(engine: Engine) -> Connection:
+    """``engine.connect()`` with the pool checkout wait recorded."""
+    monitor = get_pool_monitor(engine)
+    start = time.perf_counter()
+    try:
+        conn = engine.connect()
+    except exc.TimeoutError:
+        monitor.record_timeout()
+        raise
+    wait = time.perf_counter() - start
+    monitor.record_wait(wait)
+    record_checkout(wait)
+    return conn
+
+
+async def connect_async(async_engine: AsyncEngine) -> AsyncConnection:
+    """Async counterpart of :func:`connect`."""
+    monitor = get_pool_monitor(async_engine.sync_engine)
+    start = time.perf_counter()
+    try:
+        conn = await async_engine.connect().start()
+    except exc.TimeoutError:
+        monitor.record_timeout()
+        raise
+    wait = time.perf_counter() - start
+    monitor.record_wait(wait)
+    record_checkout(wait)
+    return conn
+
+
+install_query_stats()
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Lazily create the process-wide AsyncEngine (only needed in async mode)."""
+    global _async_engine
+    if _async_engine is None:
+        url = settings.async_database_url or to_async_url(settings.database_url)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        logger.info(f"Created async engine ({make_url(url).drivername})")
+    return _async_engine
+
+
+_replica_engine: Optional[Engine] = None
+_async_replica_engine: Optional[AsyncEngine] = None
+
+
+def get_replica_engine() -> Optional[Engine]:
+    """Lazily create the read-replica engine; None when no replica is configured."""
+    global _replica_engine
+    if _replica_engine is None and settings.replica_database_url:
+        url = settings.replica_database_url
+        _replica_engine = create_engine(url, **engine_options(url))
+        logger.info(f"Created replica engine ({make_url(url).drivername})")
+    return _replica_engine
+
+
+def get_async_replica_engine() -> Optional[AsyncEngine]:
+    """Async counterpart of :func:`get_replica_engine`."""
+    global _async_replica_engine
+    if _async_replica_engine is None and settings.replica_database_url:
+        url = to_async_url(settings.replica_database_url)
+        _async_replica_engine = create_async_engine(url, **engine_options(url))
+        logger.info(f"Created async replica engine ({url.drivername})")
+    return _async_replica_engine
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Live pool statistics for every engine this process has created."""
+    stats = {"primary": get_pool_monitor(engine).snapshot(engine)}
+    if _async_engine is not None:
+        stats["async"] = get_pool_monitor(_async_engine.sync_engine).snapshot(_async_engine.sync_engine)
+    if _replica_engine is not None:
+        stats["replica"] = get_pool_monitor(_replica_engine).snapshot(_replica_engine)
+    if _async_replica_engine is not None:
+        stats["async_replica"] = get_pool_monitor(_async_replica_engine.sync_engine).snapshot(_async_replica_engine.sync_engine)
+    return stats
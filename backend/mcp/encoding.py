@@ -0,0 +1,31 @@
+"""JSON encoding for tool results.
+
+orjson serializes dicts, lists, str/int/float, UUID, date and datetime in C.
+Only ``Decimal`` and SQLAlchemy rows reach the Python ``default`` hook, so
+read methods can hand back ``RowMapping`` objects and skip building
+intermediate dicts.
+"""
+from decimal import Decimal
+
+import orjson
+from sqlalchemy.engine import Row, RowMapping
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Row):
+        obj = obj._mapping
+    if isinstance(obj, RowMapping):
+        # keys can be quoted_name, a str subclass orjson rejects as a dict key
+        return {str(key): value for key, value in obj.items()}
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def dumps_bytes(obj) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+def dumps(obj) -> str:
+    """Serialize a tool result; same JSON values as ``json.dumps`` with the old serializer."""
+    return dumps_bytes(obj).decode()
@@ -0,0 +1,56 @@
+"""Incremental CSV / NDJSON encoding for full-history exports.
+
+``BankingMCPServer.export_transactions`` and ``export_transfer_history``
+yield one encoded chunk per fetched partition; these helpers turn a
+partition of row mappings into bytes, and :func:`write_export` drains an
+export into a file. Nothing here holds more than one partition.
+"""
+import csv
+import io
+from datetime import date, datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional, Sequence
+
+from mcp.encoding import dumps_bytes
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# rows fetched (and encoded) per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+def ndjson_chunk(rows: Sequence) -> bytes:
+    return b"".join(dumps_bytes(row) + b"\n" for row in rows)
+
+
+def csv_chunk(rows: Sequence, columns: Optional[Sequence[str]] = None) -> bytes:
+    """CSV lines for ``rows``, preceded by a header when ``columns`` is given."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if columns is not None:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, (datetime, date)) else value
+            for value in row.values()
+        ])
+    return buffer.getvalue().encode()
+
+
+def encode_chunk(fmt: str, rows: Sequence, columns: Optional[Sequence[str]] = None) -> bytes:
+    if fmt == "csv":
+        return csv_chunk(rows, columns)
+    return ndjson_chunk(rows)
+
+
+async def write_export(chunks: AsyncIterator[bytes], path: Path) -> int:
+    """Write an export to ``path`` chunk by chunk; returns the bytes written."""
+    written = 0
+    with open(path, "wb") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    return written
@@ -0,0 +1,306 @@
+"""Bulk transaction ingestion from CSV or NDJSON statement feeds.
+
+Rows are validated against the ``transactions`` CHECK constraints in
+database/init.sql and the owning account, sorted by account within each
+batch and streamed into Postgres with ``COPY``. Spend rollups are summed in
+memory and applied with one ``INSERT ... ON CONFLICT`` at the end, so
+derived tables cost one statement per load rather than one per row. The
+whole file loads in one transaction: either every accepted row lands or
+none does.
+
+Balances are not touched: feed rows are history, the same as the seed
+transactions in init.sql. Other dialects (the SQLite tests) get a plain
+executemany insert instead of COPY.
+
+Usage (from the backend directory):
+    python -m mcp.ingest statements.csv
+    python -m mcp.ingest feed.ndjson --batch-size 100000 --skip-invalid
+"""
+import argparse
+import csv
+import io
+import logging
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import Column, Date, MetaData, Numeric, String, Table, insert, select, text
+
+from mcp.partitions import ensure_partitions, is_partitioned
+from mcp.rollups import SPEND_TYPES, UNCATEGORIZED, record_spend
+from mcp.schema import GUID, accounts, spend_daily_rollup, transactions
+from shared.models import TransactionType
+
+logger = logging.getLogger(__name__)
+
+# CHECK constraints from database/init.sql
+TRANSACTION_TYPES = frozenset(t.value for t in TransactionType)
+TRANSACTION_STATUSES = frozenset({"pending", "completed", "failed", "cancelled"})
+# DECIMAL(15, 2)
+MAX_AMOUNT = Decimal("9999999999999.99")
+
+# COPY column order; id and created_at come from server defaults
+COLUMNS = (
+    "account_id", "type", "amount", "currency", "category", "description",
+    "merchant_name", "reference_number", "status", "timestamp",
+)
+# VARCHAR limits from init.sql
+MAX_LENGTHS = {"category": 50, "merchant_name": 100, "reference_number": 50}
+
+DEFAULT_BATCH_SIZE = 50_000
+# rejected rows kept for the report; the rest are only counted
+MAX_REJECTS_KEPT = 1000
+
+
+class IngestError(ValueError):
+    """A feed row that fails validation; ``line`` is 1-based within the file."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class IngestResult:
+    rows: int = 0
+    batches: int = 0
+    # the first MAX_REJECTS_KEPT errors; rejected_count has them all
+    rejected: List[IngestError] = field(default_factory=list)
+    rejected_count: int = 0
+    rollup_keys: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_records(path: Path, fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """Yield ``(line, record)`` from a CSV (with header) or NDJSON file."""
+    fmt = fmt or ("ndjson" if path.suffix in (".ndjson", ".jsonl") else "csv")
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            # header is line 1
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield line, record
+        elif fmt == "ndjson":
+            for line, raw in enumerate(f, start=1):
+                if raw.strip():
+                    try:
+                        yield line, orjson.loads(raw)
+                    except orjson.JSONDecodeError as e:
+                        yield line, {"__error__": f"invalid JSON: {e}"}
+        else:
+            raise ValueError(f"Unknown format: {fmt}")
+
+
+def _text(record: dict, name: str, line: int) -> Optional[str]:
+    value = record.get(name)
+    if value is None or value == "":
+        return None
+    value = str(value)
+    limit = MAX_LENGTHS.get(name)
+    if limit and len(value) > limit:
+        raise IngestError(line, f"{name} longer than {limit} characters")
+    return value
+
+
+def validate_record(line: int, record: dict, account_currencies: Dict[str, str]) -> tuple:
+    """One feed record -> a row tuple in ``COLUMNS`` order; raises IngestError."""
+    if "__error__" in record:
+        raise IngestError(line, record["__error__"])
+
+    account_id = record.get("account_id")
+    account_currency = account_currencies.get(account_id)
+    if account_currency is None:
+        # not in canonical form (upper case, no hyphens, ...)
+        try:
+            account_id = str(uuid.UUID(str(account_id)))
+        except ValueError:
+            raise IngestError(line, f"account_id is not a UUID: {account_id!r}")
+        account_currency = account_currencies.get(account_id)
+        if account_currency is None:
+            raise IngestError(line, f"unknown account_id {account_id!r}")
+
+    tx_type = record.get("type")
+    if tx_type not in TRANSACTION_TYPES:
+        raise IngestError(line, f"type must be one of {sorted(TRANSACTION_TYPES)}, got {tx_type!r}")
+
+    status = record.get("status") or "completed"
+    if status not in TRANSACTION_STATUSES:
+        raise IngestError(line, f"status must be one of {sorted(TRANSACTION_STATUSES)}, got {status!r}")
+
+    currency = record.get("currency") or account_currency
+    if currency != account_currency:
+        raise IngestError(line, f"currency {currency!r} does not match account currency {account_currency!r}")
+
+    try:
+        amount = Decimal(str(record.get("amount")))
+    except InvalidOperation:
+        raise IngestError(line, f"amount is not a number: {record.get('amount')!r}")
+    if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT or amount.as_tuple().exponent < -2:
+        raise IngestError(line, f"amount must be positive with at most 2 decimals, got {record.get('amount')!r}")
+
+    try:
+        timestamp = datetime.fromisoformat(str(record.get("timestamp")))
+    except ValueError:
+        raise IngestError(line, f"timestamp is not ISO 8601: {record.get('timestamp')!r}")
+    if timestamp.tzinfo is not None:
+        # the column is TIMESTAMP WITHOUT TIME ZONE, in UTC
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return (
+        account_id, tx_type, amount, currency,
+        _text(record, "category", line), _text(record, "description", line),
+        _text(record, "merchant_name", line), _text(record, "reference_number", line),
+        status, timestamp,
+    )
+
+
+def _copy_value(value) -> str:
+    """Encode one value for COPY ... FORMAT text."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    value = str(value)
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        value = value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return value
+
+
+def _copy_rows(conn, rows: List[tuple]):
+    buffer = io.StringIO()
+    buffer.writelines("\t".join(_copy_value(v) for v in row) + "\n" for row in rows)
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY transactions ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT text)", buffer)
+    finally:
+        cursor.close()
+
+
+def _insert_rows(conn, rows: List[tuple]):
+    conn.execute(insert(transactions), [dict(zip(COLUMNS, row)) for row in rows])
+
+
+def _apply_rollups(conn, deltas: Dict[tuple, Decimal]):
+    """One bulk upsert of the summed spend per (account, day, category)."""
+    if not deltas:
+        return
+    if conn.dialect.name != "postgresql":
+        for (account_id, day, category), total in deltas.items():
+            record_spend(conn, account_id, day, category, total)
+        return
+
+    staging = Table(
+        "spend_rollup_staging", MetaData(),
+        Column("account_id", GUID), Column("day", Date),
+        Column("category", String(50)), Column("total", Numeric(18, 2)),
+        prefixes=["TEMPORARY"],
+    )
+    staging.create(conn)
+    conn.execute(insert(staging), [
+        {"account_id": a, "day": d, "category": c, "total": t} for (a, d, c), t in deltas.items()
+    ])
+    conn.execute(text(f"""
+        INSERT INTO {spend_daily_rollup.name} (account_id, day, category, total)
+        SELECT account_id, day, category, total FROM spend_rollup_staging
+        ON CONFLICT (account_id, day, category)
+        DO UPDATE SET total = {spend_daily_rollup.name}.total + EXCLUDED.total
+    """))
+    staging.drop(conn)
+
+
+def ingest(conn, records: Iterable[Tuple[int, dict]], batch_size: int = DEFAULT_BATCH_SIZE,
+           skip_invalid: bool = False) -> IngestResult:
+    """Validate and load ``records`` inside the caller's transaction.
+
+    Raises the first IngestError unless ``skip_invalid``, in which case bad
+    rows are counted in ``result.rejected_count`` (the first
+    ``MAX_REJECTS_KEPT`` kept in ``result.rejected``) and the rest still load.
+    """
+    start = time.perf_counter()
+    result = IngestResult()
+    write = _copy_rows if conn.dialect.name == "postgresql" else _insert_rows
+    # historical feeds get their own month partitions rather than filling the default
+    partitioned = is_partitioned(conn)
+    account_currencies = {
+        str(row.id): row.currency for row in conn.execute(select(accounts.c.id, accounts.c.currency))
+    }
+    deltas: Dict[tuple, Decimal] = defaultdict(Decimal)
+    batch: List[tuple] = []
+
+    def flush():
+        if partitioned:
+            timestamps = [row[9] for row in batch]
+            ensure_partitions(conn, since=min(timestamps).date(), through=max(timestamps).date())
+        # account-ordered batches land in (account_id, timestamp) index order
+        batch.sort(key=lambda row: (row[0], row[9]))
+        write(conn, batch)
+        result.rows += len(batch)
+        result.batches += 1
+        batch.clear()
+
+    for line, record in records:
+        try:
+            row = validate_record(line, record, account_currencies)
+        except IngestError as e:
+            if not skip_invalid:
+                raise
+            result.rejected_count += 1
+            if len(result.rejected) < MAX_REJECTS_KEPT:
+                result.rejected.append(e)
+            continue
+
+        batch.append(row)
+        if row[1] in SPEND_TYPES:
+            deltas[(row[0], row[9].date(), row[4] or UNCATEGORIZED)] += row[2]
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    _apply_rollups(conn, deltas)
+    result.rollup_keys = len(deltas)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults from the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per COPY")
+    parser.add_argument("--skip-invalid", action="store_true", help="Load valid rows and report the rest")
+    args = parser.parse_args(argv)
+
+    from mcp.db import engine
+
+    try:
+        with engine.begin() as conn:
+            result = ingest(conn, read_records(args.path, args.format), args.batch_size, args.skip_invalid)
+    except IngestError as e:
+        print(f"Rejected {args.path}: {e}; nothing was loaded", file=sys.stderr)
+        return 1
+
+    for error in result.rejected[:20]:
+        print(f"skipped {error}", file=sys.stderr)
+    if result.rejected_count > 20:
+        print(f"... and {result.rejected_count - 20:,} more", file=sys.stderr)
+    print(
+        f"Loaded {result.rows:,} rows in {result.batches} batches, {result.rejected_count:,} skipped, "
+        f"{result.rollup_keys:,} rollup keys updated in {result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,305 @@
 import os
 import uuid
+import hashlib
+import base64
 import asyncio
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import create_engine, select, text, MetaData, insert, update, and_, func
-from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy import select, text, insert, update, delete, and_, or_, func, true
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import logging
 
+import orjson
+from cachetools import TTLCache
+
 from config import settings
 from shared.models import TransferStatus, TransactionType, APIError
+from mcp.db import engine, get_async_engine, get_replica_engine, get_async_replica_engine, connect, connect_async
+from mcp.cache import AccountDirectory, UserReadCache
+from mcp.query_stats import count_rows, query_stats
+from mcp.run_scope import current_run_scope
+from mcp.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, encode_chunk
+from mcp.encoding import dumps, dumps_bytes
+from mcp.schema import users, accounts, transactions, beneficiaries, transfer_log, idempotency_keys
+from mcp.rollups import legacy_spend_query, parse_bound, record_spend, rows_to_spend, spend_query
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(settings.database_url)
-metadata = MetaData()
+# largest transactions page a tool call may ask for
+MAX_PAGE_SIZE = 100
+
+
+def check_page_limit(limit: int) -> int:
+    """``limit`` if it is a valid page size (1..MAX_PAGE_SIZE); raises ValueError otherwise."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}, got {limit}")
+    return limit
+
+
+def _timestamp_bound(value):
+    """A typed datetime bind where the bound parses; the raw value otherwise."""
+    try:
+        return parse_bound(value)
+    except ValueError:
+        return value
+
+
+def encode_cursor(timestamp: datetime, row_id) -> str:
+    """Opaque keyset cursor for the row at (timestamp, id)."""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
 
-try:
-    metadata.reflect(bind=engine)
-    users = metadata.tables['users']
-    accounts = metadata.tables['accounts']
-    transactions = metadata.tables['transactions']
-    beneficiaries = metadata.tables['beneficiaries']
-    transfer_log = metadata.tables['transfer_log']
-except Exception as e:
-    logger.error(f"Failed to connect to database or load schema: {e}")
-    logger.error(f"Database URL: {settings.database_url}")
-    raise RuntimeError(f"Database initialization failed. Please ensure the database is running and tables are created. Error: {e}") from e
+
+def _canonical_uuid(value) -> Optional[str]:
+    """Canonical string form of a UUID, or None if ``value`` isn't one."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def _idempotency_key(key: str, args: dict) -> str:
+    """``key`` plus a fingerprint of the call's arguments.
+
+    A reused or colliding tool call id with different arguments (another
+    transfer_id, another amount) is then a different key and runs, instead
+    of getting the first call's stored result back.
+    """
+    fingerprint = hashlib.sha256(dumps_bytes(dict(sorted(args.items())))).hexdigest()[:16]
+    return f"{key}:{fingerprint}"
+
+
+def _stored_result_reader(user_id: str, tool: str, key: str):
+    """``fn(conn)`` returning the stored idempotent result for this key, or None."""
+    where = and_(
+        idempotency_keys.c.user_id == user_id,
+        idempotency_keys.c.tool == tool,
+        idempotency_keys.c.key == key,
+    )
+
+    def _stored_result(conn):
+        stored = conn.execute(select(idempotency_keys.c.result).where(where)).scalar()
+        return None if stored is None else orjson.loads(stored)
+
+    return _stored_result
 
 
 class BankingMCPServer:
     """This is not like a real MCP. Just simlates it """
-    
-    async def get_balance(self, user_id: str) -> List[dict]:
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        sync_engine=None,
+        async_engine=None,
+        cache: Optional[UserReadCache] = None,
+        replica_engine=None,
+        async_replica_engine=None,
+        name_cache: Optional[UserReadCache] = None,
+        account_directory: Optional[AccountDirectory] = None,
+        queue_transfers: Optional[bool] = None,
+    ):
+        # "sync" (thread per call) or "async" (AsyncEngine), see settings.database_mode
+        self.mode = mode or settings.database_mode
+        if self.mode not in ("sync", "async"):
+            raise ValueError(f"Unknown database mode: {self.mode}")
+        self._sync_engine = sync_engine
+        self._async_engine = async_engine
+        # reads go here when settings.replica_database_url (or an explicit engine) is set
+        self._replica_engine = replica_engine
+        self._async_replica_engine = async_replica_engine
+        # balances and beneficiaries; every write below invalidates the users it touches
+        self.cache = cache if cache is not None else UserReadCache.from_settings()
+        # account_number -> (account id, owner) for add_beneficiary
+        self.account_directory = account_directory if account_directory is not None else AccountDirectory.from_settings()
+        # name -> id directory for proposals; only beneficiary writes change it
+        self.name_cache = name_cache if name_cache is not None else UserReadCache(
+            maxsize=settings.cache_max_entries,
+            ttl=settings.name_cache_ttl_seconds,
+            enabled=self.cache.enabled,
+        )
+        # approval only marks transfers approved; a TransferWorkerPool executes them
+        self.queue_transfers = settings.transfer_queue_workers > 0 if queue_transfers is None else queue_transfers
+        # set by TransferWorkerPool.start() so approvals can wake it up
+        self.transfer_workers = None
+        # users who wrote recently; their reads stay on the primary until replicas catch up
+        self._recent_writers = TTLCache(
+            maxsize=max(settings.cache_max_entries, 1),
+            ttl=max(settings.replica_read_after_write_seconds, 0.001),
+        )
+
+    def _engine_for(self, write: bool, user_id: Optional[str]):
+        """Primary for writes and recent writers, otherwise the replica if there is one."""
+        use_replica = not write and user_id is not None and str(user_id) not in self._recent_writers
+        if self.mode == "async":
+            replica = use_replica and (self._async_replica_engine or get_async_replica_engine())
+            return replica or self._async_engine or get_async_engine()
+        replica = use_replica and (self._replica_engine or get_replica_engine())
+        return replica or self._sync_engine or engine
+
+    def _after_write(self, *user_ids: Optional[str]):
+        """Drop cached reads and pin these users' reads to the primary for a while."""
+        self.cache.invalidate(*user_ids)
+        for user_id in user_ids:
+            if user_id is not None:
+                self._recent_writers[str(user_id)] = True
+
+    async def _run(self, fn, write: bool = False, user_id: Optional[str] = None):
+        """Run ``fn(conn)`` on a pooled connection; ``write`` wraps it in a transaction.
+
+        In sync mode the call goes to a worker thread. In async mode the same
+        function runs on the event loop through ``AsyncConnection.run_sync``,
+        so no executor thread is held while waiting on the database.
+
+        Reads for ``user_id`` may be served by the replica; writes always use
+        the primary and keep that user's reads there for a short window.
+
+        Query stats are recorded under ``fn``'s name minus ``_sync_``, so
+        name it after the public method.
+        """
+        target = self._engine_for(write, user_id)
+        try:
+            with query_stats.track(fn.__name__.removeprefix("_sync_"), write=write) as call:
+                result = await self._run_on(target, fn, write)
+                call.rows = count_rows(result)
+                return result
+        finally:
+            if write:
+                self._after_write(user_id)
+
+    async def _run_once(self, fn, user_id: str, idempotency_key: Optional[str], args: dict):
+        """``_run(fn, write=True)`` at most once per (user, method, key, arguments).
+
+        The first result is stored in ``idempotency_keys`` in the same
+        transaction as the write. A repeat with the same key gets it back
+        before anything else is read or locked, so a retried or replayed
+        tool call neither inserts another proposal nor moves money twice.
+        Without a key this is a plain write.
+        """
+        if idempotency_key is None:
+            return await self._run(fn, write=True, user_id=user_id)
+
+        tool = fn.__name__.removeprefix("_sync_")
+        idempotency_key = _idempotency_key(idempotency_key, args)
+        _stored_result = _stored_result_reader(user_id, tool, idempotency_key)
+
+        def _once(conn):
+            stored = _stored_result(conn)
+            if stored is not None:
+                return stored
+            result = fn(conn)
+            conn.execute(
+                insert(idempotency_keys).values(user_id=user_id, tool=tool, key=idempotency_key, result=dumps(result))
+            )
+            return result
+
+        # stats stay under the wrapped method's name
+        _once.__name__ = fn.__name__
+        try:
+            return await self._run(_once, write=True, user_id=user_id)
+        except IntegrityError:
+            # a concurrent call with the same key committed first; this one rolled back
+            stored = await self._run(_stored_result, write=True, user_id=user_id)
+            if stored is None:
+                raise
+            return stored
+
+    async def _replay(self, tool: str, user_id: str, idempotency_key: Optional[str], args: dict):
+        """The result :meth:`_run_once` stored for this call, or None on a first call.
+
+        Methods that read before their write (name resolution) check this
+        first, so a replay returns the original result even if those names
+        have since changed. The read goes to the primary, where the stored
+        result is committed.
+        """
+        if idempotency_key is None:
+            return None
+        fn = _stored_result_reader(user_id, tool, _idempotency_key(idempotency_key, args))
+        with query_stats.track("idempotency_replay") as call:
+            stored = await self._run_on(self._engine_for(True, user_id), fn, write=False)
+            call.rows = count_rows(stored)
+            return stored
+
+    async def purge_idempotency_keys(self, older_than_hours: Optional[float] = None) -> int:
+        """Delete stored results older than ``settings.idempotency_key_ttl_hours``."""
+        hours = settings.idempotency_key_ttl_hours if older_than_hours is None else older_than_hours
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+
+        def _sync_purge_idempotency_keys(conn):
+            return conn.execute(delete(idempotency_keys).where(idempotency_keys.c.created_at < cutoff)).rowcount
+
+        return await self._run(_sync_purge_idempotency_keys, write=True)
+
+    async def _run_on(self, target, fn, write: bool):
+        scope = current_run_scope()
+        if scope is not None:
+            async with scope.lease(target) as conn:
+                if conn is not None:
+                    return await self._run_on_connection(conn, fn, write)
+
+        if self.mode == "async":
+            conn = await connect_async(target)
+            try:
+                if write:
+                    async with conn.begin():
+                        return await conn.run_sync(fn)
+                return await conn.run_sync(fn)
+            finally:
+                await conn.close()
+
+        def _sync_call():
+            with connect(target) as conn:
+                if write:
+                    with conn.begin():
+                        return fn(conn)
+                return fn(conn)
+
+        return await asyncio.to_thread(_sync_call)
+
+    async def _run_on_connection(self, conn, fn, write: bool):
+        """Like _run_on, on a connection the current run holds across calls.
+
+        Reads are rolled back afterwards so the connection never sits idle
+        inside a transaction between tool calls.
+        """
+        if self.mode == "async":
+            if write:
+                async with conn.begin():
+                    return await conn.run_sync(fn)
+            try:
+                return await conn.run_sync(fn)
+            finally:
+                await conn.rollback()
+
+        def _sync_call():
+            if write:
+                with conn.begin():
+                    return fn(conn)
+            try:
+                return fn(conn)
+            finally:
+                conn.rollback()
+
+        return await asyncio.to_thread(_sync_call)
+
+    async def get_balance(self, user_id: str) -> List[RowMapping]:
         """Get all account balances for a user."""
-        def _sync_get_balance():
-            with engine.connect() as conn:
-                result = conn.execute(
-                    select(accounts).where(
-                        and_(accounts.c.user_id == user_id, accounts.c.is_active == True)
-                    )
-                )
-                return [self._row_to_dict(row) for row in result]
+        def _sync_get_balance(conn):
+            result = conn.execute(self._balance_query(user_id))
+            return result.mappings().all()
         
-        return await asyncio.to_thread(_sync_get_balance)
+        return await self.cache.get_or_load(user_id, "balance", lambda: self._run(_sync_get_balance, user_id=user_id))
 
     async def get_transactions(
         self,
@@ -52,32 +309,113 @@ class BankingMCPServer:
         category: str = None,
         limit: int = 10,
         offset: int = 0
-    ) -> List[dict]:
-        """Get transaction history with optional filters."""
-        def _sync_get_transactions():
-            query = select(
-                transactions,
-                accounts.c.name.label('account_name')
-            ).select_from(
-                transactions.join(accounts, transactions.c.account_id == accounts.c.id)
-            ).where(
-                accounts.c.user_id == user_id
-            )
+    ) -> List[RowMapping]:
+        """Get transaction history with optional filters (OFFSET paging, see get_transactions_page)."""
+        def _sync_get_transactions(conn):
+            query = self._transactions_query(user_id, from_date, to_date, category)
+            query = query.limit(limit).offset(offset)
             
-            if from_date:
-                query = query.where(transactions.c.timestamp >= from_date)
-            if to_date:
-                query = query.where(transactions.c.timestamp <= to_date)
-            if category:
-                query = query.where(transactions.c.category == category)
-            
-            query = query.order_by(transactions.c.timestamp.desc()).limit(limit).offset(offset)
-            
-            with engine.connect() as conn:
-                result = conn.execute(query)
-                return [dict(row._mapping) for row in result]
+            result = conn.execute(query)
+            return result.mappings().all()
+
+        return await self._run(_sync_get_transactions, user_id=user_id)
+
+    async def get_transactions_page(
+        self,
+        user_id: str,
+        from_date: str = None,
+        to_date: str = None,
+        category: str = None,
+        limit: int = 10,
+        cursor: str = None
+    ) -> dict:
+        """Keyset-paginated transaction history.
+
+        Returns ``{"transactions": [...], "next_cursor": str | None}``. Pass
+        ``next_cursor`` back to get the following page; it encodes the last
+        row's ``(timestamp, id)``, so rows inserted meanwhile do not shift
+        pages. Raises ValueError for a bad cursor or a limit outside
+        1..MAX_PAGE_SIZE.
+
+        On Postgres each of the user's accounts is read through a LATERAL
+        subquery: an ``idx_transactions_account_timestamp_id`` range scan that
+        starts at the cursor (``timestamp <= after_ts`` is the index bound, the
+        OR only settles ties) and stops after ``limit + 1`` rows. The pages
+        are merged by account, so a page costs the same however deep it is.
+        """
+        check_page_limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+
+        def _sync_get_transactions_page(conn):
+            conditions = self._transaction_filters(from_date, to_date, category)
+            if after:
+                after_ts, after_id = after
+                # ORDER BY timestamp DESC, id ASC
+                conditions += [
+                    transactions.c.timestamp <= after_ts,
+                    or_(
+                        transactions.c.timestamp < after_ts,
+                        and_(transactions.c.timestamp == after_ts, transactions.c.id > after_id)
+                    ),
+                ]
+            # one extra row tells us whether another page exists
+            if conn.dialect.name == "postgresql":
+                query = self._transactions_page_lateral(user_id, conditions, limit + 1)
+            else:
+                query = self._transactions_query(user_id).where(*conditions).limit(limit + 1)
+            return conn.execute(query).mappings().all()
+
+        rows = await self._run(_sync_get_transactions_page, user_id=user_id)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+        return {"transactions": rows, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _transaction_filters(from_date: str = None, to_date: str = None, category: str = None) -> list:
+        # plain comparisons on the bare column so Postgres prunes monthly partitions
+        conditions = []
+        if from_date:
+            conditions.append(transactions.c.timestamp >= _timestamp_bound(from_date))
+        if to_date:
+            conditions.append(transactions.c.timestamp <= _timestamp_bound(to_date))
+        if category:
+            conditions.append(transactions.c.category == category)
+        return conditions
 
-        return await asyncio.to_thread(_sync_get_transactions)
+    @classmethod
+    def _transactions_query(cls, user_id: str, from_date: str = None, to_date: str = None, category: str = None):
+        query = select(
+            transactions,
+            accounts.c.name.label('account_name')
+        ).select_from(
+            transactions.join(accounts, transactions.c.account_id == accounts.c.id)
+        ).where(
+            accounts.c.user_id == user_id,
+            *cls._transaction_filters(from_date, to_date, category)
+        )
+        
+        # id breaks timestamp ties so pages are stable
+        return query.order_by(transactions.c.timestamp.desc(), transactions.c.id.asc())
+
+    @staticmethod
+    def _transactions_page_lateral(user_id: str, conditions: list, limit: int):
+        """Top ``limit`` rows per account of the user, one index range scan each, merged."""
+        user_accounts = select(accounts.c.id, accounts.c.name).where(accounts.c.user_id == user_id).subquery("a")
+        per_account = (
+            select(transactions)
+            .where(transactions.c.account_id == user_accounts.c.id, *conditions)
+            .order_by(transactions.c.timestamp.desc(), transactions.c.id.asc())
+            .limit(limit)
+            .lateral("t")
+        )
+        return (
+            select(per_account, user_accounts.c.name.label("account_name"))
+            .select_from(user_accounts.join(per_account, true()))
+            .order_by(per_account.c.timestamp.desc(), per_account.c.id.asc())
+            .limit(limit)
+        )
 
     async def get_spend_by_category(
         self,
@@ -86,53 +424,80 @@ class BankingMCPServer:
         to_date: str = None
     ) -> List[dict]:
         """Get spending aggregated by category with optional date filters."""
-        def _sync_get_spend():
-            conditions = [
-                transactions.c.account_id.in_(
-                    select(accounts.c.id).where(accounts.c.user_id == user_id)
-                ),
-                transactions.c.type.in_(['debit', 'transfer_out'])
-            ]
-            
-            if from_date:
-                conditions.append(transactions.c.timestamp >= from_date)
-            if to_date:
-                conditions.append(transactions.c.timestamp <= to_date)
-            
-            query = select(
-                transactions.c.category,
-                text("SUM(amount) as total")
-            ).where(
-                and_(*conditions)
-            ).group_by(transactions.c.category)
-                
-            with engine.connect() as conn:
-                result = conn.execute(query)
-                return [{"category": row.category, "total": float(row.total)} for row in result]
+        try:
+            query = spend_query(user_id, parse_bound(from_date), parse_bound(to_date))
+        except ValueError:
+            # let the database interpret bounds we can't split into days
+            query = legacy_spend_query(user_id, from_date, to_date)
 
-        return await asyncio.to_thread(_sync_get_spend)
+        def _sync_get_spend_by_category(conn):
+            return rows_to_spend(conn.execute(query))
 
+        return await self._run(_sync_get_spend_by_category, user_id=user_id)
 
-    async def get_beneficiaries(self, user_id: str) -> List[dict]:
-        def _sync_get_beneficiaries():
-            query = select(
-                beneficiaries.c.id,
-                beneficiaries.c.nickname,
-                beneficiaries.c.account_number,
-                beneficiaries.c.bank_name,
-                beneficiaries.c.is_internal,
-                users.c.name.label('beneficiary_name')
-            ).select_from(
-                beneficiaries.outerjoin(users, beneficiaries.c.beneficiary_user_id == users.c.id)
-            ).where(
-                and_(beneficiaries.c.user_id == user_id, beneficiaries.c.is_active == True)
-            )
-            
-            with engine.connect() as conn:
-                result = conn.execute(query)
-                return [dict(row._mapping) for row in result]
 
-        return await asyncio.to_thread(_sync_get_beneficiaries)
+    async def get_beneficiaries(self, user_id: str) -> List[RowMapping]:
+        def _sync_get_beneficiaries(conn):
+            result = conn.execute(self._beneficiaries_query(user_id))
+            return result.mappings().all()
+
+        return await self.cache.get_or_load(user_id, "beneficiaries", lambda: self._run(_sync_get_beneficiaries, user_id=user_id))
+
+    async def get_account_snapshot(self, user_id: str) -> dict:
+        """Accounts, active beneficiaries and pending transfers on one connection.
+
+        Feeds the transfer form in a single tool call instead of get_balance
+        followed by get_beneficiaries. Cached like balances; every write for
+        the user drops it.
+        """
+        def _sync_get_account_snapshot(conn):
+            return {
+                "accounts": conn.execute(self._balance_query(user_id)).mappings().all(),
+                "beneficiaries": conn.execute(self._beneficiaries_query(user_id)).mappings().all(),
+                "pending_transfers": conn.execute(
+                    self._pending_transfers_query(),
+                    {"user_id": user_id, "status": TransferStatus.PENDING.value}
+                ).mappings().all(),
+            }
+
+        return await self.cache.get_or_load(user_id, "snapshot", lambda: self._run(_sync_get_account_snapshot, user_id=user_id))
+
+    @staticmethod
+    def _balance_query(user_id: str):
+        return select(accounts).where(
+            and_(accounts.c.user_id == user_id, accounts.c.is_active == True)
+        )
+
+    @staticmethod
+    def _beneficiaries_query(user_id: str):
+        return select(
+            beneficiaries.c.id,
+            beneficiaries.c.nickname,
+            beneficiaries.c.account_number,
+            beneficiaries.c.bank_name,
+            beneficiaries.c.is_internal,
+            users.c.name.label('beneficiary_name')
+        ).select_from(
+            beneficiaries.outerjoin(users, beneficiaries.c.beneficiary_user_id == users.c.id)
+        ).where(
+            and_(beneficiaries.c.user_id == user_id, beneficiaries.c.is_active == True)
+        )
+
+    @staticmethod
+    def _pending_transfers_query():
+        """Takes :user_id and :status."""
+        return text("""
+            SELECT 
+                t.id, t.amount, t.currency, t.description, t.created_at,
+                fa.name as from_account,
+                COALESCE(ta.name, b.nickname) as to_destination
+            FROM transfer_log t
+            JOIN accounts fa ON t.from_account_id = fa.id
+            LEFT JOIN accounts ta ON t.to_account_id = ta.id
+            LEFT JOIN beneficiaries b ON t.to_beneficiary_id = b.id
+            WHERE t.user_id = :user_id AND t.status = :status
+            ORDER BY t.created_at DESC
+        """)
 
     async def add_beneficiary(
         self,
@@ -140,163 +505,236 @@ class BankingMCPServer:
         account_number: str,
         nickname: str
     ) -> dict:
-      
-        def _sync_add_beneficiary():
-            account_map = {
-                'PDB-ALICE-001': ('a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11'),
-                'PDB-BOB-001': ('b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22'),
-                'PDB-CAROL-001': ('c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'c1eebc99-9c0b-4ef8-bb6d-6bb9bd380c33'),
-            }
-            
-            if account_number not in account_map:
-                return {"success": False, "error": f"Account {account_number} not found. Valid accounts: PDB-ALICE-001, PDB-BOB-001, PDB-CAROL-001"}
-            
-            beneficiary_user_id, beneficiary_account_id = account_map[account_number]
-            
-            if beneficiary_user_id == user_id:
-                return {"success": False, "error": "Cannot add yourself as a beneficiary"}
-            
-            with engine.begin() as conn:
-                existing = conn.execute(
-                    select(beneficiaries).where(
-                        and_(
-                            beneficiaries.c.user_id == user_id,
-                            beneficiaries.c.account_number == account_number
-                        )
+        def _sync_add_beneficiary(conn):
+            target = self.account_directory.get(account_number)
+            if target is None:
+                # unique index on accounts.account_number
+                target = conn.execute(
+                    select(accounts.c.id, accounts.c.user_id).where(
+                        and_(accounts.c.account_number == account_number, accounts.c.is_active == True)
                     )
                 ).first()
-                
-                if existing and existing.is_active:
-                    return {"success": False, "error": f"Beneficiary '{existing.nickname}' already exists"}
-                
-                if existing and not existing.is_active:
-                    conn.execute(
-                        update(beneficiaries)
-                        .where(beneficiaries.c.id == existing.id)
-                        .values(
-                            is_active=True,
-                            nickname=nickname,
-                            updated_at=datetime.utcnow()
-                        )
+                if target is None:
+                    return {"success": False, "error": f"Account {account_number} not found"}
+                target = self.account_directory.put(account_number, target.id, target.user_id)
+            else:
+                # the directory only saves the number lookup; whether the account is
+                # still open is checked here, by primary key, in this transaction
+                active = conn.execute(
+                    select(accounts.c.is_active).where(accounts.c.id == target.account_id)
+                ).scalar()
+                if not active:
+                    self.account_directory.invalidate(account_number)
+                    return {"success": False, "error": f"Account {account_number} not found"}
+
+            beneficiary_account_id, beneficiary_user_id = target
+            if str(beneficiary_user_id) == str(user_id):
+                return {"success": False, "error": "Cannot add yourself as a beneficiary"}
+
+            existing = conn.execute(
+                select(beneficiaries).where(
+                    and_(
+                        beneficiaries.c.user_id == user_id,
+                        beneficiaries.c.account_number == account_number
                     )
-                    return {"success": True, "beneficiary_id": str(existing.id), "message": f"Beneficiary '{nickname}' reactivated successfully"}
+                )
+            ).first()
                 
-                new_id = str(uuid.uuid4())
+            if existing and existing.is_active:
+                return {"success": False, "error": f"Beneficiary '{existing.nickname}' already exists"}
+                
+            if existing and not existing.is_active:
                 conn.execute(
-                    insert(beneficiaries).values(
-                        id=new_id,
-                        user_id=user_id,
-                        beneficiary_user_id=beneficiary_user_id,
-                        beneficiary_account_id=beneficiary_account_id,
+                    update(beneficiaries)
+                    .where(beneficiaries.c.id == existing.id)
+                    .values(
+                        is_active=True,
                         nickname=nickname,
-                        account_number=account_number,
-                        bank_name=settings.bank_name,
-                        is_internal=True
+                        updated_at=datetime.utcnow()
                     )
                 )
+                return {"success": True, "beneficiary_id": str(existing.id), "message": f"Beneficiary '{nickname}' reactivated successfully"}
+                
+            new_id = str(uuid.uuid4())
+            conn.execute(
+                insert(beneficiaries).values(
+                    id=new_id,
+                    user_id=user_id,
+                    beneficiary_user_id=beneficiary_user_id,
+                    beneficiary_account_id=beneficiary_account_id,
+                    nickname=nickname,
+                    account_number=account_number,
+                    bank_name=settings.bank_name,
+                    is_internal=True
+                )
+            )
                 
-                return {"success": True, "beneficiary_id": new_id, "message": f"Beneficiary '{nickname}' added successfully"}
+            return {"success": True, "beneficiary_id": new_id, "message": f"Beneficiary '{nickname}' added successfully"}
 
-        return await asyncio.to_thread(_sync_add_beneficiary)
+        try:
+            return await self._run(_sync_add_beneficiary, write=True, user_id=user_id)
+        finally:
+            self.name_cache.invalidate(user_id)
 
 
     async def remove_beneficiary(self, user_id: str, beneficiary_id: str) -> dict:
         """Soft delete a beneficiary."""
-        def _sync_remove_beneficiary():
-            with engine.begin() as conn:
-                result = conn.execute(
-                    update(beneficiaries)
-                    .where(and_(beneficiaries.c.id == beneficiary_id, beneficiaries.c.user_id == user_id))
-                    .values(is_active=False, updated_at=datetime.utcnow())
-                )
+        def _sync_remove_beneficiary(conn):
+            result = conn.execute(
+                update(beneficiaries)
+                .where(and_(beneficiaries.c.id == beneficiary_id, beneficiaries.c.user_id == user_id))
+                .values(is_active=False, updated_at=datetime.utcnow())
+            )
                 
-                if result.rowcount == 0:
-                    return {"success": False, "error": "Beneficiary not found"}
+            if result.rowcount == 0:
+                return {"success": False, "error": "Beneficiary not found"}
                 
-                return {"success": True, "message": "Beneficiary removed successfully"}
+            return {"success": True, "message": "Beneficiary removed successfully"}
 
-        return await asyncio.to_thread(_sync_remove_beneficiary)
+        try:
+            return await self._run(_sync_remove_beneficiary, write=True, user_id=user_id)
+        finally:
+            self.name_cache.invalidate(user_id)
 
  
 
+    async def _resolve_names(self, user_id: str, account_names=(), nicknames=()) -> dict:
+        """Account names and beneficiary nicknames -> ids, matched case-insensitively.
+
+        Served from the user's cached name directory when every requested
+        name is in it. Otherwise (cache off, or a name created by another
+        process since the directory was cached) only the requested names are
+        looked up, through the lower() indexes.
+        """
+        account_keys = {name.lower() for name in account_names}
+        nickname_keys = {name.lower() for name in nicknames}
+        if self.name_cache.enabled:
+            directory = await self.name_cache.get_or_load(user_id, "names", lambda: self._load_names(user_id))
+            if account_keys <= directory["accounts"].keys() and nickname_keys <= directory["beneficiaries"].keys():
+                return directory
+        return await self._load_names(user_id, account_keys, nickname_keys)
+
+    async def _load_names(self, user_id: str, account_keys=None, nickname_keys=None) -> dict:
+        """All of the user's names, or only the given lower-cased ones."""
+        def _sync_resolve_names(conn):
+            account_query = select(
+                func.lower(accounts.c.name).label("key"), accounts.c.id, accounts.c.is_active
+            ).where(accounts.c.user_id == user_id).order_by(accounts.c.is_active)
+            if account_keys is not None:
+                account_query = account_query.where(func.lower(accounts.c.name).in_(account_keys))
+
+            beneficiary_query = select(
+                func.lower(beneficiaries.c.nickname).label("key"),
+                beneficiaries.c.id,
+                beneficiaries.c.nickname,
+                beneficiaries.c.beneficiary_account_id,
+            ).where(and_(beneficiaries.c.user_id == user_id, beneficiaries.c.is_active == True))
+            if nickname_keys is not None:
+                beneficiary_query = beneficiary_query.where(func.lower(beneficiaries.c.nickname).in_(nickname_keys))
+
+            # inactive accounts first so an active one wins a case-insensitive clash
+            return {
+                "accounts": {row.key: row for row in conn.execute(account_query)},
+                "beneficiaries": {row.key: row for row in conn.execute(beneficiary_query)},
+            }
+
+        return await self._run(_sync_resolve_names, user_id=user_id)
+
     async def propose_transfer(
         self,
         user_id: str,
         from_account_name: str,
         to_beneficiary_nickname: str,
         amount: float,
-        description: str = ""
+        description: str = "",
+        idempotency_key: Optional[str] = None
     ) -> dict:
-        def _sync_propose_transfer():
-            with engine.begin() as conn:
-                from_account = conn.execute(
-                    select(accounts).where(
+        args = {
+            "from_account_name": from_account_name,
+            "to_beneficiary_nickname": to_beneficiary_nickname,
+            "amount": amount,
+            "description": description,
+        }
+        # a replay returns what the first call did, whatever the names resolve to now
+        stored = await self._replay("propose_transfer", user_id, idempotency_key, args)
+        if stored is not None:
+            return stored
+
+        # names are resolved before the transaction, which then only reads by primary key
+        names = await self._resolve_names(user_id, [from_account_name], [to_beneficiary_nickname])
+        from_ref = names["accounts"].get(from_account_name.lower())
+        if from_ref is None or not from_ref.is_active:
+            return {"success": False, "error": f"Account '{from_account_name}' not found"}
+        beneficiary = names["beneficiaries"].get(to_beneficiary_nickname.lower())
+        if beneficiary is None:
+            return {"success": False, "error": f"Beneficiary '{to_beneficiary_nickname}' not found"}
+
+        def _sync_propose_transfer(conn):
+            beneficiary_active = select(beneficiaries.c.is_active).where(
+                and_(beneficiaries.c.id == beneficiary.id, beneficiaries.c.user_id == user_id)
+            ).scalar_subquery()
+            rows = conn.execute(
+                select(accounts, beneficiary_active.label("beneficiary_active")).where(
+                    or_(
                         and_(
+                            accounts.c.id == from_ref.id,
                             accounts.c.user_id == user_id,
-                            func.lower(accounts.c.name) == from_account_name.lower(),
                             accounts.c.is_active == True
-                        )
+                        ),
+                        accounts.c.id == beneficiary.beneficiary_account_id
                     )
-                ).first()
-                
-                if not from_account:
-                    return {"success": False, "error": f"Account '{from_account_name}' not found"}
-                
-                if from_account.balance < amount:
-                    return {"success": False, "error": f"Insufficient funds. Balance: {settings.default_currency} {from_account.balance}"}
-                
-                beneficiary = conn.execute(
-                    select(beneficiaries).where(
-                        and_(
-                            beneficiaries.c.user_id == user_id,
-                            func.lower(beneficiaries.c.nickname) == to_beneficiary_nickname.lower(),
-                            beneficiaries.c.is_active == True
-                        )
-                    )
-                ).first()
+                )
+            ).all()
+            by_id = {row.id: row for row in rows}
+            from_account = by_id.get(from_ref.id)
                 
-                if not beneficiary:
-                    return {"success": False, "error": f"Beneficiary '{to_beneficiary_nickname}' not found"}
+            if not from_account:
+                return {"success": False, "error": f"Account '{from_account_name}' not found"}
+
+            if not from_account.beneficiary_active:
+                # removed since the directory was cached
+                self.name_cache.invalidate(user_id)
+                return {"success": False, "error": f"Beneficiary '{to_beneficiary_nickname}' not found"}
                 
+            if from_account.balance < amount:
+                return {"success": False, "error": f"Insufficient funds. Balance: {settings.default_currency} {from_account.balance}"}
 
-                to_account = conn.execute(
-                    select(accounts).where(accounts.c.id == beneficiary.beneficiary_account_id)
-                ).first()
+            to_account = by_id.get(beneficiary.beneficiary_account_id)
                 
-                if not to_account:
-                    return {"success": False, "error": "Beneficiary account not found"}
+            if not to_account:
+                return {"success": False, "error": "Beneficiary account not found"}
                 
-                if from_account.currency != to_account.currency:
-                    return {
-                        "success": False, 
-                        "error": f"Currency mismatch: source account is {from_account.currency} but destination is {to_account.currency}"
-                    }
+            if from_account.currency != to_account.currency:
+                return {
+                    "success": False, 
+                    "error": f"Currency mismatch: source account is {from_account.currency} but destination is {to_account.currency}"
+                }
           
-                proposal_id = str(uuid.uuid4())
-                conn.execute(
-                    insert(transfer_log).values(
-                        id=proposal_id,
-                        user_id=user_id,
-                        from_account_id=from_account.id,
-                        to_account_id=beneficiary.beneficiary_account_id,
-                        to_beneficiary_id=beneficiary.id,
-                        amount=amount,
-                        description=description or f"Transfer to {beneficiary.nickname}",
-                        status=TransferStatus.PENDING.value
-                    )
+            proposal_id = str(uuid.uuid4())
+            conn.execute(
+                insert(transfer_log).values(
+                    id=proposal_id,
+                    user_id=user_id,
+                    from_account_id=from_account.id,
+                    to_account_id=beneficiary.beneficiary_account_id,
+                    to_beneficiary_id=beneficiary.id,
+                    amount=amount,
+                    description=description or f"Transfer to {beneficiary.nickname}",
+                    status=TransferStatus.PENDING.value
                 )
+            )
                 
-                return {
-                    "success": True,
-                    "proposal_id": proposal_id,
-                    "from_account": from_account.name,
-                    "to_beneficiary": beneficiary.nickname,
-                    "amount": amount,
-                    "currency": settings.default_currency,
-                    "message": "Transfer proposal created. Please approve to execute."
-                }
+            return {
+                "success": True,
+                "proposal_id": proposal_id,
+                "from_account": from_account.name,
+                "to_beneficiary": beneficiary.nickname,
+                "amount": amount,
+                "currency": settings.default_currency,
+                "message": "Transfer proposal created. Please approve to execute."
+            }
 
-        return await asyncio.to_thread(_sync_propose_transfer)
+        return await self._run_once(_sync_propose_transfer, user_id, idempotency_key, args)
 
     async def propose_internal_transfer(
         self,
@@ -304,278 +742,556 @@ class BankingMCPServer:
         from_account_name: str,
         to_account_name: str,
         amount: float,
-        description: str = ""
+        description: str = "",
+        idempotency_key: Optional[str] = None
     ) -> dict:
-        def _sync_propose_internal_transfer():
-            with engine.begin() as conn:
+        args = {
+            "from_account_name": from_account_name,
+            "to_account_name": to_account_name,
+            "amount": amount,
+            "description": description,
+        }
+        stored = await self._replay("propose_internal_transfer", user_id, idempotency_key, args)
+        if stored is not None:
+            return stored
 
-                from_account = conn.execute(
-                    select(accounts).where(
-                        and_(
-                            accounts.c.user_id == user_id,
-                            func.lower(accounts.c.name) == from_account_name.lower()
-                        )
+        names = await self._resolve_names(user_id, [from_account_name, to_account_name])
+        from_ref = names["accounts"].get(from_account_name.lower())
+        if from_ref is None:
+            return {"success": False, "error": f"Source account '{from_account_name}' not found"}
+        to_ref = names["accounts"].get(to_account_name.lower())
+        if to_ref is None:
+            return {"success": False, "error": f"Destination account '{to_account_name}' not found"}
+        if from_ref.id == to_ref.id:
+            return {"success": False, "error": "Cannot transfer to the same account"}
+
+        def _sync_propose_internal_transfer(conn):
+            rows = conn.execute(
+                select(accounts).where(
+                    and_(
+                        accounts.c.id.in_([from_ref.id, to_ref.id]),
+                        accounts.c.user_id == user_id
                     )
-                ).first()
+                )
+            ).all()
+            by_id = {row.id: row for row in rows}
+            from_account = by_id.get(from_ref.id)
+            to_account = by_id.get(to_ref.id)
                 
-                if not from_account:
-                    return {"success": False, "error": f"Source account '{from_account_name}' not found"}
+            if not from_account:
+                return {"success": False, "error": f"Source account '{from_account_name}' not found"}
                 
-                to_account = conn.execute(
-                    select(accounts).where(
-                        and_(
-                            accounts.c.user_id == user_id,
-                            func.lower(accounts.c.name) == to_account_name.lower()
-                        )
-                    )
-                ).first()
-                
-                if not to_account:
-                    return {"success": False, "error": f"Destination account '{to_account_name}' not found"}
+            if not to_account:
+                return {"success": False, "error": f"Destination account '{to_account_name}' not found"}
                 
-                if from_account.id == to_account.id:
-                    return {"success": False, "error": "Cannot transfer to the same account"}
+            if from_account.currency != to_account.currency:
+                return {
+                    "success": False,
+                    "error": f"Currency mismatch: {from_account.name} is {from_account.currency} but {to_account.name} is {to_account.currency}"
+                }
                 
-                if from_account.currency != to_account.currency:
-                    return {
-                        "success": False,
-                        "error": f"Currency mismatch: {from_account.name} is {from_account.currency} but {to_account.name} is {to_account.currency}"
-                    }
+            if from_account.balance < amount:
+                return {"success": False, "error": f"Insufficient funds. Balance: {from_account.currency} {from_account.balance}"}
                 
-                if from_account.balance < amount:
-                    return {"success": False, "error": f"Insufficient funds. Balance: {from_account.currency} {from_account.balance}"}
+            proposal_id = str(uuid.uuid4())
+            conn.execute(
+                insert(transfer_log).values(
+                    id=proposal_id,
+                    user_id=user_id,
+                    from_account_id=from_account.id,
+                    to_account_id=to_account.id,
+                    amount=amount,
+                    description=description or f"Internal transfer",
+                    status=TransferStatus.PENDING.value
+                )
+            )
                 
-                proposal_id = str(uuid.uuid4())
-                conn.execute(
-                    insert(transfer_log).values(
-                        id=proposal_id,
-                        user_id=user_id,
-                        from_account_id=from_account.id,
-                        to_account_id=to_account.id,
-                        amount=amount,
-                        description=description or f"Internal transfer",
-                        status=TransferStatus.PENDING.value
+            return {
+                "success": True,
+                "proposal_id": proposal_id,
+                "from_account": from_account.name,
+                "to_account": to_account.name,
+                "amount": amount,
+                "currency": settings.default_currency,
+                "message": "Transfer proposal created. Please approve to execute."
+            }
+
+        return await self._run_once(_sync_propose_internal_transfer, user_id, idempotency_key, args)
+
+    async def approve_transfer(self, user_id: str, transfer_id: str, idempotency_key: Optional[str] = None) -> dict:
+        # the recipient's balance changes too
+        touched_users = [user_id]
+
+        def _sync_approve_transfer(conn):
+            if self.queue_transfers:
+                queued = self._queue_transfers(conn, user_id, [transfer_id])
+                return self._queued_outcome(transfer_id) if queued else {
+                    "success": False, "error": "Transfer not found or already processed"
+                }
+
+            ref_number = self._reference_number()
+            if self._execute_in_database(conn):
+                return self._execute_transfer_in_database(conn, user_id, transfer_id, ref_number, touched_users)
+
+            transfer = conn.execute(
+                select(transfer_log).where(
+                    and_(
+                        transfer_log.c.id == transfer_id,
+                        transfer_log.c.user_id == user_id,
+                        transfer_log.c.status == TransferStatus.PENDING.value
                     )
                 )
+            ).first()
                 
-                return {
-                    "success": True,
-                    "proposal_id": proposal_id,
-                    "from_account": from_account.name,
-                    "to_account": to_account.name,
-                    "amount": amount,
-                    "currency": settings.default_currency,
-                    "message": "Transfer proposal created. Please approve to execute."
-                }
+            if not transfer:
+                return {"success": False, "error": "Transfer not found or already processed"}
 
-        return await asyncio.to_thread(_sync_propose_internal_transfer)
+            self._lock_accounts(conn, [transfer.from_account_id, transfer.to_account_id])
+            return self._execute_transfer(conn, transfer, ref_number, touched_users)
 
-    async def approve_transfer(self, user_id: str, transfer_id: str) -> dict:
-        def _sync_approve_transfer():
-            try:
-                with engine.begin() as conn:
-                    transfer = conn.execute(
-                        select(transfer_log).where(
-                            and_(
-                                transfer_log.c.id == transfer_id,
-                                transfer_log.c.user_id == user_id,
-                                transfer_log.c.status == TransferStatus.PENDING.value
-                            )
-                        )
-                    ).first()
-                    
-                    if not transfer:
-                        return {"success": False, "error": "Transfer not found or already processed"}
-                    
-                    from_account = conn.execute(
-                        select(accounts).where(accounts.c.id == transfer.from_account_id)
-                    ).first()
-                    
-                    to_account = conn.execute(
-                        select(accounts).where(accounts.c.id == transfer.to_account_id)
-                    ).first()
-                    
-
-                    if to_account and from_account.currency != to_account.currency:
-                        conn.execute(
-                            update(transfer_log)
-                            .where(transfer_log.c.id == transfer_id)
-                            .values(
-                                status=TransferStatus.FAILED.value,
-                                rejection_reason=f'Currency mismatch: {from_account.currency} vs {to_account.currency}'
-                            )
-                        )
-                        return {
-                            "success": False,
-                            "error": f"Currency mismatch: source is {from_account.currency} but destination is {to_account.currency}"
-                        }
-                    
-              
-                    deduct_result = conn.execute(
-                        update(accounts)
-                        .where(
-                            and_(
-                                accounts.c.id == transfer.from_account_id,
-                                accounts.c.balance >= transfer.amount  # Atomic check
-                            )
-                        )
-                        .values(
-                            balance=accounts.c.balance - transfer.amount,
-                            updated_at=datetime.utcnow()
+        try:
+            return await self._run_once(
+                _sync_approve_transfer, user_id, idempotency_key, {"transfer_id": str(transfer_id)}
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Transfer {transfer_id} failed, rolled back: {type(e).__name__}")
+            return {"success": False, "error": "Transfer failed, no funds moved"}
+        finally:
+            self._after_write(*touched_users)
+            self._wake_transfer_workers()
+
+    async def approve_transfers(
+        self, user_id: str, transfer_ids: List[str], idempotency_key: Optional[str] = None
+    ) -> dict:
+        """Approve several pending transfers in one transaction.
+
+        Every account involved is locked up front in id order, so concurrent
+        batches cannot deadlock. Transfers then run in the order given and
+        each gets its own result; one failing its checks does not stop the
+        rest. A database error rolls back the whole batch.
+        """
+        touched_users = [user_id]
+        # keep the caller's order, drop repeats; malformed ids map to None
+        transfer_ids = list(dict.fromkeys(str(t) for t in transfer_ids))
+        canonical = {tid: _canonical_uuid(tid) for tid in transfer_ids}
+        lookup_ids = [c for c in canonical.values() if c]
+        not_found = {"success": False, "error": "Transfer not found or already processed"}
+
+        def _sync_approve_transfers(conn):
+            if self.queue_transfers:
+                queued = self._queue_transfers(conn, user_id, lookup_ids)
+                return [
+                    {"transfer_id": tid, **(self._queued_outcome(tid) if canonical[tid] in queued else not_found)}
+                    for tid in transfer_ids
+                ]
+
+            base_ref = self._reference_number()
+            refs = {tid: f"{base_ref}-{n}" for n, tid in enumerate(transfer_ids, start=1)}
+
+            pending = {
+                str(row.id): row
+                for row in conn.execute(
+                    select(transfer_log).where(
+                        and_(
+                            transfer_log.c.id.in_(lookup_ids),
+                            transfer_log.c.user_id == user_id,
+                            transfer_log.c.status == TransferStatus.PENDING.value
                         )
+                    ).with_for_update()
                 )
-                    
-                 
-                 
-
-                    if deduct_result.rowcount == 0:
-                        conn.execute(
-                            update(transfer_log)
-                            .where(transfer_log.c.id == transfer_id)
-                            .values(
-                                status=TransferStatus.FAILED.value,
-                                rejection_reason='Insufficient funds'
-                            )
-                        )
-                        return {"success": False, "error": "Insufficient funds or account changed"}
-                    
-                    # Credit destination account
+            }
+            self._lock_accounts(
+                conn, [a for row in pending.values() for a in (row.from_account_id, row.to_account_id)]
+            )
+
+            results = []
+            for tid in transfer_ids:
+                transfer = pending.get(canonical[tid])
+                if not transfer:
+                    outcome = not_found
+                elif self._execute_in_database(conn):
+                    outcome = self._execute_transfer_in_database(conn, user_id, transfer.id, refs[tid], touched_users)
+                else:
+                    outcome = self._execute_transfer(conn, transfer, refs[tid], touched_users)
+                results.append({"transfer_id": tid, **outcome})
+            return results
+
+        if not transfer_ids:
+            return {"success": False, "error": "No transfers to approve", "results": []}
+
+        try:
+            results = await self._run_once(
+                _sync_approve_transfers, user_id, idempotency_key, {"transfer_ids": transfer_ids}
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Batch approval of {len(transfer_ids)} transfers failed, rolled back: {type(e).__name__}")
+            return {"success": False, "error": "Batch approval failed, no funds moved", "results": []}
+        finally:
+            self._after_write(*touched_users)
+            self._wake_transfer_workers()
+
+        approved = sum(1 for r in results if r["success"])
+        return {
+            "success": approved == len(results),
+            "approved": approved,
+            "failed": len(results) - approved,
+            "results": results
+        }
+
+    @staticmethod
+    def _queue_transfers(conn, user_id: str, transfer_ids) -> set:
+        """Mark the user's pending transfers approved; returns the ids that were."""
+        transfer_ids = [t for t in (_canonical_uuid(str(t)) for t in transfer_ids) if t]
+        if not transfer_ids:
+            return set()
+        result = conn.execute(
+            update(transfer_log)
+            .where(
+                and_(
+                    transfer_log.c.id.in_(transfer_ids),
+                    transfer_log.c.user_id == user_id,
+                    transfer_log.c.status == TransferStatus.PENDING.value
+                )
+            )
+            .values(status=TransferStatus.APPROVED.value, approved_at=datetime.utcnow())
+            .returning(transfer_log.c.id)
+        )
+        return {str(row.id) for row in result}
+
+    @staticmethod
+    def _queued_outcome(transfer_id: str) -> dict:
+        return {
+            "success": True,
+            "status": TransferStatus.APPROVED.value,
+            "message": "Transfer approved and queued for execution",
+            "transfer_id": str(transfer_id),
+        }
+
+    def _wake_transfer_workers(self):
+        if self.queue_transfers and self.transfer_workers is not None:
+            self.transfer_workers.wake()
+
+    async def execute_approved_transfers(self, limit: int) -> List[dict]:
+        """Claim up to ``limit`` approved transfers and execute them in one transaction.
+
+        Rows are claimed oldest approval first with ``FOR UPDATE SKIP LOCKED``,
+        so concurrent workers take disjoint batches instead of queueing on
+        each other. Each transfer gets its own result, as in approve_transfers,
+        and runs in its own savepoint: one that raises is rolled back to it
+        and marked failed, so a poison row cannot block the queue.
+        """
+        touched_users = []
+
+        def _sync_execute_approved_transfers(conn):
+            claimed = conn.execute(
+                select(transfer_log)
+                .where(transfer_log.c.status == TransferStatus.APPROVED.value)
+                .order_by(transfer_log.c.approved_at, transfer_log.c.created_at, transfer_log.c.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not claimed:
+                return []
+            touched_users.extend(row.user_id for row in claimed)
+            self._lock_accounts(conn, [a for row in claimed for a in (row.from_account_id, row.to_account_id)])
+
+            base_ref = self._reference_number()
+            results = []
+            for n, transfer in enumerate(claimed, start=1):
+                try:
+                    # a savepoint per transfer: one that blows up is undone and marked
+                    # failed, instead of rolling back (and re-claiming) the whole batch
+                    with conn.begin_nested():
+                        outcome = self._execute_transfer(conn, transfer, f"{base_ref}-{n}", touched_users)
+                except Exception as e:
+                    logger.exception(f"Queued transfer {transfer.id} failed, marked failed")
                     conn.execute(
-                        update(accounts)
-                        .where(accounts.c.id == transfer.to_account_id)
+                        update(transfer_log)
+                        .where(transfer_log.c.id == transfer.id)
                         .values(
-                            balance=accounts.c.balance + transfer.amount,
-                            updated_at=datetime.utcnow()
+                            status=TransferStatus.FAILED.value,
+                            rejection_reason=f"Execution error: {type(e).__name__}"
                         )
                     )
-                    
-                    ref_number = f"TRF-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
-                    
-             
+                    outcome = {"success": False, "error": "Transfer failed, no funds moved"}
+                results.append({"transfer_id": str(transfer.id), "user_id": str(transfer.user_id), **outcome})
+            if conn.dialect.name == "postgresql":
+                # other processes can LISTEN transfer_completed; delivered on commit
+                for result in results:
                     conn.execute(
-                        insert(transactions).values(
-                            account_id=transfer.from_account_id,
-                            type=TransactionType.TRANSFER_OUT.value,
-                            amount=transfer.amount,
-                            category='transfer',
-                            description=transfer.description,
-                            reference_number=ref_number,
-                            status='completed'
-                        )
-                    )
-                    
-                    conn.execute(
-                        insert(transactions).values(
-                            account_id=transfer.to_account_id,
-                            type=TransactionType.TRANSFER_IN.value,
-                            amount=transfer.amount,
-                            category='transfer',
-                            description=transfer.description,
-                            reference_number=ref_number,
-                            status='completed'
-                        )
-                    )
-                    
-                    conn.execute(
-                        update(transfer_log)
-                        .where(transfer_log.c.id == transfer_id)
-                        .values(
-                            status=TransferStatus.COMPLETED.value,
-                            approved_at=datetime.utcnow(),
-                            executed_at=datetime.utcnow()
-                        )
+                        text("SELECT pg_notify('transfer_completed', :payload)"),
+                        {"payload": dumps(result)}
                     )
-                    
-                    return {
-                        "success": True,
-                        "message": f"Transfer of {settings.default_currency} {transfer.amount} completed successfully",
-                        "reference_number": ref_number
-                    }
-            except SQLAlchemyError as e:
-                logger.error(f"Transfer {transfer_id} failed, rolled back: {type(e).__name__}")
-                return {"success": False, "error": "Transfer failed, no funds moved"}
-
-        return await asyncio.to_thread(_sync_approve_transfer)
+            return results
+
+        try:
+            return await self._run(_sync_execute_approved_transfers, write=True)
+        finally:
+            self._after_write(*touched_users)
+
+    @staticmethod
+    def _lock_accounts(conn, account_ids):
+        """Row-lock accounts in id order so transfers touching the same accounts cannot deadlock."""
+        account_ids = sorted({str(a) for a in account_ids if a is not None})
+        if account_ids:
+            conn.execute(
+                select(accounts.c.id).where(accounts.c.id.in_(account_ids))
+                .order_by(accounts.c.id).with_for_update()
+            ).all()
+
+    @staticmethod
+    def _reference_number() -> str:
+        return f"TRF-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+
+    @staticmethod
+    def _execute_in_database(conn) -> bool:
+        """True when transfers run through execute_transfer(), see settings.transfer_execution."""
+        return settings.transfer_execution == "procedure" and conn.dialect.name == "postgresql"
+
+    def _execute_transfer_in_database(self, conn, user_id, transfer_id, ref_number: str, touched_users: list) -> dict:
+        """One pending transfer in one round trip (database/migrations/003)."""
+        row = conn.execute(
+            text("SELECT * FROM execute_transfer(:user_id, :transfer_id, :reference)"),
+            {"user_id": user_id, "transfer_id": transfer_id, "reference": ref_number}
+        ).one()
+        if row.to_user_id:
+            touched_users.append(row.to_user_id)
+        return self._transfer_outcome(row, ref_number)
+
+    def _execute_transfer(self, conn, transfer, ref_number: str, touched_users: list) -> dict:
+        """Move the money for one pending ``transfer_log`` row, inside the caller's transaction.
+
+        Failed checks mark the transfer failed and return an error dict; the
+        recipient's user id is appended to ``touched_users``.
+        """
+        from_account = conn.execute(
+            select(accounts).where(accounts.c.id == transfer.from_account_id)
+        ).first()
+
+        to_account = conn.execute(
+            select(accounts).where(accounts.c.id == transfer.to_account_id)
+        ).first()
+        if to_account:
+            touched_users.append(to_account.user_id)
+
+        if to_account and from_account.currency != to_account.currency:
+            conn.execute(
+                update(transfer_log)
+                .where(transfer_log.c.id == transfer.id)
+                .values(
+                    status=TransferStatus.FAILED.value,
+                    rejection_reason=f'Currency mismatch: {from_account.currency} vs {to_account.currency}'
+                )
+            )
+            return {
+                "success": False,
+                "error": f"Currency mismatch: source is {from_account.currency} but destination is {to_account.currency}"
+            }
+
+        deduct_result = conn.execute(
+            update(accounts)
+            .where(
+                and_(
+                    accounts.c.id == transfer.from_account_id,
+                    accounts.c.balance >= transfer.amount  # Atomic check
+                )
+            )
+            .values(
+                balance=accounts.c.balance - transfer.amount,
+                updated_at=datetime.utcnow()
+            )
+        )
+
+        if deduct_result.rowcount == 0:
+            conn.execute(
+                update(transfer_log)
+                .where(transfer_log.c.id == transfer.id)
+                .values(
+                    status=TransferStatus.FAILED.value,
+                    rejection_reason='Insufficient funds'
+                )
+            )
+            return {"success": False, "error": "Insufficient funds or account changed"}
+
+        # Credit destination account
+        conn.execute(
+            update(accounts)
+            .where(accounts.c.id == transfer.to_account_id)
+            .values(
+                balance=accounts.c.balance + transfer.amount,
+                updated_at=datetime.utcnow()
+            )
+        )
+
+        conn.execute(
+            insert(transactions).values(
+                account_id=transfer.from_account_id,
+                type=TransactionType.TRANSFER_OUT.value,
+                amount=transfer.amount,
+                category='transfer',
+                description=transfer.description,
+                reference_number=ref_number,
+                status='completed'
+            )
+        )
+        # CURRENT_DATE matches the row's server-default timestamp
+        record_spend(conn, transfer.from_account_id, func.current_date(), 'transfer', transfer.amount)
+
+        conn.execute(
+            insert(transactions).values(
+                account_id=transfer.to_account_id,
+                type=TransactionType.TRANSFER_IN.value,
+                amount=transfer.amount,
+                category='transfer',
+                description=transfer.description,
+                reference_number=ref_number,
+                status='completed'
+            )
+        )
+
+        conn.execute(
+            update(transfer_log)
+            .where(transfer_log.c.id == transfer.id)
+            .values(
+                status=TransferStatus.COMPLETED.value,
+                # already set when the transfer went through the queue
+                approved_at=func.coalesce(transfer_log.c.approved_at, datetime.utcnow()),
+                executed_at=datetime.utcnow()
+            )
+        )
+
+        return {
+            "success": True,
+            "message": f"Transfer of {settings.default_currency} {transfer.amount} completed successfully",
+            "reference_number": ref_number
+        }
+
+    @staticmethod
+    def _transfer_outcome(row, ref_number: str) -> dict:
+        """Map an execute_transfer() result row to approve_transfer's response."""
+        if row.outcome == "not_found":
+            return {"success": False, "error": "Transfer not found or already processed"}
+        if row.outcome == "currency_mismatch":
+            return {
+                "success": False,
+                "error": f"Currency mismatch: source is {row.from_currency} but destination is {row.to_currency}"
+            }
+        if row.outcome == "insufficient_funds":
+            return {"success": False, "error": "Insufficient funds or account changed"}
+        return {
+            "success": True,
+            "message": f"Transfer of {settings.default_currency} {row.amount} completed successfully",
+            "reference_number": ref_number
+        }
 
     async def reject_transfer(self, user_id: str, transfer_id: str, reason: str = "") -> dict:
-        def _sync_reject_transfer():
-            with engine.begin() as conn:
-                result = conn.execute(
-                    update(transfer_log)
-                    .where(
-                        and_(
-                            transfer_log.c.id == transfer_id,
-                            transfer_log.c.user_id == user_id,
-                            transfer_log.c.status == TransferStatus.PENDING.value
-                        )
-                    )
-                    .values(
-                        status=TransferStatus.REJECTED.value,
-                        rejected_at=datetime.utcnow(),
-                        rejection_reason=reason or "Rejected by user"
+        def _sync_reject_transfer(conn):
+            result = conn.execute(
+                update(transfer_log)
+                .where(
+                    and_(
+                        transfer_log.c.id == transfer_id,
+                        transfer_log.c.user_id == user_id,
+                        transfer_log.c.status == TransferStatus.PENDING.value
                     )
                 )
+                .values(
+                    status=TransferStatus.REJECTED.value,
+                    rejected_at=datetime.utcnow(),
+                    rejection_reason=reason or "Rejected by user"
+                )
+            )
                 
-                if result.rowcount == 0:
-                    return {"success": False, "error": "Transfer not found or already processed"}
+            if result.rowcount == 0:
+                return {"success": False, "error": "Transfer not found or already processed"}
                 
-                return {"success": True, "message": "Transfer rejected"}
-
-        return await asyncio.to_thread(_sync_reject_transfer)
-
-    async def get_pending_transfers(self, user_id: str) -> List[dict]:
-        def _sync_get_pending_transfers():
-            query = text("""
-                SELECT 
-                    t.id, t.amount, t.currency, t.description, t.created_at,
-                    fa.name as from_account,
-                    COALESCE(ta.name, b.nickname) as to_destination
-                FROM transfer_log t
-                JOIN accounts fa ON t.from_account_id = fa.id
-                LEFT JOIN accounts ta ON t.to_account_id = ta.id
-                LEFT JOIN beneficiaries b ON t.to_beneficiary_id = b.id
-                WHERE t.user_id = :user_id AND t.status = :status
-                ORDER BY t.created_at DESC
-            """)
-            
-            with engine.connect() as conn:
-                result = conn.execute(query, {"user_id": user_id, "status": TransferStatus.PENDING.value})
-                return [dict(row._mapping) for row in result]
-
-        return await asyncio.to_thread(_sync_get_pending_transfers)
-
-    async def get_transfer_history(self, user_id: str, limit: int = 10) -> List[dict]:
-        def _sync_get_transfer_history():
-            query = text("""
-                SELECT 
-                    t.id, t.amount, t.currency, t.description, t.status,
-                    t.created_at, t.executed_at,
-                    fa.name as from_account,
-                    COALESCE(ta.name, b.nickname) as to_destination
-                FROM transfer_log t
-                JOIN accounts fa ON t.from_account_id = fa.id
-                LEFT JOIN accounts ta ON t.to_account_id = ta.id
-                LEFT JOIN beneficiaries b ON t.to_beneficiary_id = b.id
-                WHERE t.user_id = :user_id
-                ORDER BY t.created_at DESC
-                LIMIT :limit
-            """)
-            
-            with engine.connect() as conn:
-                result = conn.execute(query, {"user_id": user_id, "limit": limit})
-                return [dict(row._mapping) for row in result]
+            return {"success": True, "message": "Transfer rejected"}
+
+        return await self._run(_sync_reject_transfer, write=True, user_id=user_id)
+
+    async def get_pending_transfers(self, user_id: str) -> List[RowMapping]:
+        def _sync_get_pending_transfers(conn):
+            result = conn.execute(self._pending_transfers_query(), {"user_id": user_id, "status": TransferStatus.PENDING.value})
+            return result.mappings().all()
+
+        return await self._run(_sync_get_pending_transfers, user_id=user_id)
 
-        return await asyncio.to_thread(_sync_get_transfer_history)
+    async def get_transfer_history(self, user_id: str, limit: int = 10) -> List[RowMapping]:
+        def _sync_get_transfer_history(conn):
+            result = conn.execute(self._transfer_history_query(limited=True), {"user_id": user_id, "limit": limit})
+            return result.mappings().all()
+
+        return await self._run(_sync_get_transfer_history, user_id=user_id)
 
-    
-    
     @staticmethod
-    def _row_to_dict(row) -> dict:
-        """Convert a SQLAlchemy row to dict with proper type handling."""
-        d = dict(row._mapping)
-        for key, value in d.items():
-            if isinstance(value, uuid.UUID):
-                d[key] = str(value)
-            elif isinstance(value, datetime):
-                d[key] = value.isoformat()
-        return d
\ No newline at end of file
+    def _transfer_history_query(limited: bool):
+        """Takes :user_id, and :limit when ``limited``."""
+        return text("""
+            SELECT 
+                t.id, t.amount, t.currency, t.description, t.status,
+                t.created_at, t.executed_at,
+                fa.name as from_account,
+                COALESCE(ta.name, b.nickname) as to_destination
+            FROM transfer_log t
+            JOIN accounts fa ON t.from_account_id = fa.id
+            LEFT JOIN accounts ta ON t.to_account_id = ta.id
+            LEFT JOIN beneficiaries b ON t.to_beneficiary_id = b.id
+            WHERE t.user_id = :user_id
+            ORDER BY t.created_at DESC
+        """ + ("LIMIT :limit" if limited else ""))
+
+    def export_transactions(
+        self,
+        user_id: str,
+        fmt: str = "ndjson",
+        from_date: str = None,
+        to_date: str = None,
+        category: str = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream a user's full transaction history as CSV or NDJSON chunks.
+
+        Same filters and order as get_transactions, without the limit. Rows
+        come off a server-side cursor ``batch_size`` at a time and each batch
+        is encoded and yielded before the next is fetched, so memory stays
+        flat however long the history is.
+        """
+        query = self._transactions_query(user_id, from_date, to_date, category)
+        return self._export(user_id, fmt, query, {}, batch_size)
+
+    def export_transfer_history(self, user_id: str, fmt: str = "ndjson", batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+        """Every transfer the user made, streamed like export_transactions."""
+        return self._export(user_id, fmt, self._transfer_history_query(limited=False), {"user_id": user_id}, batch_size)
+
+    def _export(self, user_id: str, fmt: str, query, params: dict, batch_size: int) -> AsyncIterator[bytes]:
+        # checked here so a bad format fails at the call, not on first iteration
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        query = query.execution_options(stream_results=True, yield_per=batch_size)
+        if self.mode == "async":
+            return self._export_async(user_id, fmt, query, params)
+        return self._export_sync(user_id, fmt, query, params)
+
+    async def _export_async(self, user_id, fmt, query, params) -> AsyncIterator[bytes]:
+        conn = await connect_async(self._engine_for(False, user_id))
+        try:
+            result = await conn.stream(query, params)
+            if fmt == "csv":
+                yield encode_chunk(fmt, [], list(result.keys()))
+            async for partition in result.mappings().partitions():
+                yield encode_chunk(fmt, partition)
+        finally:
+            await conn.close()
+
+    async def _export_sync(self, user_id, fmt, query, params) -> AsyncIterator[bytes]:
+        # the cursor stays open between chunks; each fetch runs on a worker thread
+        conn = await asyncio.to_thread(connect, self._engine_for(False, user_id))
+        try:
+            result = await asyncio.to_thread(conn.execute, query, params)
+            if fmt == "csv":
+                yield encode_chunk(fmt, [], list(result.keys()))
+            partitions = result.mappings().partitions()
+            while (partition := await asyncio.to_thread(next, partitions, None)) is not None:
+                yield encode_chunk(fmt, partition)
+        finally:
+            await asyncio.to_thread(conn.close)
@@ -1,12 +1,11 @@
 
-from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
-from langchain_core.tools import tool
+from langchain_core.tools import InjectedToolCallId, tool
 from pydantic import Field, field_validator
-import json
-import uuid
 import math
-from mcp.mcp_impl import BankingMCPServer
+from typing import Annotated, List
+from mcp.mcp_impl import BankingMCPServer, check_page_limit, encode_cursor
+from mcp.encoding import dumps
 from config import settings
 
 # DeepEval tracing for evaluation
@@ -26,15 +25,6 @@ except ImportError:
 
 mcp_server = BankingMCPServer()
 
-def custom_serializer(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    if isinstance(obj, uuid.UUID):
-        return str(obj)
-    raise TypeError(f"Type {type(obj)} not serializable")
-
 def validate_amount(amount: float) -> Decimal:
 
     if not isinstance(amount, (int, float)):
@@ -61,11 +51,33 @@ def validate_amount(amount: float) -> Decimal:
 
 @tool
 @observe(type="tool")
-async def get_balance(user_id: str) -> str:
-    """Get account balances for a user. Returns list of accounts with balances."""
+async def get_balance(user_id: str, display: bool = False) -> str:
+    """Get account balances for a user. Returns list of accounts with balances.
+
+    Args:
+        user_id: The user's ID
+        display: True to show the result to the user; the matching UI component is then shown for you
+    """
 
     result = await mcp_server.get_balance(user_id)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
+
+@tool
+@observe(type="tool")
+async def get_account_snapshot(user_id: str, display: bool = False) -> str:
+    """
+    Get accounts with balances, active beneficiaries and pending transfers in one call.
+    Use this to fill the transfer form instead of calling get_balance and get_beneficiaries.
+    
+    Args:
+        user_id: The user's ID
+        display: True to show the transfer form filled with this data
+    
+    Returns:
+        {"accounts": [...], "beneficiaries": [...], "pending_transfers": [...]}
+    """
+    result = await mcp_server.get_account_snapshot(user_id)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
@@ -75,28 +87,49 @@ async def get_transactions(
     to_date: str = None, 
     category: str = None, 
     limit: int = 10,
-    offset: int = 0
+    offset: int = 0,
+    cursor: str = None,
+    display: bool = False
 ) -> str:
     """
-    Get transaction history with optional filters.
+    Get transaction history with optional filters, newest first.
     
     Args:
         user_id: The user's ID
         from_date: Optional start date (YYYY-MM-DD)
         to_date: Optional end date (YYYY-MM-DD)
         category: Optional category filter (e.g., 'groceries', 'restaurants')
-        limit: Maximum number of transactions to return (default 10)
-        offset: Number of transactions to skip (default 0)
+        limit: Maximum number of transactions to return, 1 to 100 (default 10)
+        offset: Deprecated, use cursor. Number of transactions to skip (default 0)
+        cursor: next_cursor from a previous call, to fetch the following page
+        display: True to show the result to the user; the matching UI component is then shown for you
+    
+    Returns:
+        {"transactions": [...], "next_cursor": "..."}; next_cursor is null on the last page
     """
-    result = await mcp_server.get_transactions(user_id, from_date, to_date, category, limit, offset)
-    return json.dumps(result, default=custom_serializer)
+    try:
+        if offset and not cursor:
+            rows = await mcp_server.get_transactions(
+                user_id, from_date, to_date, category, check_page_limit(limit), offset
+            )
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if len(rows) == limit else None
+            result = {"transactions": rows, "next_cursor": next_cursor}
+        else:
+            result = await mcp_server.get_transactions_page(user_id, from_date, to_date, category, limit, cursor)
+    except ValueError as e:
+        return dumps({
+            "success": False,
+            "error": str(e)
+        })
+    return dumps(result)
 
 @tool
 @observe(type="tool")
 async def get_spend_by_category(
     user_id: str, 
     from_date: str = None, 
-    to_date: str = None
+    to_date: str = None,
+    display: bool = False
 ) -> str:
     """
     Aggregate spending by category for a user.
@@ -105,12 +138,13 @@ async def get_spend_by_category(
         user_id: The user's ID
         from_date: Optional start date (YYYY-MM-DD)
         to_date: Optional end date (YYYY-MM-DD)
+        display: True to show the result to the user; the matching UI component is then shown for you
     
     Returns:
         List of dictionaries with category and total spending
     """
     result = await mcp_server.get_spend_by_category(user_id, from_date, to_date)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
@@ -119,6 +153,7 @@ async def propose_transfer(
     from_account_name: str,
     to_beneficiary_nickname: str,
     amount: float,
+    tool_call_id: Annotated[str, InjectedToolCallId],
     description: str = ""
 ) -> str:
     """
@@ -138,15 +173,16 @@ async def propose_transfer(
     try:
         validated_amount = validate_amount(amount)
     except ValueError as e:
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": str(e)
         })
     
     result = await mcp_server.propose_transfer(
-        user_id, from_account_name, to_beneficiary_nickname, float(validated_amount), description
+        user_id, from_account_name, to_beneficiary_nickname, float(validated_amount), description,
+        idempotency_key=tool_call_id,
     )
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 
 @tool
@@ -156,6 +192,7 @@ async def propose_internal_transfer(
     from_account_name: str,
     to_account_name: str,
     amount: float,
+    tool_call_id: Annotated[str, InjectedToolCallId],
     description: str = ""
 ) -> str:
     """
@@ -172,19 +209,22 @@ async def propose_internal_transfer(
     try:
         validated_amount = validate_amount(amount)
     except ValueError as e:
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": str(e)
         })
     
     result = await mcp_server.propose_internal_transfer(
-        user_id, from_account_name, to_account_name, float(validated_amount), description
+        user_id, from_account_name, to_account_name, float(validated_amount), description,
+        idempotency_key=tool_call_id,
     )
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
-async def approve_transfer(user_id: str, transfer_id: str) -> str:
+async def approve_transfer(
+    user_id: str, transfer_id: str, tool_call_id: Annotated[str, InjectedToolCallId]
+) -> str:
     """
     Approve and execute a pending transfer.
     
@@ -192,8 +232,25 @@ async def approve_transfer(user_id: str, transfer_id: str) -> str:
         user_id: The user's ID (must match transfer owner)
         transfer_id: The transfer/proposal ID to approve
     """
-    result = await mcp_server.approve_transfer(user_id, transfer_id)
-    return json.dumps(result, default=custom_serializer)
+    # a replayed tool call returns the first result instead of executing again
+    result = await mcp_server.approve_transfer(user_id, transfer_id, idempotency_key=tool_call_id)
+    return dumps(result)
+
+@tool
+@observe(type="tool")
+async def approve_transfers(
+    user_id: str, transfer_ids: List[str], tool_call_id: Annotated[str, InjectedToolCallId]
+) -> str:
+    """
+    Approve and execute several pending transfers at once, in one transaction.
+    Use when the user approves more than one pending transfer.
+    
+    Args:
+        user_id: The user's ID (must match transfer owner)
+        transfer_ids: The transfer/proposal IDs to approve, in the order to execute them
+    """
+    result = await mcp_server.approve_transfers(user_id, transfer_ids, idempotency_key=tool_call_id)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
@@ -207,20 +264,21 @@ async def reject_transfer(user_id: str, transfer_id: str, reason: str = "") -> s
         reason: Optional reason for rejection
     """
     result = await mcp_server.reject_transfer(user_id, transfer_id, reason)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 
 @tool
 @observe(type="tool")
-async def get_pending_transfers(user_id: str) -> str:
+async def get_pending_transfers(user_id: str, display: bool = False) -> str:
     """
     Get all pending transfers for a user that need approval.
     
     Args:
         user_id: The user's ID
+        display: True to show the result to the user; the matching UI component is then shown for you
     """
     result = await mcp_server.get_pending_transfers(user_id)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 
 @tool
@@ -234,22 +292,23 @@ async def get_transfer_history(user_id: str, limit: int = 10) -> str:
         limit: Maximum transfers to return (default 10)
     """
     result = await mcp_server.get_transfer_history(user_id, limit)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
-async def get_beneficiaries(user_id: str) -> str:
+async def get_beneficiaries(user_id: str, display: bool = False) -> str:
     """
     Get list of beneficiaries for a user.
     
     Args:
         user_id: The user's ID
+        display: True to show the result to the user; the matching UI component is then shown for you
     
     Returns:
         List of beneficiaries with their details (nickname, account, bank)
     """
     result = await mcp_server.get_beneficiaries(user_id)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
@@ -267,7 +326,7 @@ async def add_beneficiary(
         nickname: Friendly name for this beneficiary
     """
     result = await mcp_server.add_beneficiary(user_id, account_number, nickname)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 @tool
 @observe(type="tool")
@@ -280,11 +339,12 @@ async def remove_beneficiary(user_id: str, beneficiary_id: str) -> str:
         beneficiary_id: The beneficiary ID to remove
     """
     result = await mcp_server.remove_beneficiary(user_id, beneficiary_id)
-    return json.dumps(result, default=custom_serializer)
+    return dumps(result)
 
 
 MCP_TOOLS = [
     get_balance,
+    get_account_snapshot,
     get_transactions,
     get_spend_by_category,
     get_beneficiaries,
@@ -293,10 +353,22 @@ MCP_TOOLS = [
     propose_transfer,
     propose_internal_transfer,
     approve_transfer,
+    approve_transfers,
     reject_transfer,
     get_pending_transfers,
     get_transfer_history,
 ]
 
 
-MCP_TOOL_NAMES = {t.name for t in MCP_TOOLS}
\ No newline at end of file
+MCP_TOOL_NAMES = {t.name for t in MCP_TOOLS}
+
+# safe to run concurrently with each other and with writes
+READ_ONLY_TOOL_NAMES = {
+    "get_balance",
+    "get_account_snapshot",
+    "get_transactions",
+    "get_spend_by_category",
+    "get_beneficiaries",
+    "get_pending_transfers",
+    "get_transfer_history",
+}
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""Monthly range partitions of ``transactions`` on ``timestamp``.
+
+database/init.sql (and migrations/004 for existing databases) declares
+``transactions`` as ``PARTITION BY RANGE (timestamp)`` with one partition
+per calendar month, named ``transactions_yYYYYmMM``, plus a
+``transactions_default`` catch-all so an insert never fails for lack of a
+partition. Queries that bound ``timestamp`` with plain comparisons only
+touch the months they cover.
+
+:func:`ensure_partitions` creates missing months (at startup and from cron);
+any rows that already landed in the default partition for such a month are
+moved into it. :func:`detach_partitions_before` is the archival hook: it
+detaches whole months older than a cutoff, hands each one to an optional
+callback (dump to cold storage, move to another schema, ...) and can drop
+it afterwards.
+
+Everything is a no-op on databases where ``transactions`` is not
+partitioned (SQLite, or Postgres before migration 004).
+
+Usage (from the backend directory):
+    python -m mcp.partitions ensure --since 2023-01
+    python -m mcp.partitions detach --before 2022-01 --drop
+"""
+import argparse
+import logging
+import re
+import sys
+from datetime import date
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "transactions"
+_MONTH_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date, table: str = TABLE) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Inverse of partition_name; None for the default partition or foreign names."""
+    match = _MONTH_SUFFIX.search(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned(conn, table: str = TABLE) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table},
+    ).scalar())
+
+
+def list_partitions(conn, table: str = TABLE) -> List[str]:
+    return list(conn.execute(
+        text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+            ORDER BY c.relname
+        """),
+        {"table": table},
+    ).scalars())
+
+
+def _create_partition(conn, table: str, month: date, has_default: bool):
+    name = partition_name(month, table)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    if not has_default:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        ))
+        return
+    # ATTACH refuses while the default partition still holds rows for the
+    # range, so build the table beside it and move those rows in first
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {table}_default
+            WHERE timestamp >= :start AND timestamp < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds).rowcount
+    conn.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    if moved:
+        logger.info(f"Moved {moved} rows from {table}_default into {name}")
+
+
+def ensure_partitions(
+    conn,
+    since: Optional[date] = None,
+    through: Optional[date] = None,
+    table: str = TABLE,
+) -> List[str]:
+    """Create any missing monthly partitions from ``since`` through ``through``.
+
+    ``since`` defaults to the current month and ``through`` to
+    ``settings.transaction_partition_months_ahead`` months after it. Runs
+    inside the caller's transaction; returns the names created.
+    """
+    if not is_partitioned(conn, table):
+        return []
+    today = month_start(date.today())
+    month = month_start(since or today)
+    last = month_start(through or add_months(today, settings.transaction_partition_months_ahead))
+
+    existing = set(list_partitions(conn, table))
+    has_default = f"{table}_default" in existing
+    created = []
+    while month <= last:
+        name = partition_name(month, table)
+        if name not in existing:
+            _create_partition(conn, table, month, has_default)
+            created.append(name)
+        month = add_months(month, 1)
+    if created:
+        logger.info(f"Created partitions {', '.join(created)}")
+    return created
+
+
+def detach_partitions_before(
+    conn,
+    cutoff: date,
+    archive: Optional[Callable[[object, str], None]] = None,
+    drop: bool = False,
+    table: str = TABLE,
+) -> List[str]:
+    """Detach every monthly partition that ends on or before ``cutoff``'s month.
+
+    Each detached partition is a standalone table; ``archive(conn, name)``
+    runs for it before it is dropped (when ``drop``). Spend rollups are
+    kept, so get_spend_by_category still covers archived months. Returns
+    the names detached.
+    """
+    if not is_partitioned(conn, table):
+        return []
+    cutoff = month_start(cutoff)
+    detached = []
+    for name in list_partitions(conn, table):
+        month = partition_month(name)
+        if month is None or month >= cutoff:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if archive is not None:
+            archive(conn, name)
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    if detached:
+        logger.info(f"Detached partitions {', '.join(detached)}{' (dropped)' if drop else ''}")
+    return detached
+
+
+def _month(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="Create missing monthly partitions")
+    ensure.add_argument("--since", type=_month, help="First month (YYYY-MM), defaults to this month")
+    ensure.add_argument("--through", type=_month, help="Last month (YYYY-MM)")
+    detach = commands.add_parser("detach", help="Detach months before a cutoff")
+    detach.add_argument("--before", type=_month, required=True, help="First month to keep (YYYY-MM)")
+    detach.add_argument("--drop", action="store_true", help="Drop the detached tables")
+    args = parser.parse_args(argv)
+
+    from mcp.db import engine
+
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            print(f"{TABLE} is not partitioned (apply database/migrations/004 first)", file=sys.stderr)
+            return 1
+        if args.command == "ensure":
+            names = ensure_partitions(conn, args.since, args.through)
+            print(f"Created {len(names)} partitions{': ' + ', '.join(names) if names else ''}")
+        else:
+            names = detach_partitions_before(conn, args.before, drop=args.drop)
+            print(f"Detached {len(names)} partitions{': ' + ', '.join(names) if names else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
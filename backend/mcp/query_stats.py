@@ -0,0 +1,259 @@
+"""Per-method database timing for BankingMCPServer.
+
+``BankingMCPServer._run`` wraps every call in :meth:`QueryStats.track`,
+which puts a :class:`MethodCall` in a context variable. The context follows
+the call onto its worker thread (sync mode) or into ``run_sync`` (async
+mode), so the SQLAlchemy cursor events below and the pool checkout in
+``mcp.db.connect`` can charge statements, database time and checkout wait
+to the method that caused them. Statements run outside a tracked call are
+ignored.
+
+Per method we keep latency percentiles, statements, rows returned and
+checkout wait, plus the slowest statements seen. When a SELECT slower than
+``settings.query_stats_explain_min_ms`` enters that list, its plan is
+captured on the same connection (SQLite: ``EXPLAIN QUERY PLAN``). Read calls
+use ``EXPLAIN (ANALYZE, BUFFERS)``. Write calls get a plain ``EXPLAIN``:
+ANALYZE would run the statement again inside the write transaction, with
+its row locks held and any function it calls (``execute_transfer``,
+``pg_notify``) executed twice. Each call is also an OpenTelemetry span, so DB
+time sits next to the LLM spans in Phoenix.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from opentelemetry import trace
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# how many recent call latencies to keep per method for percentiles
+LATENCY_SAMPLE_SIZE = 1000
+
+# dialect -> (prefix for read calls, prefix for write calls)
+_EXPLAIN_PREFIXES = {
+    "postgresql": ("EXPLAIN (ANALYZE, BUFFERS) ", "EXPLAIN "),
+    "sqlite": ("EXPLAIN QUERY PLAN ", "EXPLAIN QUERY PLAN "),
+}
+
+
+@dataclass
+class MethodCall:
+    """What one BankingMCPServer call did on the database."""
+    method: str
+    # inside a write transaction: plans are captured without ANALYZE
+    write: bool = False
+    statements: int = 0
+    db_seconds: float = 0.0
+    checkout_wait: float = 0.0
+    rows: int = 0
+
+
+_current_call: ContextVar[Optional[MethodCall]] = ContextVar("query_stats_call", default=None)
+
+
+def count_rows(result) -> int:
+    """Rows in a method's return value: a list of rows, or a dict of such lists."""
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(value) for value in result.values() if isinstance(value, (list, tuple)))
+    return 0
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[max(int(len(ordered) * fraction) - 1, 0)] if ordered else 0.0
+
+
+class _MethodStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.rows = 0
+        self.checkout_wait = 0.0
+        self.recent = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        # slowest statements, slowest first
+        self.slowest: List[dict] = []
+
+
+class QueryStats:
+    """Thread-safe per-method aggregates; one process-wide instance, :data:`query_stats`."""
+
+    def __init__(self, slowest: int = 5, explain_min_ms: Optional[float] = 50.0):
+        self.slowest = slowest
+        # None disables EXPLAIN capture
+        self.explain_min_ms = explain_min_ms
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodStats] = {}
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats()
+        return stats
+
+    @contextmanager
+    def track(self, method: str, write: bool = False):
+        """Attribute everything the enclosed block does on the database to ``method``."""
+        call = MethodCall(method, write=write)
+        token = _current_call.set(call)
+        failed = False
+        start = time.perf_counter()
+        with tracer.start_as_current_span(f"BankingMCPServer.{method}") as span:
+            try:
+                yield call
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _current_call.reset(token)
+                self._record_call(call, elapsed, failed)
+                span.set_attribute("db.method", method)
+                span.set_attribute("db.statement_count", call.statements)
+                span.set_attribute("db.duration_ms", round(call.db_seconds * 1000, 3))
+                span.set_attribute("db.checkout_wait_ms", round(call.checkout_wait * 1000, 3))
+                span.set_attribute("db.rows", call.rows)
+
+    def _record_call(self, call: MethodCall, seconds: float, failed: bool):
+        with self._lock:
+            stats = self._stats(call.method)
+            stats.calls += 1
+            stats.errors += failed
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.db_seconds += call.db_seconds
+            stats.statements += call.statements
+            stats.rows += call.rows
+            stats.checkout_wait += call.checkout_wait
+            stats.recent.append(seconds)
+
+    def _is_slow(self, method: str, seconds: float) -> bool:
+        with self._lock:
+            slowest = self._stats(method).slowest
+            return len(slowest) < self.slowest or seconds > slowest[-1]["ms"] / 1000
+
+    def _record_statement(self, method: str, seconds: float, statement: str, plan: Optional[str]):
+        with self._lock:
+            slowest = self._stats(method).slowest
+            slowest.append({
+                "ms": round(seconds * 1000, 3),
+                "statement": statement,
+                "plan": plan,
+                "at": datetime.utcnow().isoformat(),
+            })
+            slowest.sort(key=lambda entry: entry["ms"], reverse=True)
+            del slowest[self.slowest:]
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            report = {}
+            for method, stats in sorted(self._methods.items()):
+                calls = stats.calls or 1
+                recent = sorted(stats.recent)
+                report[method] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "ms_avg": round(stats.seconds / calls * 1000, 3),
+                    "ms_p50": round(_percentile(recent, 0.5) * 1000, 3),
+                    "ms_p95": round(_percentile(recent, 0.95) * 1000, 3),
+                    "ms_max": round(stats.max_seconds * 1000, 3),
+                    "db_ms_avg": round(stats.db_seconds / calls * 1000, 3),
+                    "statements_avg": round(stats.statements / calls, 2),
+                    "rows_avg": round(stats.rows / calls, 2),
+                    "checkout_wait_ms_avg": round(stats.checkout_wait / calls * 1000, 3),
+                    "slowest": [dict(entry) for entry in stats.slowest],
+                }
+            return report
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+
+
+query_stats = QueryStats(
+    slowest=settings.query_stats_slowest,
+    explain_min_ms=settings.query_stats_explain_min_ms,
+)
+
+
+def record_checkout(seconds: float):
+    """Charge a pool checkout wait to the current call, if any (called by mcp.db)."""
+    call = _current_call.get()
+    if call is not None:
+        call.checkout_wait += seconds
+
+
+def _explain(conn, statement: str, parameters, analyze: bool) -> Optional[str]:
+    prefixes = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefixes is None:
+        return None
+    prefix = prefixes[0] if analyze else prefixes[1]
+    # straight on the DBAPI connection so these events don't see the EXPLAIN
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as e:
+        logger.warning(f"EXPLAIN failed: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_call.get() is not None:
+        conn.info["query_stats_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    call = _current_call.get()
+    if call is None or "query_stats_start" not in conn.info:
+        return
+    seconds = time.perf_counter() - conn.info.pop("query_stats_start")
+    call.statements += 1
+    call.db_seconds += seconds
+
+    stats = query_stats
+    if stats.slowest <= 0 or not stats._is_slow(call.method, seconds):
+        return
+    plan = None
+    explainable = (
+        stats.explain_min_ms is not None
+        and seconds * 1000 >= stats.explain_min_ms
+        and not executemany
+        and statement.lstrip().upper().startswith("SELECT")
+        and "FOR UPDATE" not in statement.upper()
+        # a server-side cursor is still open on this connection
+        and not (context is not None and context.execution_options.get("stream_results"))
+    )
+    if explainable:
+        plan = _explain(conn, statement, parameters, analyze=not call.write)
+    stats._record_statement(call.method, seconds, statement, plan)
+
+
+_installed = False
+
+
+def install():
+    """Listen to cursor events on every engine; safe to call more than once."""
+    global _installed
+    if _installed or not settings.query_stats_enabled:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
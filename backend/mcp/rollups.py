@@ -0,0 +1,165 @@
+"""Daily spend-by-category rollups.
+
+``spend_daily_rollup`` holds one row per (account, day, category) with the
+summed amount of that day's spending transactions. Reads combine whole days
+from the rollup with raw ``transactions`` rows only for the partial days at
+either end of the requested range, so the cost no longer grows with history.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Union
+
+from sqlalchemy import and_, func, insert, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from mcp.schema import accounts, spend_daily_rollup, transactions
+
+# transaction types that count as spending
+SPEND_TYPES = ("debit", "transfer_out")
+
+# rollup key for transactions without a category
+UNCATEGORIZED = ""
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def record_spend(conn, account_id, day, category: Optional[str], amount):
+    """Add one spending transaction to the rollup, inside the caller's transaction.
+
+    ``day`` is a date or a SQL date expression such as ``func.current_date()``.
+    """
+    category = category or UNCATEGORIZED
+    upsert = _UPSERT_INSERTS.get(conn.dialect.name)
+    if upsert is None:
+        # no ON CONFLICT: update the existing row, insert if there was none
+        key = and_(
+            spend_daily_rollup.c.account_id == account_id,
+            spend_daily_rollup.c.day == day,
+            spend_daily_rollup.c.category == category,
+        )
+        result = conn.execute(
+            update(spend_daily_rollup).where(key).values(total=spend_daily_rollup.c.total + amount)
+        )
+        if result.rowcount == 0:
+            conn.execute(
+                insert(spend_daily_rollup).values(account_id=account_id, day=day, category=category, total=amount)
+            )
+        return
+
+    stmt = upsert(spend_daily_rollup).values(
+        account_id=account_id,
+        day=day,
+        category=category,
+        total=amount,
+    )
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[spend_daily_rollup.c.account_id, spend_daily_rollup.c.day, spend_daily_rollup.c.category],
+            set_={"total": spend_daily_rollup.c.total + stmt.excluded.total},
+        )
+    )
+
+
+def parse_bound(value: Union[str, datetime, date, None]) -> Optional[datetime]:
+    """'YYYY-MM-DD' or an ISO datetime -> naive datetime; raises ValueError otherwise."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+    else:
+        parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # the column is TIMESTAMP WITHOUT TIME ZONE, in UTC
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.replace(tzinfo=None)
+
+
+def _user_accounts(user_id: str):
+    return select(accounts.c.id).where(accounts.c.user_id == user_id)
+
+
+def legacy_spend_query(user_id: str, from_date=None, to_date=None):
+    """The full-scan aggregate over raw transactions that rollups replace."""
+    conditions = [
+        transactions.c.account_id.in_(_user_accounts(user_id)),
+        transactions.c.type.in_(SPEND_TYPES),
+    ]
+    if from_date:
+        conditions.append(transactions.c.timestamp >= from_date)
+    if to_date:
+        conditions.append(transactions.c.timestamp <= to_date)
+
+    return select(
+        transactions.c.category,
+        func.sum(transactions.c.amount).label("total"),
+    ).where(and_(*conditions)).group_by(transactions.c.category)
+
+
+def _raw_part(user_id: str, start: Optional[datetime], end: Optional[datetime], end_inclusive: bool):
+    conditions = [
+        transactions.c.account_id.in_(_user_accounts(user_id)),
+        transactions.c.type.in_(SPEND_TYPES),
+    ]
+    if start is not None:
+        conditions.append(transactions.c.timestamp >= start)
+    if end is not None:
+        conditions.append(transactions.c.timestamp <= end if end_inclusive else transactions.c.timestamp < end)
+
+    category = func.coalesce(transactions.c.category, UNCATEGORIZED)
+    return select(
+        category.label("category"),
+        func.sum(transactions.c.amount).label("total"),
+    ).where(and_(*conditions)).group_by(category)
+
+
+def spend_query(user_id: str, from_dt: Optional[datetime] = None, to_dt: Optional[datetime] = None):
+    """Same result as legacy_spend_query for ``from_dt <= timestamp <= to_dt``.
+
+    Whole days inside the range come from the rollup; the partial first and
+    last day come from raw rows.
+    """
+    # first whole day: the from_dt day itself only if from_dt is midnight
+    first_day = None
+    if from_dt is not None:
+        first_day = from_dt.date() if from_dt.time() == time.min else from_dt.date() + timedelta(days=1)
+    # whole days end before to_dt's day; [to_dt's midnight, to_dt] is partial
+    end_day = to_dt.date() if to_dt is not None else None
+
+    if first_day is not None and end_day is not None and first_day >= end_day:
+        parts = [_raw_part(user_id, from_dt, to_dt, end_inclusive=True)]
+    else:
+        rollup_conditions = [spend_daily_rollup.c.account_id.in_(_user_accounts(user_id))]
+        if first_day is not None:
+            rollup_conditions.append(spend_daily_rollup.c.day >= first_day)
+        if end_day is not None:
+            rollup_conditions.append(spend_daily_rollup.c.day < end_day)
+
+        parts = [
+            select(
+                spend_daily_rollup.c.category.label("category"),
+                func.sum(spend_daily_rollup.c.total).label("total"),
+            ).where(and_(*rollup_conditions)).group_by(spend_daily_rollup.c.category)
+        ]
+        if from_dt is not None and from_dt < datetime.combine(first_day, time.min):
+            parts.append(_raw_part(user_id, from_dt, datetime.combine(first_day, time.min), end_inclusive=False))
+        if to_dt is not None:
+            parts.append(_raw_part(user_id, datetime.combine(end_day, time.min), to_dt, end_inclusive=True))
+
+    combined = union_all(*parts).subquery()
+    return select(
+        combined.c.category,
+        func.sum(combined.c.total).label("total"),
+    ).group_by(combined.c.category)
+
+
+def rows_to_spend(rows) -> List[dict]:
+    """Result rows -> the get_spend_by_category payload ('' back to None)."""
+    return [
+        {"category": row.category if row.category != UNCATEGORIZED else None, "total": float(row.total)}
+        for row in rows
+        if row.total is not None
+    ]
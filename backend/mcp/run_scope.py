@@ -0,0 +1,164 @@
+"""One pooled connection per graph run, shared by all its tool calls.
+
+A chat turn typically makes three or four tool calls (balance,
+beneficiaries, propose, pending), and each ``BankingMCPServer`` call used to
+check out its own connection. Inside :func:`use_run_scope`,
+``BankingMCPServer._run`` instead leases the connection held by the
+current :class:`RunScope`, keyed by LangGraph ``thread_id`` and run id.
+That connection is checked out on the run's first call and returned to the
+pool by :meth:`RunScopes.release` when the graph reaches END. A run then
+costs one checkout, and it holds at most one connection while it is
+between tool calls.
+
+The connection never stays inside a transaction between calls. Writes run
+in their own ``begin()`` block, and reads are rolled back when they finish.
+Only one call can use the connection at a time. If ToolNode runs several
+calls at once, the extras take an ordinary pooled connection instead of
+waiting. Scopes that are never released, for example when a run errors
+out, are closed after ``settings.run_connection_idle_seconds``.
+
+Off by default (``settings.run_connection_reuse``). A run keeps its
+connection through the LLM's think time between tool steps, so every
+conversation in flight holds one. The pool must cover them all:
+``db_pool_size + db_max_overflow`` has to exceed the peak number of
+concurrent conversations plus whatever else uses the pool (transfer
+workers, exports). With the defaults of 5 + 10, a 16th concurrent
+conversation waits ``db_pool_timeout`` for a checkout and then fails.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import settings
+from mcp.db import connect, connect_async
+
+logger = logging.getLogger(__name__)
+
+RunKey = Tuple[str, str]
+
+
+class RunScope:
+    """Connections held for one graph run, one per engine it has touched."""
+
+    def __init__(self, key: RunKey):
+        self.key = key
+        self.last_used = time.monotonic()
+        self.calls = 0
+        self._connections: Dict[int, object] = {}
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def lease(self, target):
+        """Yield this run's connection to ``target``, or None while another call has it."""
+        if self._lock.locked():
+            yield None
+            return
+        async with self._lock:
+            self.last_used = time.monotonic()
+            conn = self._connections.get(id(target))
+            if conn is None:
+                conn = await self._connect(target)
+                self._connections[id(target)] = conn
+            self.calls += 1
+            yield conn
+
+    @staticmethod
+    async def _connect(target):
+        if isinstance(target, AsyncEngine):
+            return await connect_async(target)
+        return await asyncio.to_thread(connect, target)
+
+    async def close(self):
+        async with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+            for conn in connections:
+                try:
+                    if isinstance(conn.engine, Engine):
+                        await asyncio.to_thread(conn.close)
+                    else:
+                        await conn.close()
+                except Exception as e:
+                    logger.warning(f"Closing run connection for {self.key} failed: {e}")
+
+
+_current_scope: ContextVar[Optional[RunScope]] = ContextVar("run_scope", default=None)
+
+
+def current_run_scope() -> Optional[RunScope]:
+    return _current_scope.get()
+
+
+class RunScopes:
+    """Open run scopes by (thread_id, run id); one process-wide instance, :data:`run_scopes`."""
+
+    def __init__(self, enabled: bool = True, idle_seconds: float = 120.0):
+        self.enabled = enabled
+        self.idle_seconds = idle_seconds
+        self._scopes: Dict[RunKey, RunScope] = {}
+        self.opened = 0
+        self.expired = 0
+
+    def acquire(self, key: RunKey) -> RunScope:
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = RunScope(key)
+            self.opened += 1
+        return scope
+
+    async def release(self, key: RunKey):
+        scope = self._scopes.pop(key, None)
+        if scope is not None:
+            await scope.close()
+
+    async def close_idle(self):
+        """Close scopes whose run never reached END."""
+        cutoff = time.monotonic() - self.idle_seconds
+        for key, scope in list(self._scopes.items()):
+            if scope.last_used < cutoff and not scope._lock.locked():
+                self.expired += 1
+                await self.release(key)
+
+    async def close_all(self):
+        for key in list(self._scopes):
+            await self.release(key)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "open": len(self._scopes), "opened": self.opened, "expired": self.expired}
+
+
+run_scopes = RunScopes(enabled=settings.run_connection_reuse, idle_seconds=settings.run_connection_idle_seconds)
+
+
+def run_key(config: Optional[dict]) -> Optional[RunKey]:
+    """(thread_id, run id) from a LangGraph node config; None outside a thread.
+
+    LangGraph does not hand the invocation's run id to nodes, so callers
+    that run several graph invocations on one thread at once should pass
+    ``configurable.run_id``. Without it, all runs on a thread share one
+    scope. That is still safe, because calls fall back to the pool while
+    the connection is busy.
+    """
+    configurable = (config or {}).get("configurable") or {}
+    thread_id = configurable.get("thread_id")
+    if thread_id is None:
+        return None
+    return str(thread_id), str(configurable.get("run_id") or "")
+
+
+@contextmanager
+def use_run_scope(key: Optional[RunKey]):
+    """Route BankingMCPServer calls made inside the block through ``key``'s scope."""
+    if key is None or not run_scopes.enabled:
+        yield None
+        return
+    token = _current_scope.set(run_scopes.acquire(key))
+    try:
+        yield _current_scope.get()
+    finally:
+        _current_scope.reset(token)
@@ -0,0 +1,225 @@
+"""Table definitions mirroring database/init.sql.
+
+Declared rather than reflected so importing the MCP server never touches the
+database. Keep these in sync with init.sql; ``verify_schema`` reports drift.
+"""
+import logging
+import uuid
+from typing import List, Set
+
+from sqlalchemy import (
+    Boolean, CheckConstraint, Column, Date, DateTime, ForeignKey, Index, MetaData,
+    Numeric, String, Table, Text, UniqueConstraint, Uuid, func, inspect, text, true,
+)
+from sqlalchemy.types import TypeDecorator
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class GUID(TypeDecorator):
+    """UUID column that also accepts string ids on backends without a native UUID type."""
+
+    impl = Uuid
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str) and not dialect.supports_native_uuid:
+            return uuid.UUID(value)
+        return value
+
+
+def _id_column() -> Column:
+    # init.sql defaults to uuid_generate_v4(); generate client-side so the same
+    # definitions also work on databases without uuid-ossp
+    return Column("id", GUID, primary_key=True, default=uuid.uuid4)
+
+
+def _timestamp(name: str) -> Column:
+    return Column(name, DateTime, server_default=func.current_timestamp())
+
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    _id_column(),
+    Column("name", String(100), nullable=False),
+    Column("email", String(255), nullable=False, unique=True),
+    Column("phone", String(20)),
+    _timestamp("created_at"),
+    _timestamp("updated_at"),
+)
+
+accounts = Table(
+    "accounts", metadata,
+    _id_column(),
+    Column("user_id", GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("name", String(100), nullable=False),
+    Column("type", String(20), nullable=False),
+    # what other customers enter to add this account as a beneficiary
+    Column("account_number", String(50)),
+    Column("currency", String(3), server_default="AED"),
+    Column("balance", Numeric(15, 2), server_default="0.00"),
+    Column("is_active", Boolean, server_default=true()),
+    _timestamp("created_at"),
+    _timestamp("updated_at"),
+    CheckConstraint("type IN ('checking', 'savings', 'premium')", name="accounts_type_check"),
+    Index("idx_accounts_user_id", "user_id"),
+    Index("idx_accounts_account_number", "account_number", unique=True),
+)
+
+# case-insensitive name lookups (propose_transfer, propose_internal_transfer)
+Index("idx_accounts_user_lower_name", accounts.c.user_id, func.lower(accounts.c.name))
+
+beneficiaries = Table(
+    "beneficiaries", metadata,
+    _id_column(),
+    Column("user_id", GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("beneficiary_user_id", GUID, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("beneficiary_account_id", GUID, ForeignKey("accounts.id", ondelete="SET NULL")),
+    Column("nickname", String(100)),
+    Column("account_number", String(50), nullable=False),
+    Column("bank_name", String(100), server_default="Phoenix Digital Bank"),
+    Column("is_internal", Boolean, server_default=true()),
+    Column("is_active", Boolean, server_default=true()),
+    _timestamp("created_at"),
+    _timestamp("updated_at"),
+    UniqueConstraint("user_id", "account_number"),
+    Index("idx_beneficiaries_user_id", "user_id"),
+    Index("idx_beneficiaries_user_active", "user_id", "is_active"),
+)
+
+Index("idx_beneficiaries_user_lower_nickname", beneficiaries.c.user_id, func.lower(beneficiaries.c.nickname))
+
+transactions = Table(
+    "transactions", metadata,
+    _id_column(),
+    Column("account_id", GUID, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False),
+    Column("type", String(20), nullable=False),
+    Column("amount", Numeric(15, 2), nullable=False),
+    Column("currency", String(3), server_default="AED"),
+    Column("category", String(50)),
+    Column("description", Text),
+    Column("merchant_name", String(100)),
+    Column("reference_number", String(50)),
+    # no foreign key: a partitioned table cannot be referenced by id alone
+    Column("related_transaction_id", GUID),
+    Column("status", String(20), server_default="completed"),
+    # partition key, so part of the primary key (see mcp/partitions.py)
+    Column("timestamp", DateTime, primary_key=True, server_default=func.current_timestamp()),
+    _timestamp("created_at"),
+    CheckConstraint("type IN ('credit', 'debit', 'transfer_in', 'transfer_out')", name="transactions_type_check"),
+    CheckConstraint("status IN ('pending', 'completed', 'failed', 'cancelled')", name="transactions_status_check"),
+    Index("idx_transactions_account_id", "account_id"),
+    Index("idx_transactions_timestamp", "timestamp"),
+    Index("idx_transactions_category", "category"),
+    postgresql_partition_by="RANGE (timestamp)",
+)
+
+# keyset pagination: WHERE account_id = ? ORDER BY timestamp DESC, id
+Index(
+    "idx_transactions_account_timestamp_id",
+    transactions.c.account_id, transactions.c.timestamp.desc(), transactions.c.id,
+)
+
+# Daily spend per account and category, kept current by every transactions
+# insert that counts as spending (see mcp/rollups.py). NULL categories are
+# stored as '' because category is part of the primary key.
+spend_daily_rollup = Table(
+    "spend_daily_rollup", metadata,
+    Column("account_id", GUID, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("category", String(50), primary_key=True, server_default=""),
+    Column("total", Numeric(18, 2), nullable=False, server_default="0.00"),
+)
+
+transfer_log = Table(
+    "transfer_log", metadata,
+    _id_column(),
+    Column("user_id", GUID, ForeignKey("users.id"), nullable=False),
+    Column("from_account_id", GUID, ForeignKey("accounts.id"), nullable=False),
+    Column("to_account_id", GUID, ForeignKey("accounts.id")),
+    Column("to_beneficiary_id", GUID, ForeignKey("beneficiaries.id")),
+    Column("amount", Numeric(15, 2), nullable=False),
+    Column("currency", String(3), server_default="AED"),
+    Column("description", Text),
+    Column("status", String(20), server_default="pending"),
+    _timestamp("created_at"),
+    Column("approved_at", DateTime),
+    Column("executed_at", DateTime),
+    Column("rejected_at", DateTime),
+    Column("rejection_reason", Text),
+    CheckConstraint(
+        "status IN ('pending', 'approved', 'completed', 'rejected', 'cancelled', 'failed')",
+        name="transfer_log_status_check",
+    ),
+    Index("idx_transfer_log_user_id", "user_id"),
+    Index("idx_transfer_log_status", "status"),
+)
+
+# First result of each proposal/approval tool call, replayed when the same
+# call is retried (see BankingMCPServer._run_once). ``result`` is JSON text.
+idempotency_keys = Table(
+    "idempotency_keys", metadata,
+    Column("user_id", GUID, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("tool", String(50), primary_key=True),
+    Column("key", String(200), primary_key=True),
+    Column("result", Text, nullable=False),
+    _timestamp("created_at"),
+    Index("idx_idempotency_keys_created_at", "created_at"),
+)
+
+
+def _index_names(conn, inspector, table_name: str) -> Set[str]:
+    if conn.dialect.name == "sqlite":
+        # the SQLite inspector skips expression indexes such as lower(name)
+        return set(conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {"table": table_name},
+        ).scalars())
+    return {i["name"] for i in inspector.get_indexes(table_name)}
+
+
+def verify_schema(conn) -> List[str]:
+    """Compare the live database with these definitions.
+
+    Returns a list of human-readable problems (missing tables, columns,
+    indexes or functions); an empty list means the schema matches.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    problems = []
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            problems.append(f"missing table '{table.name}'")
+            continue
+
+        live_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in live_columns:
+                problems.append(f"missing column '{table.name}.{column.name}'")
+
+        live_indexes = _index_names(conn, inspector, table.name)
+        for index in table.indexes:
+            if index.name not in live_indexes:
+                problems.append(f"missing index '{index.name}' on '{table.name}'")
+
+    if settings.transfer_execution == "procedure" and conn.dialect.name == "postgresql":
+        if conn.execute(text("SELECT to_regproc('execute_transfer')")).scalar() is None:
+            problems.append("missing function 'execute_transfer' (TRANSFER_EXECUTION=procedure)")
+
+    return problems
+
+
+def check_schema(engine):
+    """Startup check: raise if the database does not match the declared schema."""
+    with engine.connect() as conn:
+        problems = verify_schema(conn)
+    if problems:
+        for problem in problems:
+            logger.error(f"Schema mismatch: {problem}")
+        raise RuntimeError(f"Database schema does not match mcp/schema.py: {'; '.join(problems)}")
+    logger.info("Database schema verified")
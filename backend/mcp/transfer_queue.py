@@ -0,0 +1,125 @@
+"""Background execution of approved transfers.
+
+With ``settings.transfer_queue_workers > 0`` approving a transfer only moves
+its ``transfer_log`` row from ``pending`` to ``approved`` and returns. The
+workers here claim approved rows in batches with ``FOR UPDATE SKIP LOCKED``
+(:meth:`BankingMCPServer.execute_approved_transfers`) and execute them, so
+account locks are held by a fixed number of workers rather than by however
+many chat requests happen to be approving at once.
+
+Each result is published to in-process subscribers (:meth:`subscribe`,
+:meth:`wait_for`) and, on Postgres, with ``NOTIFY transfer_completed`` when
+the batch commits. Workers sleep ``transfer_queue_poll_seconds`` between
+empty polls; an approval from this process wakes them straight away.
+Approved rows left behind by a crash are simply picked up on the next poll.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TransferWorkerPool:
+    """``workers`` asyncio tasks draining approved transfers for one server."""
+
+    def __init__(self, server, workers: int, batch_size: int = 50, poll_seconds: float = 1.0):
+        self.server = server
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self.executed = 0
+        self.failed_batches = 0
+
+    @classmethod
+    def from_settings(cls, server) -> "TransferWorkerPool":
+        return cls(
+            server,
+            workers=settings.transfer_queue_workers,
+            batch_size=settings.transfer_queue_batch_size,
+            poll_seconds=settings.transfer_queue_poll_seconds,
+        )
+
+    def start(self):
+        if self._tasks:
+            return
+        self.server.transfer_workers = self
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"transfer-worker-{n}") for n in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} transfer workers")
+
+    async def stop(self):
+        if self.server.transfer_workers is self:
+            self.server.transfer_workers = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self):
+        """Called after an approval so idle workers don't wait out the poll interval."""
+        self._wakeup.set()
+
+    def subscribe(self) -> asyncio.Queue:
+        """A queue receiving every executed transfer's result; drop it with :meth:`unsubscribe`."""
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    async def wait_for(self, transfer_id: str, timeout: Optional[float] = None) -> dict:
+        """The result of ``transfer_id`` once a worker in this process executes it.
+
+        Call it right after approving; a transfer executed before the call is
+        not replayed, and the wait runs into ``timeout``.
+        """
+        future = self._waiters.get(str(transfer_id))
+        if future is None:
+            future = self._waiters[str(transfer_id)] = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        finally:
+            self._waiters.pop(str(transfer_id), None)
+
+    async def run_once(self) -> List[dict]:
+        """Claim and execute one batch; returns its results (empty when idle)."""
+        results = await self.server.execute_approved_transfers(self.batch_size)
+        self.executed += len(results)
+        for result in results:
+            self._publish(result)
+        return results
+
+    def _publish(self, result: dict):
+        for queue in self._subscribers:
+            queue.put_nowait(result)
+        future = self._waiters.get(result["transfer_id"])
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def _work(self):
+        while True:
+            # cleared before claiming so an approval made during the batch isn't missed
+            self._wakeup.clear()
+            try:
+                results = await self.run_once()
+            except Exception:
+                # whatever went wrong, the batch rolled back and its rows are still
+                # approved; keep the worker alive and retry after a pause
+                logger.exception("Transfer worker batch failed, rolled back")
+                self.failed_batches += 1
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if len(results) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
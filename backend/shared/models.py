@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 class TransferStatus(str, Enum):
     """Transfer status enum."""
     PENDING = "pending"
+    APPROVED = "approved"
     COMPLETED = "completed"
     REJECTED = "rejected"
     FAILED = "failed"
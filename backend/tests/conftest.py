@@ -0,0 +1,107 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp.mcp_impl import BankingMCPServer
+from mcp.query_stats import query_stats
+from mcp.rollups import SPEND_TYPES, record_spend
+from mcp.schema import metadata, users, accounts, beneficiaries, transactions
+
+ALICE = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+ALICE_SALARY = "a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+ALICE_SAVINGS = "a2eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+BOB = "b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22"
+BOB_MAIN = "b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22"
+CAROL = "c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33"
+CAROL_CURRENT = "c1eebc99-9c0b-4ef8-bb6d-6bb9bd380c33"
+# fixed so a second seeded database (the replica tests) shares every id
+ALICE_BOB_BENEFICIARY = "a3eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+
+
+def seed_demo_data(conn):
+    """A small slice of database/init.sql."""
+    now = datetime.utcnow()
+    conn.execute(insert(users), [
+        {"id": ALICE, "name": "Alice Ahmed", "email": "alice.ahmed@email.com"},
+        {"id": BOB, "name": "Bob Mansour", "email": "bob.mansour@email.com"},
+        {"id": CAROL, "name": "Carol Ali", "email": "carol.ali@email.com"},
+    ])
+    conn.execute(insert(accounts), [
+        {"id": ALICE_SALARY, "user_id": ALICE, "name": "Salary Account", "account_number": "PDB-ALICE-001", "type": "checking", "balance": Decimal("15000.00")},
+        {"id": ALICE_SAVINGS, "user_id": ALICE, "name": "Savings Account", "account_number": "PDB-ALICE-002", "type": "savings", "balance": Decimal("40000.00")},
+        {"id": BOB_MAIN, "user_id": BOB, "name": "Main Account", "account_number": "PDB-BOB-001", "type": "checking", "balance": Decimal("25000.00")},
+        {"id": CAROL_CURRENT, "user_id": CAROL, "name": "Current Account", "account_number": "PDB-CAROL-001", "type": "checking", "balance": Decimal("18000.00")},
+    ])
+    conn.execute(insert(beneficiaries), [
+        {"id": ALICE_BOB_BENEFICIARY, "user_id": ALICE, "beneficiary_user_id": BOB, "beneficiary_account_id": BOB_MAIN,
+         "nickname": "Bob - Main", "account_number": "PDB-BOB-001"},
+    ])
+    conn.execute(insert(transactions), [
+        {"account_id": ALICE_SALARY, "type": "credit", "amount": Decimal("15000.00"), "category": "salary", "timestamp": now - timedelta(days=5)},
+        {"account_id": ALICE_SALARY, "type": "debit", "amount": Decimal("500.00"), "category": "groceries", "timestamp": now - timedelta(days=4)},
+        {"account_id": ALICE_SALARY, "type": "debit", "amount": Decimal("200.00"), "category": "restaurants", "timestamp": now - timedelta(days=3)},
+        {"account_id": ALICE_SALARY, "type": "debit", "amount": Decimal("1500.00"), "category": "utilities", "timestamp": now - timedelta(days=2)},
+        {"account_id": ALICE_SAVINGS, "type": "credit", "amount": Decimal("5000.00"), "category": "transfer", "timestamp": now - timedelta(days=1)},
+    ])
+    backfill_rollups(conn)
+
+
+def backfill_rollups(conn):
+    """What the init.sql backfill does, one spending row at a time."""
+    rows = conn.execute(
+        select(transactions.c.account_id, transactions.c.timestamp, transactions.c.category, transactions.c.amount)
+        .where(transactions.c.type.in_(SPEND_TYPES))
+    )
+    for row in rows.all():
+        record_spend(conn, row.account_id, row.timestamp.date(), row.category, row.amount)
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    """File-backed SQLite database with the declared schema and demo data."""
+    url = f"sqlite:///{tmp_path / 'bank.db'}"
+    engine = create_engine(url)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed_demo_data(conn)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def sqlite_engine(sqlite_url):
+    engine = create_engine(sqlite_url)
+    yield engine
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_async_engine(sqlite_url):
+    engine = create_async_engine(sqlite_url.replace("sqlite://", "sqlite+aiosqlite://"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def server_options():
+    """Extra BankingMCPServer arguments for ``server``; override in a test module."""
+    return {}
+
+
+@pytest.fixture(params=["sync", "async"])
+def server(request, sqlite_engine, sqlite_async_engine, server_options):
+    """BankingMCPServer on the demo database, once per DATABASE_MODE, with fresh query stats."""
+    query_stats.reset()
+    if request.param == "async":
+        yield BankingMCPServer(mode="async", async_engine=sqlite_async_engine, **server_options)
+    else:
+        yield BankingMCPServer(mode="sync", sync_engine=sqlite_engine, **server_options)
+    query_stats.reset()
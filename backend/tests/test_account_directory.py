@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import insert, select, update
+
+from mcp.cache import AccountDirectory
+from mcp.mcp_impl import BankingMCPServer
+from mcp.query_stats import query_stats
+from mcp.schema import accounts, beneficiaries
+from tests.conftest import ALICE, BOB, CAROL, CAROL_CURRENT
+
+CAROL_SAVINGS = "c2eebc99-9c0b-4ef8-bb6d-6bb9bd380c33"
+
+
+@pytest.fixture
+def server(sqlite_engine):
+    query_stats.reset()
+    yield BankingMCPServer(mode="sync", sync_engine=sqlite_engine, account_directory=AccountDirectory())
+    query_stats.reset()
+
+
+@pytest.mark.asyncio
+async def test_any_numbered_account_can_be_added(server, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(accounts).values(
+            id=CAROL_SAVINGS, user_id=CAROL, name="Premium Savings", type="premium", account_number="PDB-CAROL-002",
+        ))
+
+    added = await server.add_beneficiary(ALICE, "PDB-CAROL-002", "Carol - Savings")
+    assert added["success"] is True
+
+    with sqlite_engine.connect() as conn:
+        row = conn.execute(select(beneficiaries).where(beneficiaries.c.nickname == "Carol - Savings")).one()
+    assert str(row.beneficiary_account_id) == CAROL_SAVINGS
+    assert str(row.beneficiary_user_id) == CAROL
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_own_numbers_are_rejected(server):
+    assert await server.add_beneficiary(ALICE, "PDB-NOBODY-001", "Nobody") == {
+        "success": False, "error": "Account PDB-NOBODY-001 not found"
+    }
+    assert await server.add_beneficiary(ALICE, "PDB-ALICE-002", "Me") == {
+        "success": False, "error": "Cannot add yourself as a beneficiary"
+    }
+
+
+@pytest.mark.asyncio
+async def test_directory_serves_repeat_lookups_in_one_transaction(server):
+    await server.add_beneficiary(ALICE, "PDB-CAROL-001", "Carol")
+    await server.add_beneficiary(BOB, "PDB-CAROL-001", "Carol")
+
+    assert server.account_directory.get("PDB-CAROL-001").account_id is not None
+    stats = server.account_directory.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2
+    assert set(query_stats.snapshot()) == {"add_beneficiary"}
+    # the cached add swaps the number lookup for an is_active check by primary key
+    assert query_stats.snapshot()["add_beneficiary"]["statements_avg"] == 3
+
+
+@pytest.mark.asyncio
+async def test_closed_account_is_rejected_despite_cached_entry(server, sqlite_engine):
+    assert (await server.add_beneficiary(ALICE, "PDB-CAROL-001", "Carol"))["success"] is True
+    with sqlite_engine.begin() as conn:
+        conn.execute(update(accounts).where(accounts.c.id == CAROL_CURRENT).values(is_active=False))
+
+    assert await server.add_beneficiary(BOB, "PDB-CAROL-001", "Carol") == {
+        "success": False, "error": "Account PDB-CAROL-001 not found"
+    }
+    assert server.account_directory.get("PDB-CAROL-001") is None
+
+
+def test_directory_invalidation():
+    directory = AccountDirectory()
+    directory.put("PDB-CAROL-001", CAROL_CURRENT, CAROL)
+    directory.invalidate("PDB-CAROL-001")
+    assert directory.get("PDB-CAROL-001") is None
+
+    disabled = AccountDirectory(enabled=False)
+    disabled.put("PDB-CAROL-001", CAROL_CURRENT, CAROL)
+    assert disabled.get("PDB-CAROL-001") is None
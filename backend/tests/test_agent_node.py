@@ -15,6 +15,7 @@ sys.modules["langchain_sambanova"] = MagicMock()
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from bankbot.nodes.agent_node import agent_node
+from bankbot.nodes.helpers.prompt_helper import get_system_prompt
 from bankbot.state import AgentState
 
 @pytest.fixture
@@ -142,6 +143,17 @@ async def test_agent_node_sanitization(mock_dependencies):
     call_args = mock_dependencies["llm_with_tools"].astream.call_args
     history = call_args[0][0]
     
-    # history[0] is system message, history[1] is the human message
-    assert "bad char" in history[1].content
-    assert "\x00" not in history[1].content
+    # history[0] is the static prompt, history[1] the user id, then the human message
+    assert "bad char" in history[2].content
+    assert "\x00" not in history[2].content
+
+@pytest.mark.asyncio
+async def test_agent_node_puts_per_user_data_after_static_prompt(mock_dependencies):
+    user_id = "123e4567-e89b-12d3-a456-426614174000"
+    await agent_node({"user_id": user_id, "messages": [HumanMessage(content="Hi")]})
+
+    history = mock_dependencies["llm_with_tools"].astream.call_args[0][0]
+    assert history[0].content == get_system_prompt()
+    assert isinstance(history[1], SystemMessage)
+    assert history[1].content == f"Current User ID: {user_id}"
+    assert not any(isinstance(m, SystemMessage) for m in history[2:])
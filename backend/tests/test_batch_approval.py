@@ -0,0 +1,80 @@
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import accounts, transfer_log
+from tests.conftest import ALICE, ALICE_SALARY, BOB, BOB_MAIN
+
+
+@pytest.fixture
+def server(sqlite_engine):
+    return BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(maxsize=100, ttl=60))
+
+
+async def _propose(server, amount):
+    return (await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", amount))["proposal_id"]
+
+
+def _balance(engine, account_id):
+    with engine.connect() as conn:
+        return conn.execute(select(accounts.c.balance).where(accounts.c.id == account_id)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_result_per_transfer(server, sqlite_engine):
+    first = await _propose(server, 100.0)
+    second = await _propose(server, 200.0)
+    # more than what's left after the first two
+    too_big = await _propose(server, 14_800.0)
+
+    result = await server.approve_transfers(ALICE, [first, second, too_big, first, "not-a-uuid"])
+
+    assert [r["transfer_id"] for r in result["results"]] == [first, second, too_big, "not-a-uuid"]
+    assert [r["success"] for r in result["results"]] == [True, True, False, False]
+    assert result["results"][2]["error"] == "Insufficient funds or account changed"
+    assert (result["success"], result["approved"], result["failed"]) == (False, 2, 2)
+
+    assert _balance(sqlite_engine, ALICE_SALARY) == Decimal("14700.00")
+    assert _balance(sqlite_engine, BOB_MAIN) == Decimal("25300.00")
+    with sqlite_engine.connect() as conn:
+        status = conn.execute(select(transfer_log.c.status).where(transfer_log.c.id == too_big)).scalar_one()
+    assert status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_batch_invalidates_cached_balances(server):
+    await server.get_balance(BOB)
+    transfer_id = await _propose(server, 50.0)
+
+    assert (await server.approve_transfers(ALICE, [transfer_id]))["success"] is True
+
+    bob = {a["name"]: float(a["balance"]) for a in await server.get_balance(BOB)}
+    assert bob["Main Account"] == 25050.0
+
+
+@pytest.mark.asyncio
+async def test_other_users_transfers_are_not_approved(server):
+    transfer_id = await _propose(server, 50.0)
+
+    result = await server.approve_transfers(BOB, [transfer_id])
+    assert result["results"][0]["error"] == "Transfer not found or already processed"
+
+
+@pytest.mark.asyncio
+async def test_tool_wraps_batch(server, monkeypatch):
+    from mcp import mcp_tool
+    monkeypatch.setattr(mcp_tool, "mcp_server", server)
+    transfer_id = await _propose(server, 10.0)
+
+    message = await mcp_tool.approve_transfers.ainvoke({
+        "name": "approve_transfers",
+        "args": {"user_id": ALICE, "transfer_ids": [transfer_id]},
+        "id": "call_batch",
+        "type": "tool_call",
+    })
+    result = json.loads(message.content)
+    assert result["approved"] == 1
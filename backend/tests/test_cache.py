@@ -0,0 +1,67 @@
+import pytest
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from tests.conftest import ALICE, BOB
+
+
+@pytest.fixture
+def server(sqlite_engine):
+    return BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(maxsize=100, ttl=60))
+
+
+@pytest.mark.asyncio
+async def test_balance_is_served_from_cache(server):
+    first = await server.get_balance(ALICE)
+    second = await server.get_balance(ALICE)
+
+    assert first == second
+    stats = server.cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_approve_invalidates_sender_and_recipient(server):
+    await server.get_balance(ALICE)
+    await server.get_balance(BOB)
+
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0)
+    result = await server.approve_transfer(ALICE, proposal["proposal_id"])
+    assert result["success"] is True
+
+    alice = {a["name"]: float(a["balance"]) for a in await server.get_balance(ALICE)}
+    bob = {a["name"]: float(a["balance"]) for a in await server.get_balance(BOB)}
+    assert alice["Salary Account"] == 14900.0
+    assert bob["Main Account"] == 25100.0
+
+
+@pytest.mark.asyncio
+async def test_beneficiary_writes_are_read_back(server):
+    assert len(await server.get_beneficiaries(ALICE)) == 1
+
+    added = await server.add_beneficiary(ALICE, "PDB-CAROL-001", "Carol")
+    assert added["success"] is True
+    assert len(await server.get_beneficiaries(ALICE)) == 2
+
+    await server.remove_beneficiary(ALICE, added["beneficiary_id"])
+    assert len(await server.get_beneficiaries(ALICE)) == 1
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_stored():
+    cache = UserReadCache(maxsize=10, ttl=60)
+
+    async def stale_loader():
+        # a write commits and invalidates while this read is in flight
+        cache.invalidate(ALICE)
+        return ["stale"]
+
+    assert await cache.get_or_load(ALICE, "balance", stale_loader) == ["stale"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_generations_are_bounded():
+    cache = UserReadCache(maxsize=10, ttl=60)
+    cache.invalidate(*(f"user-{n}" for n in range(1000)))
+    assert len(cache._generations) <= 10
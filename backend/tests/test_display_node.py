@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from bankbot.nodes import display_node as display
+from bankbot.nodes.display_node import plan_display_call, route_display
+
+ACCOUNTS = [{"id": "a1", "name": "Salary Account", "balance": 15000.0, "currency": "AED"}]
+ACTIONS = {"actions": [{"name": "showBalance"}, {"name": "showTransactions"}, {"name": "showTransferForm"}]}
+
+
+def _state(name, args, result, copilotkit=ACTIONS):
+    return {
+        "messages": [
+            HumanMessage(content="show my balance"),
+            AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": "call_1"}]),
+            ToolMessage(content=json.dumps(result), tool_call_id="call_1", name=name),
+        ],
+        "copilotkit": copilotkit,
+    }
+
+
+def test_display_read_becomes_frontend_call():
+    call = plan_display_call(_state("get_balance", {"user_id": "u", "display": True}, ACCOUNTS))
+    assert call["name"] == "showBalance"
+    assert json.loads(call["args"]["accounts"]) == ACCOUNTS
+
+    page = {"transactions": [{"id": "t1", "amount": 5.0}], "next_cursor": None}
+    call = plan_display_call(_state("get_transactions", {"user_id": "u", "display": True}, page))
+    assert call["name"] == "showTransactions"
+    assert json.loads(call["args"]["transactions"]) == page["transactions"]
+
+    snapshot = {"accounts": ACCOUNTS, "beneficiaries": [], "pending_transfers": []}
+    call = plan_display_call(_state("get_account_snapshot", {"user_id": "u", "display": True}, snapshot))
+    assert call["name"] == "showTransferForm" and set(call["args"]) == {"accounts", "beneficiaries"}
+
+
+@pytest.mark.parametrize("state", [
+    # the model only wanted the data
+    _state("get_balance", {"user_id": "u"}, ACCOUNTS),
+    # the client has no such component
+    _state("get_balance", {"user_id": "u", "display": True}, ACCOUNTS, copilotkit={"actions": []}),
+    # errors go back to the model to explain
+    _state("get_transactions", {"user_id": "u", "display": True}, {"success": False, "error": "Invalid cursor"}),
+    # no display flow for writes
+    _state("approve_transfer", {"user_id": "u", "display": True}, {"success": True}),
+])
+def test_everything_else_goes_back_to_the_agent(state):
+    assert plan_display_call(state) is None
+
+
+def test_several_calls_in_one_round_are_not_fused():
+    state = _state("get_balance", {"user_id": "u", "display": True}, ACCOUNTS)
+    state["messages"][1] = AIMessage(content="", tool_calls=[
+        {"name": "get_balance", "args": {"user_id": "u", "display": True}, "id": "call_1"},
+        {"name": "get_beneficiaries", "args": {"user_id": "u", "display": True}, "id": "call_2"},
+    ])
+    state["messages"].append(ToolMessage(content="[]", tool_call_id="call_2", name="get_beneficiaries"))
+    assert plan_display_call(state) is None
+
+
+@pytest.mark.asyncio
+async def test_node_emits_and_ends_the_run(monkeypatch):
+    emitted = []
+
+    async def fake_dispatch(name, data, config=None):
+        emitted.append((name, data))
+
+    monkeypatch.setattr(display, "adispatch_custom_event", fake_dispatch)
+    state = _state("get_balance", {"user_id": "u", "display": True}, ACCOUNTS)
+
+    update = await display.display_node(state, {})
+
+    call = update["messages"][0].tool_calls[0]
+    assert emitted == [("copilotkit_manually_emit_tool_call", {"name": "showBalance", "args": call["args"], "id": call["id"]})]
+    assert route_display({"messages": state["messages"] + update["messages"]}) == "end"
+    assert route_display(state) == "agent"
+
+
+@pytest.mark.asyncio
+async def test_disabled_setting_skips_fusing(monkeypatch):
+    monkeypatch.setattr(display.settings, "fused_display_enabled", False)
+    assert await display.display_node(_state("get_balance", {"user_id": "u", "display": True}, ACCOUNTS), {}) == {}
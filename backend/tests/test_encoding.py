@@ -0,0 +1,49 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from mcp.encoding import dumps
+from mcp.schema import transactions
+
+
+def _legacy_dumps(obj):
+    """The json.dumps + custom_serializer path tools used before."""
+    def serializer(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        if isinstance(o, uuid.UUID):
+            return str(o)
+        raise TypeError
+    return json.dumps(obj, default=serializer)
+
+
+def test_matches_legacy_values():
+    value = {
+        "amount": Decimal("1234.50"),
+        "id": uuid.UUID("a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"),
+        "timestamp": datetime(2025, 3, 1, 10, 30, 0, 123456),
+        "day": date(2025, 3, 1),
+        "nested": [{"total": Decimal("0.10")}, None, True],
+        "nickname": "Bob - Main",
+    }
+    assert json.loads(dumps(value)) == json.loads(_legacy_dumps(value))
+
+
+def test_serializes_row_mappings_directly(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        rows = conn.execute(select(transactions)).mappings().all()
+
+    decoded = json.loads(dumps({"transactions": rows}))
+    assert decoded == json.loads(_legacy_dumps({"transactions": [dict(r) for r in rows]}))
+    assert len(decoded["transactions"]) == 5
+
+
+def test_unknown_types_still_fail():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
@@ -0,0 +1,42 @@
+import pytest
+
+from mcp.cache import UserReadCache
+from mcp.db import to_async_url
+from mcp.mcp_impl import BankingMCPServer
+from tests.conftest import ALICE
+
+
+def test_to_async_url():
+    url = to_async_url("postgresql://u:p@db:5432/bank?sslmode=require&channel_binding=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert dict(url.query) == {"ssl": "require"}
+    assert (url.host, url.database, url.password) == ("db", "bank", "p")
+
+    assert to_async_url("postgresql+psycopg2://u@db/bank").drivername == "postgresql+asyncpg"
+    assert to_async_url("sqlite:///bank.db").drivername == "sqlite+aiosqlite"
+    # already async: untouched
+    assert to_async_url("postgresql+asyncpg://u@db/bank?ssl=require").render_as_string() == (
+        "postgresql+asyncpg://u@db/bank?ssl=require"
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_modes_return_the_same_results(sqlite_engine, sqlite_async_engine):
+    sync = BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(enabled=False))
+    async_ = BankingMCPServer(mode="async", async_engine=sqlite_async_engine, cache=UserReadCache(enabled=False))
+
+    for server in (sync, async_):
+        assert (await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0))["success"] is True
+
+    for method, kwargs in (
+        ("get_balance", {}),
+        ("get_beneficiaries", {}),
+        ("get_transactions", {"limit": 3}),
+        ("get_spend_by_category", {}),
+    ):
+        assert await getattr(sync, method)(ALICE, **kwargs) == await getattr(async_, method)(ALICE, **kwargs), method
+
+
+def test_unknown_mode_is_rejected(sqlite_engine):
+    with pytest.raises(ValueError):
+        BankingMCPServer(mode="threads", sync_engine=sqlite_engine)
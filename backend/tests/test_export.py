@@ -0,0 +1,68 @@
+import csv
+import io
+
+import orjson
+import pytest
+
+from mcp.export import write_export
+from mcp.mcp_impl import BankingMCPServer
+from tests.conftest import ALICE
+
+
+@pytest.fixture(params=["sync", "async"])
+def server(request, sqlite_engine, sqlite_async_engine):
+    if request.param == "async":
+        return BankingMCPServer(mode="async", async_engine=sqlite_async_engine)
+    return BankingMCPServer(mode="sync", sync_engine=sqlite_engine)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_matches_get_transactions(server):
+    expected = await server.get_transactions(ALICE, limit=100)
+
+    body = b"".join(await collect(server.export_transactions(ALICE, "ndjson")))
+    lines = [orjson.loads(line) for line in body.splitlines()]
+    assert [line["id"] for line in lines] == [str(row["id"]) for row in expected]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_header_and_one_line_per_row(server):
+    expected = await server.get_transactions(ALICE, limit=100)
+
+    body = b"".join(await collect(server.export_transactions(ALICE, "csv")))
+    rows = list(csv.DictReader(io.StringIO(body.decode())))
+    assert len(rows) == len(expected)
+    assert {"id", "amount", "timestamp", "account_name"} <= set(rows[0])
+
+
+@pytest.mark.asyncio
+async def test_export_yields_one_chunk_per_batch(server):
+    expected = await server.get_transactions(ALICE, limit=100)
+
+    chunks = await collect(server.export_transactions(ALICE, "ndjson", batch_size=2))
+    assert len(chunks) == (len(expected) + 1) // 2
+    assert all(len(chunk.splitlines()) <= 2 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_export_filters_by_category(server):
+    body = b"".join(await collect(server.export_transactions(ALICE, "ndjson", category="groceries")))
+    assert all(orjson.loads(line)["category"] == "groceries" for line in body.splitlines())
+
+
+def test_unknown_format_fails_at_call(server):
+    with pytest.raises(ValueError):
+        server.export_transactions(ALICE, "xml")
+
+
+@pytest.mark.asyncio
+async def test_write_export_to_file(server, tmp_path):
+    path = tmp_path / "transactions.csv"
+    written = await write_export(server.export_transactions(ALICE, "csv"), path)
+
+    assert written == path.stat().st_size
+    assert path.read_text().splitlines()[0].startswith("id,")
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select, update
+
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import accounts, beneficiaries, idempotency_keys, transfer_log
+from tests.conftest import ALICE, ALICE_SALARY, BOB
+
+
+def _count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def _balance(engine, account_id):
+    with engine.connect() as conn:
+        return conn.execute(select(accounts.c.balance).where(accounts.c.id == account_id)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_repeated_proposal_returns_first_result(server, sqlite_engine):
+    first = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0, idempotency_key="call_1")
+    again = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0, idempotency_key="call_1")
+
+    assert again == first
+    assert _count(sqlite_engine, transfer_log) == 1
+
+    other = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0, idempotency_key="call_2")
+    assert other["proposal_id"] != first["proposal_id"]
+    assert _count(sqlite_engine, transfer_log) == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_survives_renamed_names(server, sqlite_engine, monkeypatch):
+    first = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0, idempotency_key="call_1")
+    internal = await server.propose_internal_transfer(
+        ALICE, "Salary Account", "Savings Account", 10.0, idempotency_key="call_2"
+    )
+    with sqlite_engine.begin() as conn:
+        conn.execute(update(beneficiaries).where(beneficiaries.c.nickname == "Bob - Main").values(nickname="Bob"))
+        conn.execute(update(accounts).where(accounts.c.id == ALICE_SALARY).values(name="Old Salary"))
+
+    async def _no_resolve(*args, **kwargs):
+        raise AssertionError("a replay must not resolve names")
+
+    monkeypatch.setattr(server, "_resolve_names", _no_resolve)
+
+    assert await server.propose_transfer(
+        ALICE, "Salary Account", "Bob - Main", 100.0, idempotency_key="call_1"
+    ) == first
+    assert await server.propose_internal_transfer(
+        ALICE, "Salary Account", "Savings Account", 10.0, idempotency_key="call_2"
+    ) == internal
+    assert _count(sqlite_engine, transfer_log) == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_approval_moves_money_once(server, sqlite_engine):
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0)
+    before = _balance(sqlite_engine, ALICE_SALARY)
+
+    first = await server.approve_transfer(ALICE, proposal["proposal_id"], idempotency_key="call_approve")
+    again = await server.approve_transfer(ALICE, proposal["proposal_id"], idempotency_key="call_approve")
+
+    assert first["success"] is True
+    assert again == first
+    assert before - _balance(sqlite_engine, ALICE_SALARY) == 100
+
+    # without the key the second approval is refused as already processed
+    assert (await server.approve_transfer(ALICE, proposal["proposal_id"]))["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_reused_key_with_other_arguments_runs(server, sqlite_engine):
+    first = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+    second = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 20.0)
+    before = _balance(sqlite_engine, ALICE_SALARY)
+
+    one = await server.approve_transfer(ALICE, first["proposal_id"], idempotency_key="call_1")
+    other = await server.approve_transfer(ALICE, second["proposal_id"], idempotency_key="call_1")
+
+    assert one["success"] is True and other["success"] is True
+    assert other != one
+    assert before - _balance(sqlite_engine, ALICE_SALARY) == 30
+
+    # same key, same arguments: still the stored result
+    assert await server.approve_transfer(ALICE, second["proposal_id"], idempotency_key="call_1") == other
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_to_user_and_tool(server, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(accounts).values(user_id=BOB, name="Savings", type="savings", balance=0))
+    await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0, idempotency_key="call_1")
+    internal = await server.propose_internal_transfer(
+        ALICE, "Salary Account", "Savings Account", 10.0, idempotency_key="call_1"
+    )
+    other_user = await server.propose_internal_transfer(
+        BOB, "Main Account", "Savings", 10.0, idempotency_key="call_1"
+    )
+
+    assert internal["success"] is True and other_user["success"] is True
+    assert _count(sqlite_engine, transfer_log) == 3
+    assert _count(sqlite_engine, idempotency_keys) == 3
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_purged(server, sqlite_engine):
+    await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0, idempotency_key="fresh")
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(idempotency_keys).values(
+            user_id=ALICE, tool="propose_transfer", key="stale", result="{}",
+            created_at=datetime.utcnow() - timedelta(hours=48),
+        ))
+
+    assert await server.purge_idempotency_keys(older_than_hours=24) == 1
+    with sqlite_engine.connect() as conn:
+        assert [k.split(":")[0] for k in conn.execute(select(idempotency_keys.c.key)).scalars()] == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_tool_call_id_is_the_default_key(sqlite_engine, monkeypatch):
+    from mcp import mcp_tool
+    monkeypatch.setattr(mcp_tool, "mcp_server", BankingMCPServer(mode="sync", sync_engine=sqlite_engine))
+    call = {
+        "name": "propose_transfer",
+        "args": {
+            "user_id": ALICE, "from_account_name": "Salary Account",
+            "to_beneficiary_nickname": "Bob - Main", "amount": 25.0,
+        },
+        "id": "call_abc",
+        "type": "tool_call",
+    }
+
+    first = json.loads((await mcp_tool.propose_transfer.ainvoke(call)).content)
+    replay = json.loads((await mcp_tool.propose_transfer.ainvoke(call)).content)
+
+    assert replay["proposal_id"] == first["proposal_id"]
+    assert _count(sqlite_engine, transfer_log) == 1
@@ -0,0 +1,118 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from mcp import ingest as ingest_module
+from mcp.ingest import IngestError, _copy_value, ingest, read_records
+from mcp.rollups import legacy_spend_query, rows_to_spend, spend_query
+from mcp.schema import transactions
+from tests.conftest import ALICE, ALICE_SALARY, BOB_MAIN
+
+FEED = [
+    {"account_id": ALICE_SALARY, "type": "debit", "amount": "12.50", "category": "groceries", "timestamp": "2025-03-01T09:00:00"},
+    {"account_id": BOB_MAIN, "type": "credit", "amount": "1000", "category": "salary", "timestamp": "2025-03-01T10:00:00"},
+    {"account_id": ALICE_SALARY, "type": "transfer_out", "amount": "40.00", "timestamp": "2025-03-02T11:30:00", "status": "completed"},
+    {"account_id": ALICE_SALARY.upper(), "type": "debit", "amount": "7.25", "category": "groceries", "timestamp": "2025-03-01T18:00:00"},
+]
+
+
+def _write_csv(path, records):
+    columns = ["account_id", "type", "amount", "category", "timestamp", "status", "currency"]
+    lines = [",".join(columns)] + [",".join(str(r.get(c, "")) for c in columns) for r in records]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(transactions)).scalar_one()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_loads_feed_and_keeps_rollups_in_sync(sqlite_engine, tmp_path, fmt):
+    if fmt == "csv":
+        path = _write_csv(tmp_path / "feed.csv", FEED)
+    else:
+        path = tmp_path / "feed.ndjson"
+        path.write_text("\n".join(json.dumps(r) for r in FEED) + "\n")
+
+    before = _count(sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        result = ingest(conn, read_records(path), batch_size=2)
+
+    assert (result.rows, result.batches, result.rejected) == (4, 2, [])
+    assert _count(sqlite_engine) == before + 4
+    with sqlite_engine.connect() as conn:
+        legacy = sorted(rows_to_spend(conn.execute(legacy_spend_query(ALICE))), key=lambda r: r["category"] or "")
+        rolled = sorted(rows_to_spend(conn.execute(spend_query(ALICE))), key=lambda r: r["category"] or "")
+    assert rolled == legacy
+    assert {"category": "groceries", "total": 519.75} in rolled
+
+
+@pytest.mark.parametrize("bad,message", [
+    ({"type": "refund"}, "type must be one of"),
+    ({"status": "settled"}, "status must be one of"),
+    ({"currency": "USD"}, "does not match account currency"),
+    ({"amount": "-5"}, "amount must be positive"),
+    ({"amount": "1.005"}, "at most 2 decimals"),
+    ({"timestamp": "yesterday"}, "not ISO 8601"),
+    ({"account_id": "00000000-0000-0000-0000-000000000000"}, "unknown account_id"),
+])
+def test_invalid_row_rejects_whole_file(sqlite_engine, tmp_path, bad, message):
+    path = _write_csv(tmp_path / "feed.csv", [FEED[0], {**FEED[0], **bad}])
+    before = _count(sqlite_engine)
+
+    with pytest.raises(IngestError, match=message) as excinfo:
+        with sqlite_engine.begin() as conn:
+            ingest(conn, read_records(path))
+
+    assert excinfo.value.line == 3
+    assert _count(sqlite_engine) == before
+
+
+def test_skip_invalid_loads_the_rest(sqlite_engine, tmp_path):
+    path = tmp_path / "feed.ndjson"
+    path.write_text(json.dumps(FEED[0]) + "\n{not json\n" + json.dumps({**FEED[1], "type": "refund"}) + "\n")
+
+    with sqlite_engine.begin() as conn:
+        result = ingest(conn, read_records(path), skip_invalid=True)
+
+    assert result.rows == 1
+    assert result.rejected_count == 2
+    assert [e.line for e in result.rejected] == [2, 3]
+
+
+def test_rejected_rows_kept_are_capped(sqlite_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_module, "MAX_REJECTS_KEPT", 2)
+    path = tmp_path / "feed.ndjson"
+    path.write_text("{not json\n" * 5 + json.dumps(FEED[0]) + "\n")
+
+    with sqlite_engine.begin() as conn:
+        result = ingest(conn, read_records(path), skip_invalid=True)
+
+    assert (result.rows, result.rejected_count) == (1, 5)
+    assert [e.line for e in result.rejected] == [1, 2]
+
+
+def test_offset_timestamps_are_stored_in_utc(sqlite_engine, tmp_path):
+    path = _write_csv(tmp_path / "feed.csv", [{**FEED[0], "timestamp": "2024-01-01T23:30:00-05:00"}])
+
+    with sqlite_engine.begin() as conn:
+        ingest(conn, read_records(path))
+    with sqlite_engine.connect() as conn:
+        stored = conn.execute(
+            select(transactions.c.timestamp).where(transactions.c.timestamp >= datetime(2024, 1, 1))
+            .where(transactions.c.timestamp < datetime(2024, 2, 1))
+        ).scalar_one()
+
+    assert stored == datetime(2024, 1, 2, 4, 30)
+
+
+def test_copy_value_escaping():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert _copy_value(Decimal("12.50")) == "12.50"
+    assert _copy_value(datetime(2025, 3, 1, 9, 0)) == "2025-03-01 09:00:00"
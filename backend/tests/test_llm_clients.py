@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from bankbot.utils import llm_utils
+from bankbot.utils.llm_utils import LLMClientRegistry, get_llm
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_utils.settings, "allow_user_keys", True)
+    registry = LLMClientRegistry(maxsize=2)
+    monkeypatch.setattr(llm_utils, "llm_clients", registry)
+    return registry
+
+
+def test_same_model_key_and_params_reuse_one_client(registry):
+    first = get_llm("gpt-4o", openai_api_key="sk-user-a")
+    assert get_llm("gpt-4o", openai_api_key="sk-user-a") is first
+    assert registry.stats()["hits"] == 1
+
+    assert get_llm("gpt-4o", openai_api_key="sk-user-b") is not first
+    assert get_llm("gpt-4o", openai_api_key="sk-user-a", max_tokens=100) is not first
+
+
+def test_clients_share_http_connections(registry):
+    a = get_llm("gpt-4o", openai_api_key="sk-user-a")
+    b = get_llm("gpt-4o", openai_api_key="sk-user-b")
+    assert a.http_async_client is b.http_async_client is registry.http_clients()[1]
+
+
+def test_registry_is_bounded(registry):
+    first = get_llm("gpt-4o", openai_api_key="sk-1")
+    get_llm("gpt-4o", openai_api_key="sk-2")
+    get_llm("gpt-4o", openai_api_key="sk-3")
+
+    stats = registry.stats()
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+    assert get_llm("gpt-4o", openai_api_key="sk-1") is not first
+
+
+def test_keys_are_not_kept_in_the_registry(registry):
+    get_llm("gpt-4o", openai_api_key="sk-secret")
+    assert "sk-secret" not in repr(list(registry._models))
+
+
+@pytest.mark.asyncio
+async def test_aclose_releases_http_clients(registry):
+    get_llm("gpt-4o", openai_api_key="sk-user-a")
+    _, http_async_client = registry.http_clients()
+
+    await registry.aclose()
+
+    assert http_async_client.is_closed
+    assert registry.stats()["size"] == 0
+
+
+def test_streamed_responses_report_usage(registry):
+    assert get_llm("gpt-4o", openai_api_key="sk-user-a").stream_usage is True
+
+
+class _OpenAIStub(BaseHTTPRequestHandler):
+    # keep-alive, so the client pools the connection between calls
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        chunk = {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o"}
+        events = [
+            {**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hi"}, "finish_reason": None}]},
+            {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+        ]
+        body = ("".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_registry_survives_successive_event_loops(registry, openai_stub):
+    async def ask():
+        llm = get_llm("gpt-4o", openai_api_key="sk-user-a")
+        text = "".join([chunk.content async for chunk in llm.astream([HumanMessage(content="hi")])])
+        return llm, text
+
+    # like run_development_eval.py --compare-models: one asyncio.run per model
+    first, first_text = asyncio.run(ask())
+    second, second_text = asyncio.run(ask())
+
+    assert first_text == second_text == "Hi"
+    assert second is not first
+    assert second.http_async_client is not first.http_async_client
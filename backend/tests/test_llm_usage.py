@@ -0,0 +1,95 @@
+import json
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from bankbot.utils import llm_utils
+from bankbot.utils.llm_usage import LLMUsageStats, cached_input_tokens
+from bankbot.utils.llm_utils import LLMClientRegistry, get_llm
+
+
+def _message(prompt, cached, completion=10):
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": prompt,
+            "output_tokens": completion,
+            "total_tokens": prompt + completion,
+            "input_token_details": {"cache_read": cached},
+        },
+        response_metadata={"model_name": "gpt-4o-2024-08-06"},
+    )
+
+
+def test_cached_tokens_from_usage_or_response_metadata():
+    assert cached_input_tokens(_message(2000, 1536)) == 1536
+    openai_raw = AIMessage(content="", response_metadata={
+        "token_usage": {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1024}},
+    })
+    assert cached_input_tokens(openai_raw) == 1024
+    assert cached_input_tokens(AIMessage(content="")) == 0
+
+
+def test_streamed_chunks_keep_usage():
+    chunks = AIMessageChunk(content="he") + AIMessageChunk(content="llo", usage_metadata={
+        "input_tokens": 1800, "output_tokens": 3, "total_tokens": 1803,
+        "input_token_details": {"cache_read": 1280},
+    })
+    assert cached_input_tokens(chunks) == 1280
+
+
+def test_hits_and_misses_are_averaged_apart():
+    stats = LLMUsageStats()
+    stats.record("gpt-4o", _message(2000, 0), seconds=1.0, first_token_seconds=0.6)
+    stats.record("gpt-4o", _message(2000, 1536), seconds=0.5, first_token_seconds=0.2)
+    stats.record("gpt-4o", AIMessage(content="no usage"), seconds=0.1, first_token_seconds=0.1)
+
+    report = stats.snapshot()
+    assert set(report) == {"gpt-4o", "gpt-4o-2024-08-06"}
+    model = report["gpt-4o-2024-08-06"]
+    assert (model["input_tokens"], model["cached_input_tokens"], model["output_tokens"]) == (4000, 1536, 20)
+    assert model["cache_hit_ratio"] == 0.384
+    assert (model["cache_hit_calls"], model["ms_avg_cache_hit"], model["ms_avg_cache_miss"]) == (1, 500.0, 1000.0)
+    assert model["first_token_ms_avg_cache_hit"] == 200.0
+    assert report["gpt-4o"]["calls_without_usage"] == 1
+
+
+def _sse(*events):
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+
+def _openai_stream(request):
+    chunk = {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o-2024-08-06"}
+    events = [
+        {**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hi"}, "finish_reason": None}]},
+        {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+    ]
+    # like the API: the usage chunk only comes when the request asks for it
+    if json.loads(request.content).get("stream_options", {}).get("include_usage"):
+        events.append({**chunk, "choices": [], "usage": {
+            "prompt_tokens": 2000, "completion_tokens": 1, "total_tokens": 2001,
+            "prompt_tokens_details": {"cached_tokens": 1536},
+        }})
+    return _sse(*events)
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_from_get_llm_records_cache_hits(monkeypatch):
+    monkeypatch.setattr(llm_utils.settings, "allow_user_keys", True)
+    registry = LLMClientRegistry()
+    transport = httpx.MockTransport(_openai_stream)
+    registry._http_client = httpx.Client(transport=transport)
+    registry._http_async_client = httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr(llm_utils, "llm_clients", registry)
+
+    response = None
+    async for chunk in get_llm("gpt-4o", openai_api_key="sk-test").astream([HumanMessage(content="hi")]):
+        response = chunk if response is None else response + chunk
+
+    stats = LLMUsageStats()
+    stats.record("gpt-4o", response, seconds=0.3, first_token_seconds=0.1)
+    model = stats.snapshot()["gpt-4o-2024-08-06"]
+    assert (model["calls_without_usage"], model["cached_input_tokens"], model["cache_hit_calls"]) == (0, 1536, 1)
+    await registry.aclose()
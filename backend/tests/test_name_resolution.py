@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import insert, update
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from mcp.query_stats import query_stats
+from mcp.schema import beneficiaries
+from tests.conftest import ALICE, ALICE_BOB_BENEFICIARY, CAROL, CAROL_CURRENT
+
+
+@pytest.fixture(params=[True, False], ids=["cached", "uncached"])
+def server(request, sqlite_engine):
+    query_stats.reset()
+    yield BankingMCPServer(
+        mode="sync", sync_engine=sqlite_engine, name_cache=UserReadCache(enabled=request.param)
+    )
+    query_stats.reset()
+
+
+@pytest.mark.asyncio
+async def test_names_match_case_insensitively(server):
+    proposal = await server.propose_transfer(ALICE, "salary ACCOUNT", "bob - main", 100.0)
+    assert proposal["success"] is True
+    assert proposal["from_account"] == "Salary Account"
+    assert proposal["to_beneficiary"] == "Bob - Main"
+
+    internal = await server.propose_internal_transfer(ALICE, "SAVINGS account", "salary account", 50.0)
+    assert internal["success"] is True
+    assert internal["to_account"] == "Salary Account"
+
+
+@pytest.mark.asyncio
+async def test_unknown_names_fail_before_the_transaction(server):
+    result = await server.propose_transfer(ALICE, "Salary Account", "Nobody", 100.0)
+    assert result == {"success": False, "error": "Beneficiary 'Nobody' not found"}
+
+    result = await server.propose_internal_transfer(ALICE, "Salary Account", "salary account", 10.0)
+    assert result == {"success": False, "error": "Cannot transfer to the same account"}
+    assert "propose_transfer" not in query_stats.snapshot()
+    assert "propose_internal_transfer" not in query_stats.snapshot()
+
+
+@pytest.mark.asyncio
+async def test_proposal_transaction_reads_by_primary_key_only(server):
+    await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0)
+
+    stats = query_stats.snapshot()
+    # one read of both accounts (with the beneficiary check) and the insert
+    assert stats["propose_transfer"]["statements_avg"] == 2
+
+
+@pytest.mark.asyncio
+async def test_directory_survives_transfers_but_not_beneficiary_changes(sqlite_engine):
+    query_stats.reset()
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine)
+    for _ in range(3):
+        await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+    assert query_stats.snapshot()["resolve_names"]["calls"] == 1
+
+    await server.add_beneficiary(ALICE, "PDB-CAROL-001", "Carol")
+    result = await server.propose_transfer(ALICE, "Salary Account", "carol", 10.0)
+    assert result["success"] is True
+    assert query_stats.snapshot()["resolve_names"]["calls"] == 2
+    query_stats.reset()
+
+
+@pytest.mark.asyncio
+async def test_beneficiary_added_elsewhere_is_found(server, sqlite_engine):
+    await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 1.0)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(beneficiaries).values(
+            user_id=ALICE, beneficiary_user_id=CAROL, beneficiary_account_id=CAROL_CURRENT,
+            nickname="Carol - Current", account_number="PDB-CAROL-001",
+        ))
+
+    result = await server.propose_transfer(ALICE, "Salary Account", "Carol - Current", 1.0)
+    assert result["success"] is True
+
+
+@pytest.mark.asyncio
+async def test_beneficiary_removed_elsewhere_is_rejected(sqlite_engine):
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine)
+    await server._resolve_names(ALICE, nicknames=["Bob - Main"])
+    with sqlite_engine.begin() as conn:
+        conn.execute(update(beneficiaries).where(beneficiaries.c.id == ALICE_BOB_BENEFICIARY).values(is_active=False))
+
+    # the cached directory still has Bob; the transaction's own check catches it
+    result = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 1.0)
+    assert result == {"success": False, "error": "Beneficiary 'Bob - Main' not found"}
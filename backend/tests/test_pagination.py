@@ -0,0 +1,123 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import MAX_PAGE_SIZE, BankingMCPServer, encode_cursor, decode_cursor
+from mcp.schema import transactions
+from tests.conftest import ALICE, ALICE_SALARY
+
+
+@pytest.fixture
+def server(sqlite_engine):
+    # two rows sharing a timestamp exercise the id tie-break
+    tie = datetime.utcnow() - timedelta(days=10)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(transactions), [
+            {"account_id": ALICE_SALARY, "type": "debit", "amount": Decimal("1.00"), "category": "misc", "timestamp": tie},
+            {"account_id": ALICE_SALARY, "type": "debit", "amount": Decimal("2.00"), "category": "misc", "timestamp": tie},
+        ])
+    return BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(enabled=False))
+
+
+def test_cursor_round_trip():
+    ts = datetime(2025, 1, 2, 3, 4, 5, 678)
+    row_id = "a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+    decoded_ts, decoded_id = decode_cursor(encode_cursor(ts, row_id))
+    assert decoded_ts == ts
+    assert str(decoded_id) == row_id
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_match_offset_order(server):
+    expected = [row["id"] for row in await server.get_transactions(ALICE, limit=100)]
+
+    seen, cursor = [], None
+    while True:
+        page = await server.get_transactions_page(ALICE, limit=2, cursor=cursor)
+        seen.extend(row["id"] for row in page["transactions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(seen) == 7
+
+
+@pytest.mark.asyncio
+async def test_new_rows_do_not_shift_later_pages(server, sqlite_engine):
+    first = await server.get_transactions_page(ALICE, limit=3)
+    expected_second = await server.get_transactions_page(ALICE, limit=3, cursor=first["next_cursor"])
+
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(transactions).values(
+            account_id=ALICE_SALARY, type="debit", amount=Decimal("9.99"), category="coffee", timestamp=datetime.utcnow()
+        ))
+
+    second = await server.get_transactions_page(ALICE, limit=3, cursor=first["next_cursor"])
+    assert second == expected_second
+
+
+@pytest.mark.asyncio
+async def test_tool_returns_page_and_rejects_bad_cursor(server, monkeypatch):
+    from mcp import mcp_tool
+    monkeypatch.setattr(mcp_tool, "mcp_server", server)
+
+    page = json.loads(await mcp_tool.get_transactions.ainvoke({"user_id": ALICE, "limit": 2}))
+    assert len(page["transactions"]) == 2
+    assert page["next_cursor"]
+
+    bad = json.loads(await mcp_tool.get_transactions.ainvoke({"user_id": ALICE, "cursor": "garbage"}))
+    assert bad["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_page_limit_is_validated(server, monkeypatch):
+    for limit in (0, -1, MAX_PAGE_SIZE + 1):
+        with pytest.raises(ValueError):
+            await server.get_transactions_page(ALICE, limit=limit)
+
+    from mcp import mcp_tool
+    monkeypatch.setattr(mcp_tool, "mcp_server", server)
+    for args in ({"limit": 0}, {"limit": 0, "offset": 2}):
+        result = json.loads(await mcp_tool.get_transactions.ainvoke({"user_id": ALICE, **args}))
+        assert result["success"] is False and "limit" in result["error"]
+
+
+def test_postgres_pages_are_index_range_scans_per_account():
+    from sqlalchemy.dialects import postgresql
+
+    after_ts, after_id = datetime(2025, 1, 1), "a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+    conditions = [
+        transactions.c.timestamp <= after_ts,
+        (transactions.c.timestamp < after_ts) | ((transactions.c.timestamp == after_ts) & (transactions.c.id > after_id)),
+    ]
+    sql = " ".join(str(
+        BankingMCPServer._transactions_page_lateral(ALICE, conditions, 11).compile(dialect=postgresql.dialect())
+    ).split())
+    assert "JOIN LATERAL" in sql
+    # equality on account_id plus a plain timestamp bound: the range of idx_transactions_account_timestamp_id
+    assert "WHERE transactions.account_id = a.id AND transactions.timestamp <= " in sql
+    assert "ORDER BY transactions.timestamp DESC, transactions.id ASC LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_deep_page_uses_the_keyset_index(server, sqlite_engine):
+    first = await server.get_transactions_page(ALICE, limit=2)
+    after_ts, after_id = decode_cursor(first["next_cursor"])
+    query = BankingMCPServer._transactions_query(ALICE).where(
+        transactions.c.timestamp <= after_ts,
+        (transactions.c.timestamp < after_ts) | ((transactions.c.timestamp == after_ts) & (transactions.c.id > after_id)),
+    ).limit(3)
+    compiled = query.compile(sqlite_engine)
+    with sqlite_engine.connect() as conn:
+        plan = " ".join(str(row[-1]) for row in conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", tuple(str(compiled.params[k]) for k in compiled.positiontup)
+        ))
+    assert "idx_transactions_account_timestamp_id (account_id=? AND timestamp<?)" in plan, plan
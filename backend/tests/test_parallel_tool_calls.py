@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from bankbot.nodes import tools_node
+from bankbot.nodes.tools_node import run_tool_calls
+
+
+class RecordingToolNode:
+    """Stands in for ToolNode: answers each call after a short sleep and tracks overlap."""
+
+    def __init__(self):
+        self.running = set()
+        self.max_running = 0
+        self.overlapping_writes = False
+        self.order = []
+        self.finished = []
+
+    async def ainvoke(self, state, config):
+        messages = []
+        for call in state["messages"][-1].tool_calls:
+            if not call["name"].startswith("get_") and any(not n.startswith("get_") for n in self.running):
+                self.overlapping_writes = True
+            self.running.add(call["name"])
+            self.max_running = max(self.max_running, len(self.running))
+            self.order.append(call["id"])
+            await asyncio.sleep(0.01)
+            self.running.discard(call["name"])
+            self.finished.append(call["id"])
+            messages.append(ToolMessage(content=call["name"], tool_call_id=call["id"], name=call["name"]))
+        return {"messages": messages}
+
+
+def _state(*names):
+    calls = [{"name": name, "args": {"user_id": "u"}, "id": f"call_{i}"} for i, name in enumerate(names)]
+    return {"messages": [HumanMessage(content="hi"), AIMessage(content="", tool_calls=calls)]}
+
+
+@pytest.mark.asyncio
+async def test_reads_run_together_and_results_keep_call_order():
+    node = RecordingToolNode()
+    state = _state("get_balance", "get_beneficiaries", "get_pending_transfers")
+
+    update = await run_tool_calls(node, state, {})
+
+    assert [m.tool_call_id for m in update["messages"]] == ["call_0", "call_1", "call_2"]
+    assert node.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_writes_run_one_at_a_time_in_order():
+    node = RecordingToolNode()
+    state = _state("propose_transfer", "get_balance", "approve_transfer", "add_beneficiary")
+
+    update = await run_tool_calls(node, state, {})
+
+    assert [m.content for m in update["messages"]] == [
+        "propose_transfer", "get_balance", "approve_transfer", "add_beneficiary"
+    ]
+    assert not node.overlapping_writes
+    writes = [i for i in node.order if i != "call_1"]
+    assert writes == ["call_0", "call_2", "call_3"]
+
+
+@pytest.mark.asyncio
+async def test_reads_in_a_mixed_message_see_its_writes():
+    node = RecordingToolNode()
+    state = _state("get_pending_transfers", "propose_transfer", "get_balance")
+
+    update = await run_tool_calls(node, state, {})
+
+    assert [m.tool_call_id for m in update["messages"]] == ["call_0", "call_1", "call_2"]
+    # the write finished before either read started
+    assert node.order[0] == "call_1" and node.finished[0] == "call_1"
+    assert node.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped(monkeypatch):
+    monkeypatch.setattr(tools_node.settings, "tool_call_concurrency", 2)
+    node = RecordingToolNode()
+    names = ["get_balance", "get_beneficiaries", "get_transactions", "get_spend_by_category", "get_pending_transfers"]
+
+    await run_tool_calls(node, _state(*names), {})
+
+    assert node.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_single_call_passes_state_through():
+    node = RecordingToolNode()
+    state = _state("get_balance")
+    assert (await run_tool_calls(node, state, {}))["messages"][0].tool_call_id == "call_0"
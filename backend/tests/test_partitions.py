@@ -0,0 +1,45 @@
+from datetime import date, datetime
+
+import pytest
+
+from mcp.mcp_impl import BankingMCPServer
+from mcp.partitions import (
+    add_months, detach_partitions_before, ensure_partitions, is_partitioned,
+    month_start, partition_month, partition_name,
+)
+from tests.conftest import ALICE
+
+
+def test_month_arithmetic_crosses_years():
+    assert month_start(date(2024, 3, 17)) == date(2024, 3, 1)
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2024, 3, 1)) == "transactions_y2024m03"
+    assert partition_month("transactions_y2024m03") == date(2024, 3, 1)
+    assert partition_month("transactions_default") is None
+
+
+def test_unpartitioned_database_is_left_alone(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        assert not is_partitioned(conn)
+        assert ensure_partitions(conn) == []
+        assert detach_partitions_before(conn, date.today(), drop=True) == []
+
+
+def test_date_filters_bind_timestamps_for_pruning():
+    query = BankingMCPServer._transactions_query(ALICE, from_date="2024-01-01", to_date="2024-03-31")
+    bounds = [v for v in query.compile().params.values() if isinstance(v, datetime)]
+    assert bounds == [datetime(2024, 1, 1), datetime(2024, 3, 31)]
+
+
+@pytest.mark.asyncio
+async def test_date_filtered_transactions_match_unfiltered(sqlite_engine):
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine)
+    everything = await server.get_transactions(ALICE, limit=100)
+    cutoff = sorted(row["timestamp"] for row in everything)[len(everything) // 2]
+
+    recent = await server.get_transactions(ALICE, from_date=cutoff.isoformat(), limit=100)
+    assert [row["id"] for row in recent] == [row["id"] for row in everything if row["timestamp"] >= cutoff]
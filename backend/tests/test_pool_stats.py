@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from mcp import db
+from mcp.db import connect, connect_async, engine_options, get_pool_monitor, get_pool_stats
+
+
+def test_engine_options(monkeypatch):
+    assert engine_options("sqlite:///bank.db") == {}
+
+    monkeypatch.setattr(db.settings, "db_pool_size", 7)
+    monkeypatch.setattr(db.settings, "db_max_overflow", 3)
+    monkeypatch.setattr(db.settings, "db_pool_timeout", 2.5)
+    assert engine_options("postgresql+asyncpg://u@db/bank") == {
+        "pool_size": 7,
+        "max_overflow": 3,
+        "pool_timeout": 2.5,
+        "pool_pre_ping": db.settings.db_pool_pre_ping,
+        "pool_recycle": db.settings.db_pool_recycle,
+    }
+
+
+@pytest.fixture
+def one_connection_engine(sqlite_url):
+    engine = create_engine(sqlite_url, poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01)
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_and_timeouts_are_counted(one_connection_engine):
+    monitor = get_pool_monitor(one_connection_engine)
+    conn = connect(one_connection_engine)
+    try:
+        with pytest.raises(exc.TimeoutError):
+            connect(one_connection_engine)
+        stats = monitor.snapshot(one_connection_engine)
+        assert (stats["checkouts"], stats["checkout_timeouts"]) == (1, 1)
+        assert (stats["pool_class"], stats["size"], stats["checked_out"], stats["overflow"]) == ("QueuePool", 1, 1, 0)
+    finally:
+        conn.close()
+    assert monitor.snapshot(one_connection_engine)["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_timeouts_are_counted(sqlite_url):
+    engine = create_async_engine(
+        sqlite_url.replace("sqlite://", "sqlite+aiosqlite://"),
+        poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01,
+    )
+    try:
+        conn = await connect_async(engine)
+        with pytest.raises(exc.TimeoutError):
+            await connect_async(engine)
+        await conn.close()
+        monitor = get_pool_monitor(engine.sync_engine)
+        assert (monitor.checkouts, monitor.timeouts) == (1, 1)
+    finally:
+        await engine.dispose()
+
+
+def test_get_pool_stats_reports_the_primary_engine():
+    stats = get_pool_stats()
+    assert {"pool_class", "checkouts", "checkout_timeouts", "wait_ms_p95"} <= set(stats["primary"])
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import text
+
+from mcp import query_stats as query_stats_module
+from mcp.query_stats import _explain, count_rows, query_stats
+from tests.conftest import ALICE
+
+
+@pytest.mark.asyncio
+async def test_calls_are_charged_to_their_method(server):
+    rows = await server.get_transactions(ALICE, limit=3)
+    await server.get_transactions(ALICE, limit=3)
+    await server.get_spend_by_category(ALICE)
+
+    stats = query_stats.snapshot()
+    assert stats["get_transactions"]["calls"] == 2
+    assert stats["get_transactions"]["statements_avg"] == 1
+    assert stats["get_transactions"]["rows_avg"] == len(rows)
+    assert stats["get_transactions"]["db_ms_avg"] <= stats["get_transactions"]["ms_avg"]
+    assert stats["get_spend_by_category"]["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slowest_statements_keep_their_plan(server, monkeypatch):
+    monkeypatch.setattr(query_stats, "explain_min_ms", 0.0)
+    await server.get_transactions(ALICE, limit=3)
+
+    slowest = query_stats.snapshot()["get_transactions"]["slowest"]
+    assert len(slowest) == 1
+    assert "FROM transactions" in slowest[0]["statement"]
+    assert slowest[0]["plan"]
+
+
+@pytest.mark.asyncio
+async def test_slowest_list_is_bounded(server, monkeypatch):
+    monkeypatch.setattr(query_stats, "slowest", 2)
+    for _ in range(5):
+        await server.get_transactions(ALICE, limit=3)
+
+    slowest = query_stats.snapshot()["get_transactions"]["slowest"]
+    assert len(slowest) == 2
+    assert slowest[0]["ms"] >= slowest[1]["ms"]
+
+
+def test_untracked_statements_are_ignored(sqlite_engine):
+    query_stats.reset()
+    with sqlite_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert query_stats.snapshot() == {}
+
+
+def test_count_rows():
+    assert count_rows([1, 2, 3]) == 3
+    assert count_rows({"accounts": [1, 2], "beneficiaries": [3], "success": True}) == 3
+    assert count_rows({"success": True}) == 0
+
+
+def test_write_calls_are_explained_without_analyze(monkeypatch):
+    executed = []
+
+    class Cursor:
+        def execute(self, statement, parameters):
+            executed.append(statement)
+
+        def fetchall(self):
+            return [("Seq Scan on transfer_log",)]
+
+        def close(self):
+            pass
+
+    class Conn:
+        class dialect:
+            name = "postgresql"
+
+        class connection:
+            class dbapi_connection:
+                cursor = staticmethod(Cursor)
+
+    assert _explain(Conn, "SELECT * FROM execute_transfer(%(t)s)", {}, analyze=False) == "Seq Scan on transfer_log"
+    _explain(Conn, "SELECT * FROM transactions", {}, analyze=True)
+    assert executed == [
+        "EXPLAIN SELECT * FROM execute_transfer(%(t)s)",
+        "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM transactions",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_calls_know_whether_they_write(server, monkeypatch):
+    seen = []
+    monkeypatch.setattr(query_stats_module, "_explain", lambda conn, st, params, analyze: seen.append(analyze))
+    monkeypatch.setattr(query_stats, "explain_min_ms", 0.0)
+    monkeypatch.setattr(query_stats, "slowest", 100)
+
+    await server.get_transactions(ALICE, limit=3)
+    assert seen == [True]
+    seen.clear()
+    await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+    # names are resolved by a read call, the proposal is inserted by a write
+    assert True in seen and seen[-1] is False
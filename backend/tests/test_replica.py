@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, update
+
+from config import settings
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import accounts, metadata
+from tests.conftest import ALICE, ALICE_SALARY, BOB, seed_demo_data
+
+REPLICA_BALANCE = 1.0
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    """A second database standing in for a lagging replica: same data, one marked balance."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed_demo_data(conn)
+        conn.execute(update(accounts).where(accounts.c.id == ALICE_SALARY).values(balance=REPLICA_BALANCE))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def server(sqlite_engine, replica_engine, monkeypatch):
+    monkeypatch.setattr(settings, "replica_read_after_write_seconds", 0.2)
+    return BankingMCPServer(
+        mode="sync",
+        sync_engine=sqlite_engine,
+        replica_engine=replica_engine,
+        cache=UserReadCache(enabled=False),
+    )
+
+
+async def _salary(server, user_id=ALICE):
+    return {a["name"]: float(a["balance"]) for a in await server.get_balance(user_id)}["Salary Account"]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(server):
+    assert await _salary(server) == REPLICA_BALANCE
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_a_write(server):
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0)
+    assert proposal["success"] is True
+
+    # served by the primary, not the (never replicated) replica
+    assert await _salary(server) == 15000.0
+
+    time.sleep(0.25)
+    assert await _salary(server) == REPLICA_BALANCE
+
+
+@pytest.mark.asyncio
+async def test_transfer_recipient_also_sticks_to_primary(server):
+    bob_on_replica = await server.get_balance(BOB)
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 100.0)
+    await server.approve_transfer(ALICE, proposal["proposal_id"])
+
+    bob = {a["name"]: float(a["balance"]) for a in await server.get_balance(BOB)}
+    assert bob["Main Account"] == float(bob_on_replica[0]["balance"]) + 100.0
+
+
+@pytest.mark.asyncio
+async def test_without_replica_reads_use_primary(sqlite_engine):
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(enabled=False))
+    assert await _salary(server) == 15000.0
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from mcp.rollups import legacy_spend_query, parse_bound, rows_to_spend, spend_query
+from mcp.schema import spend_daily_rollup, transactions
+from tests.conftest import ALICE, ALICE_SALARY, ALICE_SAVINGS, backfill_rollups
+
+HISTORY = [
+    (ALICE_SALARY, "debit", "12.50", "groceries", datetime(2025, 3, 1, 0, 0, 0)),
+    (ALICE_SALARY, "debit", "7.25", "groceries", datetime(2025, 3, 1, 10, 30, 0)),
+    (ALICE_SALARY, "debit", "3.00", None, datetime(2025, 3, 1, 23, 59, 59)),
+    (ALICE_SAVINGS, "transfer_out", "100.00", "transfer", datetime(2025, 3, 2, 8, 0, 0)),
+    (ALICE_SALARY, "credit", "999.00", "salary", datetime(2025, 3, 2, 9, 0, 0)),
+    (ALICE_SALARY, "debit", "40.00", "restaurants", datetime(2025, 3, 3, 12, 0, 0)),
+    (ALICE_SALARY, "debit", "1.10", None, datetime(2025, 3, 4, 0, 0, 0)),
+]
+
+BOUNDS = [
+    (None, None),
+    ("2025-03-01", None),
+    (None, "2025-03-03"),
+    ("2025-03-01", "2025-03-03"),
+    ("2025-03-01T10:30:00", "2025-03-03T12:00:00"),
+    ("2025-03-01T10:30:01", "2025-03-03T11:59:59"),
+    ("2025-03-01T05:00:00", "2025-03-01T23:00:00"),
+    ("2025-03-02", "2025-03-02"),
+    ("2025-03-04", "2025-03-01"),
+    ("2025-03-02T00:00:00+04:00", None),
+]
+
+
+@pytest.fixture
+def history(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(spend_daily_rollup.delete())
+        conn.execute(insert(transactions), [
+            {"account_id": a, "type": t, "amount": Decimal(amt), "category": c, "timestamp": ts}
+            for a, t, amt, c, ts in HISTORY
+        ])
+        backfill_rollups(conn)
+    return sqlite_engine
+
+
+def _sorted(rows):
+    return sorted(rows_to_spend(rows), key=lambda r: r["category"] or "")
+
+
+@pytest.mark.parametrize("from_date,to_date", BOUNDS)
+def test_rollup_matches_legacy(history, from_date, to_date):
+    with history.connect() as conn:
+        legacy = _sorted(conn.execute(legacy_spend_query(ALICE, parse_bound(from_date), parse_bound(to_date))))
+        rolled = _sorted(conn.execute(spend_query(ALICE, parse_bound(from_date), parse_bound(to_date))))
+    assert rolled == legacy
+
+
+def test_parse_bound_rejects_garbage():
+    assert parse_bound(None) is None
+    assert parse_bound(date(2025, 3, 1)) == datetime(2025, 3, 1)
+    with pytest.raises(ValueError):
+        parse_bound("last tuesday")
+
+
+def test_parse_bound_converts_offsets_to_utc():
+    assert parse_bound("2024-01-01T23:30:00-05:00") == datetime(2024, 1, 2, 4, 30)
+    assert parse_bound("2024-01-01T23:30:00") == datetime(2024, 1, 1, 23, 30)
+
+
+@pytest.mark.asyncio
+async def test_approve_transfer_updates_rollup(sqlite_engine):
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(enabled=False))
+    before = {r["category"]: r["total"] for r in await server.get_spend_by_category(ALICE)}
+
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 250.0)
+    assert (await server.approve_transfer(ALICE, proposal["proposal_id"]))["success"] is True
+
+    after = {r["category"]: r["total"] for r in await server.get_spend_by_category(ALICE)}
+    assert after["transfer"] == before.get("transfer", 0.0) + 250.0
+
+    with sqlite_engine.connect() as conn:
+        legacy = _sorted(conn.execute(legacy_spend_query(ALICE)))
+        rollup_rows = conn.execute(
+            select(spend_daily_rollup).where(spend_daily_rollup.c.category == "transfer")
+        ).all()
+    assert sorted(after.items(), key=lambda kv: kv[0] or "") == [(r["category"], r["total"]) for r in legacy]
+    assert len(rollup_rows) == 1
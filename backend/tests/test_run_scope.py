@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from bankbot.nodes.tools_node import make_tools_node, release_run_node
+from mcp.db import get_pool_monitor
+from mcp.run_scope import RunScopes, current_run_scope, run_key, run_scopes, use_run_scope
+from tests.conftest import ALICE
+
+CONFIG = {"configurable": {"thread_id": "thread-1", "run_id": "run-1"}}
+
+
+@pytest.fixture(autouse=True)
+def reuse_enabled(monkeypatch):
+    # off by default; these tests exercise it
+    monkeypatch.setattr(run_scopes, "enabled", True)
+
+
+def _checkouts(server):
+    engine = server._async_engine.sync_engine if server.mode == "async" else server._sync_engine
+    return get_pool_monitor(engine).checkouts
+
+
+async def _turn(server):
+    await server.get_balance(ALICE)
+    await server.get_beneficiaries(ALICE)
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+    await server.get_pending_transfers(ALICE)
+    return proposal
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_in_a_run_share_one_checkout(server):
+    before = _checkouts(server)
+    with use_run_scope(run_key(CONFIG)):
+        proposal = await _turn(server)
+        assert (await server.approve_transfer(ALICE, proposal["proposal_id"]))["success"] is True
+    assert _checkouts(server) - before == 1
+    await run_scopes.release(run_key(CONFIG))
+
+    # without a scope every call checks out its own connection
+    before = _checkouts(server)
+    await _turn(server)
+    assert _checkouts(server) - before > 1
+
+
+@pytest.mark.asyncio
+async def test_write_after_read_on_shared_connection(server):
+    with use_run_scope(run_key(CONFIG)):
+        # reads must not leave a transaction open for the following write's begin()
+        await server.get_balance(ALICE)
+        await server.get_transactions(ALICE, limit=1)
+        proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+        assert proposal["success"] is True
+        # a failing write rolls back and leaves the connection usable
+        assert (await server.approve_transfer(ALICE, "not-a-uuid"))["success"] is False
+        assert len(await server.get_transactions(ALICE, limit=1)) == 1
+    await run_scopes.release(run_key(CONFIG))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_fall_back_to_the_pool(server):
+    with use_run_scope(run_key(CONFIG)):
+        results = await asyncio.gather(*(server.get_transactions(ALICE, limit=2) for _ in range(4)))
+    assert all(len(r) == 2 for r in results)
+    await run_scopes.release(run_key(CONFIG))
+
+
+@pytest.mark.asyncio
+async def test_tools_node_scopes_and_release_node_closes(sqlite_engine):
+    class FakeToolNode:
+        async def ainvoke(self, state, config):
+            return {"scope": current_run_scope().key}
+
+    state = {"messages": [AIMessage(content="", tool_calls=[{"name": "get_balance", "args": {}, "id": "call_1"}])]}
+    assert await make_tools_node(FakeToolNode())(state, CONFIG) == {"scope": ("thread-1", "run-1")}
+    assert run_scopes.stats()["open"] >= 1
+    await release_run_node({}, CONFIG)
+    assert run_key(CONFIG) not in run_scopes._scopes
+
+
+@pytest.mark.asyncio
+async def test_idle_scopes_are_closed(server):
+    scopes = RunScopes(idle_seconds=0)
+    scope = scopes.acquire(("thread-2", ""))
+    async with scope.lease(server._async_engine or server._sync_engine) as conn:
+        assert conn is not None
+    await scopes.close_idle()
+    assert scopes.stats() == {"enabled": True, "open": 0, "opened": 1, "expired": 1}
+
+
+@pytest.mark.asyncio
+async def test_disabled_scopes_use_the_pool(server, monkeypatch):
+    monkeypatch.setattr(run_scopes, "enabled", False)
+    before = _checkouts(server)
+    with use_run_scope(run_key(CONFIG)) as scope:
+        assert scope is None
+        await _turn(server)
+    assert _checkouts(server) - before > 1
+    assert run_key(CONFIG) not in run_scopes._scopes
+
+
+def test_run_key():
+    assert run_key({"configurable": {"thread_id": "t"}}) == ("t", "")
+    assert run_key({}) is None
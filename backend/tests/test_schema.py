@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import verify_schema, check_schema
+from tests.conftest import ALICE
+
+
+def test_verify_schema_matches(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        assert verify_schema(conn) == []
+
+
+def test_verify_schema_reports_missing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    with engine.connect() as conn:
+        problems = verify_schema(conn)
+    assert "missing table 'accounts'" in problems
+    with pytest.raises(RuntimeError):
+        check_schema(engine)
+
+
+@pytest.mark.asyncio
+async def test_declared_schema_round_trip(sqlite_engine, sqlite_async_engine):
+    """Both engine modes return the same rows through the declared tables."""
+    sync_server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine)
+    async_server = BankingMCPServer(mode="async", async_engine=sqlite_async_engine)
+
+    sync_balance = await sync_server.get_balance(ALICE)
+    async_balance = await async_server.get_balance(ALICE)
+
+    assert [a["name"] for a in sync_balance] == ["Salary Account", "Savings Account"]
+    assert sync_balance == async_balance
+    assert await sync_server.get_spend_by_category(ALICE) == await async_server.get_spend_by_category(ALICE)
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from mcp.db import get_pool_monitor
+from tests.conftest import ALICE
+
+
+@pytest.fixture
+def server(sqlite_engine):
+    return BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(maxsize=100, ttl=60))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_separate_reads_on_one_connection(server, sqlite_engine):
+    checkouts = get_pool_monitor(sqlite_engine).checkouts
+    snapshot = await server.get_account_snapshot(ALICE)
+    assert get_pool_monitor(sqlite_engine).checkouts == checkouts + 1
+
+    assert snapshot["accounts"] == await server.get_balance(ALICE)
+    assert snapshot["beneficiaries"] == await server.get_beneficiaries(ALICE)
+    assert snapshot["pending_transfers"] == await server.get_pending_transfers(ALICE)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_dropped_by_writes(server):
+    before = await server.get_account_snapshot(ALICE)
+    await server.add_beneficiary(ALICE, "PDB-CAROL-001", "Carol")
+
+    after = await server.get_account_snapshot(ALICE)
+    assert len(after["beneficiaries"]) == len(before["beneficiaries"]) + 1
+
+
+@pytest.mark.asyncio
+async def test_tool_returns_all_three_sections(server, monkeypatch):
+    from mcp import mcp_tool
+    monkeypatch.setattr(mcp_tool, "mcp_server", server)
+
+    snapshot = json.loads(await mcp_tool.get_account_snapshot.ainvoke({"user_id": ALICE}))
+    assert set(snapshot) == {"accounts", "beneficiaries", "pending_transfers"}
+    assert {a["name"] for a in snapshot["accounts"]} == {"Salary Account", "Savings Account"}
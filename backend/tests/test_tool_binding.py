@@ -0,0 +1,43 @@
+import pytest
+from langchain_openai import ChatOpenAI
+
+from bankbot.tool_manager import ToolManager
+from bankbot.utils.llm_utils import LLMClientRegistry
+from mcp.mcp_tool import MCP_TOOLS
+
+
+def _state(*names):
+    return {"copilotkit": {"actions": [{"name": name, "description": ""} for name in names]}}
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return ChatOpenAI(model="gpt-4o", temperature=0)
+
+
+def test_same_actions_reuse_the_same_tools():
+    manager = ToolManager(MCP_TOOLS)
+    first = manager.get_all_tools(_state("showSpending", "showBalance", "unknownAction"))
+    again = manager.get_all_tools(_state("showBalance", "showSpending", "showBalance"))
+
+    assert first[:len(MCP_TOOLS)] == MCP_TOOLS
+    assert [t.name for t in first[len(MCP_TOOLS):]] == ["showBalance", "showSpending"]
+    assert all(a is b for a, b in zip(first, again))
+    assert manager.get_all_tools(_state("showBalance"))[-1] is not first[-1]
+
+
+def test_binding_is_reused_and_schemas_converted_once(llm):
+    registry = LLMClientRegistry()
+    tools = ToolManager(MCP_TOOLS).get_all_tools(_state("showBalance"))
+
+    bound = registry.bind_tools(llm, tools, parallel_tool_calls=False)
+    assert registry.bind_tools(llm, list(tools), parallel_tool_calls=False) is bound
+    assert registry.bind_tools(llm, tools, parallel_tool_calls=True) is not bound
+    assert [t["function"]["name"] for t in bound.kwargs["tools"]] == [t.name for t in tools]
+    assert len(registry._schemas) == len(tools)
+
+    other = ChatOpenAI(model="gpt-4o", temperature=0.5)
+    assert registry.bind_tools(other, tools, parallel_tool_calls=False) is not bound
+    assert len(registry._schemas) == len(tools)
+    assert (registry.stats()["bind_hits"], registry.stats()["bind_misses"]) == (1, 3)
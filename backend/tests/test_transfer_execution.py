@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from mcp.cache import UserReadCache
+from mcp.mcp_impl import BankingMCPServer
+from tests.conftest import ALICE
+
+
+def _row(outcome, **values):
+    defaults = {"amount": 100, "from_currency": "AED", "to_currency": "AED", "to_user_id": None}
+    return SimpleNamespace(outcome=outcome, **{**defaults, **values})
+
+
+@pytest.mark.parametrize("outcome,error", [
+    ("not_found", "Transfer not found or already processed"),
+    ("insufficient_funds", "Insufficient funds or account changed"),
+    ("currency_mismatch", "Currency mismatch: source is AED but destination is USD"),
+])
+def test_procedure_failures_match_statement_path(outcome, error):
+    result = BankingMCPServer._transfer_outcome(_row(outcome, to_currency="USD"), "TRF-1")
+    assert result == {"success": False, "error": error}
+
+
+def test_procedure_success_carries_reference():
+    result = BankingMCPServer._transfer_outcome(_row("completed"), "TRF-1")
+    assert result["success"] is True
+    assert result["reference_number"] == "TRF-1"
+
+
+@pytest.mark.asyncio
+async def test_procedure_setting_falls_back_without_postgres(sqlite_engine, monkeypatch):
+    monkeypatch.setattr(settings, "transfer_execution", "procedure")
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine, cache=UserReadCache(enabled=False))
+
+    proposal = await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", 10.0)
+    result = await server.approve_transfer(ALICE, proposal["proposal_id"])
+    assert result["success"] is True
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from mcp.mcp_impl import BankingMCPServer
+from mcp.schema import accounts, transfer_log
+from mcp.transfer_queue import TransferWorkerPool
+from tests.conftest import ALICE, ALICE_SALARY, BOB, BOB_MAIN
+
+
+@pytest.fixture
+def server_options():
+    return {"queue_transfers": True}
+
+
+async def _propose(server, amount):
+    return (await server.propose_transfer(ALICE, "Salary Account", "Bob - Main", amount))["proposal_id"]
+
+
+def _status(engine, transfer_id):
+    with engine.connect() as conn:
+        return conn.execute(select(transfer_log.c.status).where(transfer_log.c.id == transfer_id)).scalar_one()
+
+
+def _balance(engine, account_id):
+    with engine.connect() as conn:
+        return conn.execute(select(accounts.c.balance).where(accounts.c.id == account_id)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_approval_only_queues(server, sqlite_engine):
+    transfer_id = await _propose(server, 100.0)
+    before = _balance(sqlite_engine, ALICE_SALARY)
+
+    result = await server.approve_transfer(ALICE, transfer_id)
+
+    assert result["success"] is True and result["status"] == "approved"
+    assert _status(sqlite_engine, transfer_id) == "approved"
+    assert _balance(sqlite_engine, ALICE_SALARY) == before
+    # already approved, so not pending any more
+    assert (await server.approve_transfer(ALICE, transfer_id))["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_worker_executes_approved_transfers(server, sqlite_engine):
+    # each fits the balance on its own, not both
+    first = await _propose(server, 10_000.0)
+    second = await _propose(server, 10_000.0)
+    batch = await server.approve_transfers(ALICE, [first, second, "not-a-uuid"])
+    assert [r["success"] for r in batch["results"]] == [True, True, False]
+
+    pool = TransferWorkerPool(server, workers=1, batch_size=10)
+    results = await pool.run_once()
+
+    assert sorted(r["transfer_id"] for r in results) == sorted([first, second])
+    assert sorted(r["success"] for r in results) == [False, True]
+    assert sorted([_status(sqlite_engine, first), _status(sqlite_engine, second)]) == ["completed", "failed"]
+    assert _balance(sqlite_engine, BOB_MAIN) == 35_000
+    assert await pool.run_once() == []
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded(server):
+    ids = [await _propose(server, 1.0) for _ in range(3)]
+    await server.approve_transfers(ALICE, ids)
+
+    pool = TransferWorkerPool(server, workers=1, batch_size=2)
+    assert len(await pool.run_once()) == 2
+    assert len(await pool.run_once()) == 1
+
+
+@pytest.mark.asyncio
+async def test_running_pool_publishes_completion(server):
+    pool = TransferWorkerPool(server, workers=2, poll_seconds=30)
+    events = pool.subscribe()
+    pool.start()
+    try:
+        transfer_id = await _propose(server, 10.0)
+        waiting = asyncio.ensure_future(pool.wait_for(transfer_id, timeout=5))
+        await asyncio.sleep(0)
+        # the approval wakes the idle workers well before the poll interval
+        await server.approve_transfer(ALICE, transfer_id)
+
+        result = await waiting
+        assert result["success"] is True and result["user_id"] == ALICE
+        assert (await asyncio.wait_for(events.get(), 1))["transfer_id"] == transfer_id
+    finally:
+        await pool.stop()
+    assert server.transfer_workers is None
+
+
+@pytest.mark.asyncio
+async def test_poison_transfer_does_not_block_the_batch(server, sqlite_engine, monkeypatch):
+    ids = [await _propose(server, amount) for amount in (10.0, 20.0, 30.0)]
+    await server.approve_transfers(ALICE, ids)
+    before = _balance(sqlite_engine, ALICE_SALARY)
+
+    execute = server._execute_transfer
+
+    def poison(conn, transfer, ref_number, touched_users):
+        if str(transfer.id) == ids[1]:
+            # a partial write, then a failure: the savepoint must undo it
+            conn.execute(update(accounts).where(accounts.c.id == ALICE_SALARY).values(balance=0))
+            raise IntegrityError("UPDATE accounts", {}, Exception("constraint violated"))
+        return execute(conn, transfer, ref_number, touched_users)
+
+    monkeypatch.setattr(server, "_execute_transfer", poison)
+    results = await TransferWorkerPool(server, workers=1).run_once()
+
+    assert {r["transfer_id"]: r["success"] for r in results} == {ids[0]: True, ids[1]: False, ids[2]: True}
+    assert [_status(sqlite_engine, t) for t in ids] == ["completed", "failed", "completed"]
+    assert before - _balance(sqlite_engine, ALICE_SALARY) == 40
+    with sqlite_engine.connect() as conn:
+        reason = conn.execute(select(transfer_log.c.rejection_reason).where(transfer_log.c.id == ids[1])).scalar_one()
+    assert reason == "Execution error: IntegrityError"
+    # nothing left to re-claim
+    assert await server.execute_approved_transfers(10) == []
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_unexpected_errors(server, monkeypatch, caplog):
+    execute = server.execute_approved_transfers
+    calls = []
+
+    async def flaky(limit):
+        calls.append(limit)
+        if len(calls) == 1:
+            raise ValueError("bad row")
+        return await execute(limit)
+
+    monkeypatch.setattr(server, "execute_approved_transfers", flaky)
+    transfer_id = await _propose(server, 10.0)
+    await server.approve_transfer(ALICE, transfer_id)
+
+    pool = TransferWorkerPool(server, workers=1, poll_seconds=0.01)
+    pool.start()
+    try:
+        result = await pool.wait_for(transfer_id, timeout=5)
+    finally:
+        await pool.stop()
+
+    assert result["success"] is True
+    assert pool.failed_batches == 1
+    assert "Transfer worker batch failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_inline_mode_is_unchanged(sqlite_engine):
+    server = BankingMCPServer(mode="sync", sync_engine=sqlite_engine, queue_transfers=False)
+    transfer_id = await _propose(server, 10.0)
+    result = await server.approve_transfer(ALICE, transfer_id)
+    assert result["success"] is True and "reference_number" in result
+    assert _status(sqlite_engine, transfer_id) == "completed"
+    assert await server.approve_transfers(BOB, [transfer_id]) == {
+        "success": False, "approved": 0, "failed": 1,
+        "results": [{"transfer_id": transfer_id, "success": False, "error": "Transfer not found or already processed"}],
+    }
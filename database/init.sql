@@ -24,6 +24,7 @@ CREATE TABLE accounts (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     name VARCHAR(100) NOT NULL,
     type VARCHAR(20) NOT NULL CHECK (type IN ('checking', 'savings', 'premium')),
+    account_number VARCHAR(50),
     currency VARCHAR(3) DEFAULT 'AED',
     balance DECIMAL(15, 2) DEFAULT 0.00,
     is_active BOOLEAN DEFAULT TRUE,
@@ -62,10 +63,43 @@ CREATE TABLE transactions (
     description TEXT,
     merchant_name VARCHAR(100),
     reference_number VARCHAR(50),
-    related_transaction_id UUID REFERENCES transactions(id),
+    -- no REFERENCES: a partitioned table cannot be referenced by id alone
+    related_transaction_id UUID,
     status VARCHAR(20) DEFAULT 'completed' CHECK (status IN ('pending', 'completed', 'failed', 'cancelled')),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- One partition per month (transactions_yYYYYmMM); the app creates months
+-- ahead at startup (mcp/partitions.py). The default partition catches
+-- anything outside them until ensure_partitions moves it out.
+DO $$
+DECLARE
+    m DATE;
+BEGIN
+    FOR m IN
+        SELECT generate_series(date_trunc('month', NOW()) - INTERVAL '12 months',
+                               date_trunc('month', NOW()) + INTERVAL '3 months',
+                               INTERVAL '1 month')::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE transactions_y%sm%s PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+            to_char(m, 'YYYY'), to_char(m, 'MM'), m, (m + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
+-- ========================================
+-- DAILY SPEND ROLLUP (maintained by the app on every spending insert)
+-- ========================================
+CREATE TABLE spend_daily_rollup (
+    account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT '',
+    total DECIMAL(18, 2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (account_id, day, category)
 );
 
 -- ========================================
@@ -88,6 +122,18 @@ CREATE TABLE transfer_log (
     rejection_reason TEXT
 );
 
+-- ========================================
+-- IDEMPOTENCY KEYS (first result of each proposal/approval tool call)
+-- ========================================
+CREATE TABLE idempotency_keys (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    tool VARCHAR(50) NOT NULL,
+    key VARCHAR(200) NOT NULL,
+    result TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, tool, key)
+);
+
 -- ========================================
 -- INSERT 3 USERS
 -- ========================================
@@ -100,19 +146,19 @@ INSERT INTO users (id, name, email, phone) VALUES
 -- INSERT ACCOUNTS FOR EACH USER
 -- ========================================
 -- Alice's Accounts
-INSERT INTO accounts (id, user_id, name, type, balance) VALUES
-    ('a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'Salary Account', 'checking', 15000.00),
-    ('a2eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'Savings Account', 'savings', 40000.00);
+INSERT INTO accounts (id, user_id, name, type, account_number, balance) VALUES
+    ('a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'Salary Account', 'checking', 'PDB-ALICE-001', 15000.00),
+    ('a2eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'Savings Account', 'savings', 'PDB-ALICE-002', 40000.00);
 
 -- Bob's Accounts
-INSERT INTO accounts (id, user_id, name, type, balance) VALUES
-    ('b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'Main Account', 'checking', 25000.00),
-    ('b2eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'Savings Account', 'savings', 60000.00);
+INSERT INTO accounts (id, user_id, name, type, account_number, balance) VALUES
+    ('b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'Main Account', 'checking', 'PDB-BOB-001', 25000.00),
+    ('b2eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'b0eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'Savings Account', 'savings', 'PDB-BOB-002', 60000.00);
 
 -- Carol's Accounts
-INSERT INTO accounts (id, user_id, name, type, balance) VALUES
-    ('c1eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'Current Account', 'checking', 18000.00),
-    ('c2eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'Premium Savings', 'premium', 100000.00);
+INSERT INTO accounts (id, user_id, name, type, account_number, balance) VALUES
+    ('c1eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'Current Account', 'checking', 'PDB-CAROL-001', 18000.00),
+    ('c2eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'c0eebc99-9c0b-4ef8-bb6d-6bb9bd380c33', 'Premium Savings', 'premium', 'PDB-CAROL-002', 100000.00);
 
 -- ========================================
 -- INSERT BENEFICIARIES (Each user has the other 2 as beneficiaries)
@@ -169,17 +215,92 @@ INSERT INTO transactions (account_id, type, amount, category, description, merch
     ('a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'transfer_out', 1000.00, 'transfer', 'Transfer to Bob Mansour', 'Phoenix Digital Bank', 'completed', NOW() - INTERVAL '10 days'),
     ('b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22', 'transfer_in', 1000.00, 'transfer', 'Transfer from Alice Ahmed', 'Phoenix Digital Bank', 'completed', NOW() - INTERVAL '10 days');
 
+-- Roll up the seeded spending
+INSERT INTO spend_daily_rollup (account_id, day, category, total)
+SELECT account_id, timestamp::date, COALESCE(category, ''), SUM(amount)
+FROM transactions
+WHERE type IN ('debit', 'transfer_out')
+GROUP BY 1, 2, 3;
+
 -- ========================================
 -- INDEXES FOR PERFORMANCE
 -- ========================================
 CREATE INDEX idx_accounts_user_id ON accounts(user_id);
+CREATE UNIQUE INDEX idx_accounts_account_number ON accounts(account_number);
 CREATE INDEX idx_beneficiaries_user_id ON beneficiaries(user_id);
 CREATE INDEX idx_beneficiaries_user_active ON beneficiaries(user_id, is_active);
+CREATE INDEX idx_accounts_user_lower_name ON accounts(user_id, lower(name));
+CREATE INDEX idx_beneficiaries_user_lower_nickname ON beneficiaries(user_id, lower(nickname));
 CREATE INDEX idx_transactions_account_id ON transactions(account_id);
 CREATE INDEX idx_transactions_timestamp ON transactions(timestamp);
 CREATE INDEX idx_transactions_category ON transactions(category);
+CREATE INDEX idx_transactions_account_timestamp_id ON transactions(account_id, timestamp DESC, id);
 CREATE INDEX idx_transfer_log_user_id ON transfer_log(user_id);
 CREATE INDEX idx_transfer_log_status ON transfer_log(status);
+CREATE INDEX idx_idempotency_keys_created_at ON idempotency_keys(created_at);
+
+-- ========================================
+-- TRANSFER EXECUTION (one round trip, see TRANSFER_EXECUTION=procedure)
+-- ========================================
+CREATE OR REPLACE FUNCTION execute_transfer(p_user_id UUID, p_transfer_id UUID, p_reference VARCHAR)
+RETURNS TABLE (outcome VARCHAR, amount DECIMAL, from_currency VARCHAR, to_currency VARCHAR, to_user_id UUID)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    t transfer_log%ROWTYPE;
+    src accounts%ROWTYPE;
+    dst accounts%ROWTYPE;
+BEGIN
+    SELECT * INTO t FROM transfer_log
+    WHERE id = p_transfer_id AND user_id = p_user_id AND status = 'pending'
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::VARCHAR, NULL::DECIMAL, NULL::VARCHAR, NULL::VARCHAR, NULL::UUID;
+        RETURN;
+    END IF;
+
+    -- lock both accounts in id order so concurrent transfers cannot deadlock
+    PERFORM 1 FROM accounts WHERE id IN (t.from_account_id, t.to_account_id) ORDER BY id FOR UPDATE;
+    SELECT * INTO src FROM accounts WHERE id = t.from_account_id;
+    SELECT * INTO dst FROM accounts WHERE id = t.to_account_id;
+    IF dst.id IS NULL THEN
+        RAISE EXCEPTION 'transfer % has no destination account', t.id;
+    END IF;
+
+    IF src.currency <> dst.currency THEN
+        UPDATE transfer_log
+        SET status = 'failed', rejection_reason = format('Currency mismatch: %s vs %s', src.currency, dst.currency)
+        WHERE id = t.id;
+        RETURN QUERY SELECT 'currency_mismatch'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+        RETURN;
+    END IF;
+
+    UPDATE accounts SET balance = balance - t.amount, updated_at = CURRENT_TIMESTAMP
+    WHERE id = t.from_account_id AND balance >= t.amount;
+    IF NOT FOUND THEN
+        UPDATE transfer_log SET status = 'failed', rejection_reason = 'Insufficient funds' WHERE id = t.id;
+        RETURN QUERY SELECT 'insufficient_funds'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+        RETURN;
+    END IF;
+
+    UPDATE accounts SET balance = balance + t.amount, updated_at = CURRENT_TIMESTAMP
+    WHERE id = t.to_account_id;
+
+    INSERT INTO transactions (account_id, type, amount, category, description, reference_number, status) VALUES
+        (t.from_account_id, 'transfer_out', t.amount, 'transfer', t.description, p_reference, 'completed'),
+        (t.to_account_id, 'transfer_in', t.amount, 'transfer', t.description, p_reference, 'completed');
+
+    INSERT INTO spend_daily_rollup (account_id, day, category, total)
+    VALUES (t.from_account_id, CURRENT_DATE, 'transfer', t.amount)
+    ON CONFLICT (account_id, day, category) DO UPDATE SET total = spend_daily_rollup.total + EXCLUDED.total;
+
+    UPDATE transfer_log
+    SET status = 'completed', approved_at = CURRENT_TIMESTAMP, executed_at = CURRENT_TIMESTAMP
+    WHERE id = t.id;
+
+    RETURN QUERY SELECT 'completed'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+END;
+$$;
 
 -- ========================================
 -- HELPFUL VIEWS
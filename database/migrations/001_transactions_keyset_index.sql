@@ -0,0 +1,12 @@
+-- Keyset pagination for get_transactions
+-- ========================================
+-- Serves WHERE account_id = ? ORDER BY timestamp DESC, id with a cursor on
+-- (timestamp, id). Already part of init.sql for fresh databases.
+-- CONCURRENTLY cannot run inside a transaction block: run with psql directly.
+-- Skipped when the index exists, since a partitioned transactions table
+-- (migration 004) rejects CONCURRENTLY even with IF NOT EXISTS.
+
+SELECT 'CREATE INDEX CONCURRENTLY idx_transactions_account_timestamp_id
+    ON transactions(account_id, timestamp DESC, id)'
+WHERE to_regclass('idx_transactions_account_timestamp_id') IS NULL
+\gexec
@@ -0,0 +1,25 @@
+-- Daily spend-by-category rollup
+-- ========================================
+-- get_spend_by_category reads whole days from spend_daily_rollup and only
+-- touches raw transactions for the partial first/last day of a range.
+-- The app keeps the rollup current on every spending insert; this backfills
+-- existing history. SHARE mode blocks writers (not readers) while the
+-- rollup is rebuilt so no spending row is missed or counted twice.
+
+CREATE TABLE IF NOT EXISTS spend_daily_rollup (
+    account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT '',
+    total DECIMAL(18, 2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (account_id, day, category)
+);
+
+BEGIN;
+LOCK TABLE transactions IN SHARE MODE;
+TRUNCATE spend_daily_rollup;
+INSERT INTO spend_daily_rollup (account_id, day, category, total)
+SELECT account_id, timestamp::date, COALESCE(category, ''), SUM(amount)
+FROM transactions
+WHERE type IN ('debit', 'transfer_out')
+GROUP BY 1, 2, 3;
+COMMIT;
@@ -0,0 +1,67 @@
+-- Single-round-trip transfer execution
+-- ========================================
+-- execute_transfer() performs approve_transfer's whole state transition
+-- (lock, currency check, conditional debit, credit, both transaction rows,
+-- spend rollup, status update) server-side, so row locks are held for one
+-- statement instead of seven client round trips. Used when
+-- TRANSFER_EXECUTION=procedure. Already part of init.sql for fresh databases.
+
+CREATE OR REPLACE FUNCTION execute_transfer(p_user_id UUID, p_transfer_id UUID, p_reference VARCHAR)
+RETURNS TABLE (outcome VARCHAR, amount DECIMAL, from_currency VARCHAR, to_currency VARCHAR, to_user_id UUID)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    t transfer_log%ROWTYPE;
+    src accounts%ROWTYPE;
+    dst accounts%ROWTYPE;
+BEGIN
+    SELECT * INTO t FROM transfer_log
+    WHERE id = p_transfer_id AND user_id = p_user_id AND status = 'pending'
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::VARCHAR, NULL::DECIMAL, NULL::VARCHAR, NULL::VARCHAR, NULL::UUID;
+        RETURN;
+    END IF;
+
+    -- lock both accounts in id order so concurrent transfers cannot deadlock
+    PERFORM 1 FROM accounts WHERE id IN (t.from_account_id, t.to_account_id) ORDER BY id FOR UPDATE;
+    SELECT * INTO src FROM accounts WHERE id = t.from_account_id;
+    SELECT * INTO dst FROM accounts WHERE id = t.to_account_id;
+    IF dst.id IS NULL THEN
+        RAISE EXCEPTION 'transfer % has no destination account', t.id;
+    END IF;
+
+    IF src.currency <> dst.currency THEN
+        UPDATE transfer_log
+        SET status = 'failed', rejection_reason = format('Currency mismatch: %s vs %s', src.currency, dst.currency)
+        WHERE id = t.id;
+        RETURN QUERY SELECT 'currency_mismatch'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+        RETURN;
+    END IF;
+
+    UPDATE accounts SET balance = balance - t.amount, updated_at = CURRENT_TIMESTAMP
+    WHERE id = t.from_account_id AND balance >= t.amount;
+    IF NOT FOUND THEN
+        UPDATE transfer_log SET status = 'failed', rejection_reason = 'Insufficient funds' WHERE id = t.id;
+        RETURN QUERY SELECT 'insufficient_funds'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+        RETURN;
+    END IF;
+
+    UPDATE accounts SET balance = balance + t.amount, updated_at = CURRENT_TIMESTAMP
+    WHERE id = t.to_account_id;
+
+    INSERT INTO transactions (account_id, type, amount, category, description, reference_number, status) VALUES
+        (t.from_account_id, 'transfer_out', t.amount, 'transfer', t.description, p_reference, 'completed'),
+        (t.to_account_id, 'transfer_in', t.amount, 'transfer', t.description, p_reference, 'completed');
+
+    INSERT INTO spend_daily_rollup (account_id, day, category, total)
+    VALUES (t.from_account_id, CURRENT_DATE, 'transfer', t.amount)
+    ON CONFLICT (account_id, day, category) DO UPDATE SET total = spend_daily_rollup.total + EXCLUDED.total;
+
+    UPDATE transfer_log
+    SET status = 'completed', approved_at = CURRENT_TIMESTAMP, executed_at = CURRENT_TIMESTAMP
+    WHERE id = t.id;
+
+    RETURN QUERY SELECT 'completed'::VARCHAR, t.amount, src.currency, dst.currency, dst.user_id;
+END;
+$$;
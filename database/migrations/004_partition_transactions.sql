@@ -0,0 +1,79 @@
+-- Monthly range partitioning of transactions on timestamp
+-- ========================================
+-- Rebuilds transactions as PARTITION BY RANGE (timestamp) with one partition
+-- per month (transactions_yYYYYmMM) from the oldest row through three months
+-- ahead, plus transactions_default. Date-bounded queries then scan only the
+-- months they cover, and old months can be detached for archival
+-- (python -m mcp.partitions detach --before YYYY-MM).
+--
+-- The primary key becomes (id, timestamp) and the self-reference on
+-- related_transaction_id is dropped: Postgres requires the partition key in
+-- every unique constraint. Rows are copied in one transaction that holds an
+-- exclusive lock on transactions throughout, so run it in a maintenance
+-- window on large tables. Skips itself once transactions is partitioned.
+-- Already part of init.sql for fresh databases.
+
+DO $$
+DECLARE
+    m DATE;
+    first_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'transactions'::regclass) THEN
+        RAISE NOTICE 'transactions is already partitioned';
+        RETURN;
+    END IF;
+
+    LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE;
+    ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+    ALTER TABLE transactions_unpartitioned RENAME CONSTRAINT transactions_pkey TO transactions_unpartitioned_pkey;
+    UPDATE transactions_unpartitioned SET timestamp = created_at WHERE timestamp IS NULL;
+
+    CREATE TABLE transactions (
+        id UUID DEFAULT uuid_generate_v4(),
+        account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+        type VARCHAR(20) NOT NULL CHECK (type IN ('credit', 'debit', 'transfer_in', 'transfer_out')),
+        amount DECIMAL(15, 2) NOT NULL,
+        currency VARCHAR(3) DEFAULT 'AED',
+        category VARCHAR(50),
+        description TEXT,
+        merchant_name VARCHAR(100),
+        reference_number VARCHAR(50),
+        related_transaction_id UUID,
+        status VARCHAR(20) DEFAULT 'completed' CHECK (status IN ('pending', 'completed', 'failed', 'cancelled')),
+        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+
+    SELECT LEAST(date_trunc('month', MIN(timestamp)), date_trunc('month', NOW()))::date
+    INTO first_month FROM transactions_unpartitioned;
+    FOR m IN
+        SELECT generate_series(COALESCE(first_month, date_trunc('month', NOW())::date),
+                               date_trunc('month', NOW()) + INTERVAL '3 months',
+                               INTERVAL '1 month')::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE transactions_y%sm%s PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+            to_char(m, 'YYYY'), to_char(m, 'MM'), m, (m + INTERVAL '1 month')::date
+        );
+    END LOOP;
+    CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
+    INSERT INTO transactions (
+        id, account_id, type, amount, currency, category, description, merchant_name,
+        reference_number, related_transaction_id, status, timestamp, created_at
+    )
+    SELECT
+        id, account_id, type, amount, currency, category, description, merchant_name,
+        reference_number, related_transaction_id, status, timestamp, created_at
+    FROM transactions_unpartitioned;
+    DROP TABLE transactions_unpartitioned;
+
+    -- built after the copy; creating them on the parent cascades to every partition
+    CREATE INDEX idx_transactions_account_id ON transactions(account_id);
+    CREATE INDEX idx_transactions_timestamp ON transactions(timestamp);
+    CREATE INDEX idx_transactions_category ON transactions(category);
+    CREATE INDEX idx_transactions_account_timestamp_id ON transactions(account_id, timestamp DESC, id);
+END $$;
+
+ANALYZE transactions;
@@ -0,0 +1,11 @@
+-- Case-insensitive account and beneficiary name lookups
+-- ========================================
+-- Serve WHERE user_id = ? AND lower(name) = ? (and lower(nickname)) for the
+-- name resolution behind propose_transfer / propose_internal_transfer.
+-- Already part of init.sql for fresh databases.
+-- CONCURRENTLY cannot run inside a transaction block: run with psql directly.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_accounts_user_lower_name
+    ON accounts(user_id, lower(name));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_beneficiaries_user_lower_nickname
+    ON beneficiaries(user_id, lower(nickname));
@@ -0,0 +1,22 @@
+-- Account numbers on accounts
+-- ========================================
+-- add_beneficiary resolves the account number a customer types through
+-- accounts.account_number (unique) instead of a list in the code. Numbers
+-- the demo data already used are backfilled; other existing accounts stay
+-- NULL until they are issued one. Already part of init.sql for fresh
+-- databases.
+
+ALTER TABLE accounts ADD COLUMN IF NOT EXISTS account_number VARCHAR(50);
+
+UPDATE accounts SET account_number = n.account_number
+FROM (VALUES
+    ('a1eebc99-9c0b-4ef8-bb6d-6bb9bd380a11'::uuid, 'PDB-ALICE-001'),
+    ('a2eebc99-9c0b-4ef8-bb6d-6bb9bd380a11'::uuid, 'PDB-ALICE-002'),
+    ('b1eebc99-9c0b-4ef8-bb6d-6bb9bd380b22'::uuid, 'PDB-BOB-001'),
+    ('b2eebc99-9c0b-4ef8-bb6d-6bb9bd380b22'::uuid, 'PDB-BOB-002'),
+    ('c1eebc99-9c0b-4ef8-bb6d-6bb9bd380c33'::uuid, 'PDB-CAROL-001'),
+    ('c2eebc99-9c0b-4ef8-bb6d-6bb9bd380c33'::uuid, 'PDB-CAROL-002')
+) AS n(id, account_number)
+WHERE accounts.id = n.id AND accounts.account_number IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_accounts_account_number ON accounts(account_number);
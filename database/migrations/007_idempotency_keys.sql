@@ -0,0 +1,20 @@
+-- Idempotency keys for proposal and approval tools
+-- ========================================
+-- propose_transfer, propose_internal_transfer, approve_transfer and
+-- approve_transfers store their first result per (user, tool, key) in the
+-- same transaction as the write. key is the tool call id plus a fingerprint
+-- of the call's arguments; a retried tool call with the same key gets
+-- that result back without touching transfer_log or accounts. Rows older
+-- than IDEMPOTENCY_KEY_TTL_HOURS are pruned at startup. Already part of
+-- init.sql for fresh databases.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    tool VARCHAR(50) NOT NULL,
+    key VARCHAR(200) NOT NULL,
+    result TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, tool, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys(created_at);
@@ -533,13 +533,16 @@ useCopilotAction({
           if (typeof parsed === 'string') {
             parsed = JSON.parse(parsed);
           }
-          txList = Array.isArray(parsed) ? parsed : [];
+          // get_transactions returns { transactions, next_cursor }
+          txList = Array.isArray(parsed) ? parsed : (Array.isArray(parsed?.transactions) ? parsed.transactions : []);
         } catch (e) {
           console.error('Failed to parse transactions:', e);
           txList = [];
         }
       } else if (Array.isArray(transactions)) {
         txList = transactions;
+      } else if (Array.isArray((transactions as any)?.transactions)) {
+        txList = (transactions as any).transactions;
       }
       
       if (txList.length === 0) {